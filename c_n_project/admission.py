@@ -0,0 +1,192 @@
+# Load shedding for the analyze endpoints: a token bucket per client plus a cap on the requests in flight in this
+# process. As load rises, requests first lose LLM enhancement, then are turned away with 429 (client over its
+# rate) or 503 (process over capacity) and a Retry-After. Critical emergencies are always admitted.
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from metrics import EMERGENCY_ADMISSIONS, LOAD_SHED
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    # Token bucket per client: rate tokens a second, holding at most burst. A request costing more than burst
+    # (a large batch) is let through on a full bucket and leaves it in debt, so the client waits for the
+    # whole cost before its next request. Buckets of the least recently seen clients are dropped past
+    # max_clients, so a flood of distinct addresses cannot grow it without bound.
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[Hashable, _Bucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client: Hashable, cost: float = 1.0) -> float:
+        """Take cost tokens from client's bucket. Returns 0 when allowed, else the seconds until it would be."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = _Bucket(self.burst, now)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+
+            needed = min(cost, self.burst)
+            if bucket.tokens >= needed:
+                bucket.tokens -= cost
+                return 0.0
+            return (needed - bucket.tokens) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class Rejection(NamedTuple):
+    status: int
+    retry_after: int
+    error: str
+
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+
+class Ticket:
+    # An admitted request's in-flight slots. use_llm is False when the request was admitted without LLM
+    # enhancement. Release it once the response is done; a with block does so.
+
+    __slots__ = ("_controller", "slots", "use_llm", "emergency", "_released")
+
+    def __init__(self, controller: "AdmissionController", slots: int, use_llm: bool, emergency: bool):
+        self._controller = controller
+        self.slots = slots
+        self.use_llm = use_llm
+        self.emergency = emergency
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._leave(self.slots)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class AdmissionController:
+    # Decides, per request, whether to serve it in full, serve it without the LLM, or shed it. Limits are per
+    # process: with a pre-fork server each worker enforces them on its own. A limit of 0 disables it.
+
+    def __init__(self, rate_per_minute: float = 60, burst: float = 20, max_in_flight: int = 7,
+                 llm_max_in_flight: int = 4, retry_after: int = 1):
+        self.rate_limiter = RateLimiter(rate_per_minute / 60, burst) if rate_per_minute > 0 else None
+        self.rate_per_minute = rate_per_minute
+        self.max_in_flight = max_in_flight
+        self.llm_max_in_flight = llm_max_in_flight
+        self.retry_after = max(1, retry_after)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.admitted = 0
+        self.llm_shed = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+        self.emergency_admitted = 0
+
+    def admit(self, client: Hashable, is_emergency: Optional[Callable[[], bool]] = None, cost: int = 1,
+              slots: int = 1) -> Tuple[Optional[Ticket], Optional[Rejection]]:
+        """Admit a request from client. Returns (ticket, None), or (None, rejection) for a shed request.
+
+        cost is the number of analyses asked for and slots the number run at once (both 1 except for
+        batches). is_emergency is only called for a request that would otherwise be rejected; a flagged
+        request is admitted past both the rate limit and the in-flight cap.
+        """
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.acquire(client, cost)
+            if wait > 0:
+                if is_emergency is not None and is_emergency():
+                    return self.admit_emergency(slots), None
+                return None, self._reject("rate_limited", 429, math.ceil(wait),
+                                          "Too many requests; please retry later")
+
+        # Checked and reserved in one step, so concurrent requests cannot all pass a nearly full cap
+        ticket = self._enter(slots)
+        if ticket is None:
+            if is_emergency is not None and is_emergency():
+                return self.admit_emergency(slots), None
+            return None, self._reject("overloaded", 503, self.retry_after,
+                                      "The service is busy; please retry shortly")
+        return ticket, None
+
+    def admit_emergency(self, slots: int = 1) -> Ticket:
+        """Admit critical emergencies whatever the load, e.g. the emergency items of a rejected batch."""
+        return self._enter(slots, emergency=True)
+
+    def _enter(self, slots: int = 1, emergency: bool = False) -> Optional[Ticket]:
+        """Reserve in-flight slots; None when the cap would be passed, unless emergency."""
+        if self.max_in_flight > 0:
+            # A batch wider than the cap runs once the process is otherwise idle
+            slots = min(slots, self.max_in_flight)
+        with self._lock:
+            if not emergency and 0 < self.max_in_flight < self.in_flight + slots:
+                return None
+            self.in_flight += slots
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.admitted += 1
+            use_llm = not 0 < self.llm_max_in_flight < self.in_flight
+            if not use_llm:
+                self.llm_shed += 1
+            if emergency:
+                self.emergency_admitted += 1
+
+        if not use_llm:
+            LOAD_SHED.inc(action="llm")
+        if emergency:
+            EMERGENCY_ADMISSIONS.inc()
+        return Ticket(self, slots, use_llm, emergency)
+
+    def _reject(self, action: str, status: int, retry_after: int, error: str) -> Rejection:
+        with self._lock:
+            setattr(self, action, getattr(self, action) + 1)
+        LOAD_SHED.inc(action=action)
+        return Rejection(status, retry_after, error)
+
+    def _leave(self, slots: int):
+        with self._lock:
+            self.in_flight -= slots
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "max_in_flight": self.max_in_flight,
+                "llm_max_in_flight": self.llm_max_in_flight,
+                "rate_limit_per_minute": self.rate_per_minute,
+                "rate_limit_burst": self.rate_limiter.burst if self.rate_limiter is not None else None,
+                "tracked_clients": len(self.rate_limiter) if self.rate_limiter is not None else 0,
+                "admitted": self.admitted,
+                "emergency_admitted": self.emergency_admitted,
+                "shed": {
+                    "llm": self.llm_shed,
+                    "rate_limited": self.rate_limited,
+                    "overloaded": self.overloaded
+                }
+            }
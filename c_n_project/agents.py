@@ -1,19 +1,34 @@
 # multiple - agents
+import asyncio
 import json
 import re
-import os
-from typing import List, Dict, Any, Optional
-from langchain.schema import BaseMessage, HumanMessage, SystemMessage
-from langchain.agents import AgentExecutor
-from langchain.tools import BaseTool
-import requests
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from bounded_executor import BoundedExecutor
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional, Sequence, Tuple
 from dotenv import load_dotenv
+from keyword_automaton import KeywordAutomaton
+from condition_index import ConditionIndex
+from symptom_lexicon import SymptomLexicon
+from knowledge_base import KnowledgeBase, KnowledgeBaseWatcher
+from ttl_cache import LRUTTLCache
+from llm_cache import LLMResponseCache
+from groq_client import GroqClient, AsyncGroqClient
+from logging_config import get_logger
+from metrics import timed, LLM_REQUESTS, RESULT_CACHE_REQUESTS, EMERGENCY_DETECTIONS, EMERGENCY_FAST_PATH, REQUESTS
 
 load_dotenv()
 
+logger = get_logger("agents")
+
 class SymptomAnalyzerAgent:
     # Agent responsible for parsing and normalizing user input symptoms. Converts free-text input into structured, standardized symptom data.
-    def __init__(self):
+    def __init__(self, knowledge_base: Optional[KnowledgeBase] = None):
         self.common_symptom_mappings = {
             # Pain-related
             "hurt": "pain", "ache": "pain", "sore": "pain", "painful": "pain",
@@ -35,13 +50,51 @@ class SymptomAnalyzerAgent:
             "dizzy": "dizziness", "lightheaded": "dizziness",
             "itchy": "itching", "scratchy": "itching"
         }
+        
+        # Common symptom patterns. Every alternative must start with a literal word, which is used as its anchor.
+        self.symptom_patterns = [
+            r'(headache|head\s*ache)',
+            r'(fever|temperature|hot|burning\s*up)',
+            r'(cough|coughing)',
+            r'(nausea|nauseous|feel\s*sick|upset\s*stomach)',
+            r'(vomit|vomiting|throw\s*up)',
+            r'(diarrhea|loose\s*stools|watery\s*stools)',
+            r'(fatigue|tired|exhausted|worn\s*out)',
+            r'(dizziness|dizzy|lightheaded)',
+            r'(chest\s*pain|chest\s*hurt)',
+            r'(shortness\s*of\s*breath|can\'t\s*breathe|hard\s*to\s*breathe)',
+            r'(sore\s*throat|throat\s*pain)',
+            r'(runny\s*nose|nasal\s*discharge)',
+            r'(stuffy\s*nose|nasal\s*congestion|blocked\s*nose)',
+            r'(abdominal\s*pain|stomach\s*ache|belly\s*pain)',
+            r'(muscle\s*aches|body\s*aches)',
+            r'(rash|skin\s*rash)',
+            r'(itching|itchy)',
+            r'(swelling|swollen)',
+            r'(blurred\s*vision|vision\s*problems)',
+            r'(difficulty\s*concentrating|can\'t\s*focus)'
+        ]
+        
+        # Pain patterns with the keywords any of their matches must contain
+        self.pain_patterns = [
+            (r'(\w+)\s*(pain|ache|hurt|sore)', ["pain", "ache", "hurt", "sore"]),
+            (r'(pain|ache|hurt|sore)\s*in\s*(\w+)', ["pain", "ache", "hurt", "sore"]),
+            (r'my\s*(\w+)\s*(hurts|aches|is\s*sore)', ["my"])
+        ]
+        
+        self._compile_symptom_matcher()
+        # Knowledge base symptoms add to the words misspellings can be corrected to
+        self.lexicon = SymptomLexicon(self._lexicon_terms(knowledge_base))
     
     def analyze_symptoms(self, user_input: str, age: Optional[int] = None, 
                         chronic_conditions: Optional[str] = None) -> Dict[str, Any]:
         
         cleaned_input = self._clean_input(user_input)
 
-        symptoms = self._extract_symptoms(cleaned_input)
+        # Misspelled words are fixed before extraction; cleaned_input keeps the user's wording
+        corrected_input, spelling_corrections = self.lexicon.correct_text(cleaned_input)
+
+        symptoms = self._extract_symptoms(corrected_input)
         
         normalized_symptoms = self._normalize_symptoms(symptoms)
    
@@ -52,6 +105,7 @@ class SymptomAnalyzerAgent:
         return {
             "original_input": user_input,
             "cleaned_input": cleaned_input,
+            "spelling_corrections": spelling_corrections,
             "extracted_symptoms": symptoms,
             "normalized_symptoms": normalized_symptoms,
             "severity_indicators": severity_indicators,
@@ -73,55 +127,61 @@ class SymptomAnalyzerAgent:
         
         return text.strip()
     
+    def _lexicon_terms(self, knowledge_base: Optional[KnowledgeBase]) -> List[str]:
+        """Every term the analyzer or the knowledge base recognizes, in a fixed order."""
+        terms = [term for pair in self.common_symptom_mappings.items() for term in pair]
+        for pattern in self.symptom_patterns:
+            terms.extend(alternative.replace("\\s*", " ").replace("\\'", "'")
+                         for alternative in pattern[1:-1].split('|'))
+        for _, keywords in self.pain_patterns:
+            terms.extend(keywords)
+        if knowledge_base is not None:
+            terms.extend(knowledge_base.condition_index.condition_symptoms)
+            terms.extend(lowered for _, lowered in knowledge_base.emergency_lookup)
+        return terms
+    
+    def _compile_symptom_matcher(self):
+        """Precompile the symptom patterns and index them by the keywords that can trigger them."""
+        self._compiled_patterns = []
+        self._pattern_anchors: Dict[str, List[int]] = {}
+        
+        for pattern in self.symptom_patterns:
+            for alternative in pattern[1:-1].split('|'):
+                anchor = re.split(r'\\s\*', alternative)[0].replace("\\'", "'")
+                self._pattern_anchors.setdefault(anchor, []).append(len(self._compiled_patterns))
+            self._compiled_patterns.append(re.compile(pattern))
+        
+        for pattern, keywords in self.pain_patterns:
+            for keyword in keywords:
+                self._pattern_anchors.setdefault(keyword, []).append(len(self._compiled_patterns))
+            self._compiled_patterns.append(re.compile(pattern))
+        
+        self._anchor_automaton = KeywordAutomaton(self._pattern_anchors)
+    
     def _extract_symptoms(self, text: str) -> List[str]:
         symptoms = []
         
-        # Common symptom patterns
-        symptom_patterns = [
-            r'(headache|head\s*ache)',
-            r'(fever|temperature|hot|burning\s*up)',
-            r'(cough|coughing)',
-            r'(nausea|nauseous|feel\s*sick|upset\s*stomach)',
-            r'(vomit|vomiting|throw\s*up)',
-            r'(diarrhea|loose\s*stools|watery\s*stools)',
-            r'(fatigue|tired|exhausted|worn\s*out)',
-            r'(dizziness|dizzy|lightheaded)',
-            r'(chest\s*pain|chest\s*hurt)',
-            r'(shortness\s*of\s*breath|can\'t\s*breathe|hard\s*to\s*breathe)',
-            r'(sore\s*throat|throat\s*pain)',
-            r'(runny\s*nose|nasal\s*discharge)',
-            r'(stuffy\s*nose|nasal\s*congestion|blocked\s*nose)',
-            r'(abdominal\s*pain|stomach\s*ache|belly\s*pain)',
-            r'(muscle\s*aches|body\s*aches)',
-            r'(rash|skin\s*rash)',
-            r'(itching|itchy)',
-            r'(swelling|swollen)',
-            r'(blurred\s*vision|vision\s*problems)',
-            r'(difficulty\s*concentrating|can\'t\s*focus)'
-        ]
-        
-        for pattern in symptom_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                if isinstance(match, tuple):
-                    symptoms.append(match[0])
-                else:
-                    symptoms.append(match)
-        
-        pain_patterns = [
-            r'(\w+)\s*(pain|ache|hurt|sore)',
-            r'(pain|ache|hurt|sore)\s*in\s*(\w+)',
-            r'my\s*(\w+)\s*(hurts|aches|is\s*sore)'
-        ]
+        # One pass over the text finds the anchors present; only patterns that can match are run
+        candidates = sorted({index for anchor in self._anchor_automaton.find(text)
+                             for index in self._pattern_anchors[anchor]})
         
-        for pattern in pain_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                if isinstance(match, tuple) and len(match) >= 2:
-                    body_part = match[0] if 'pain' not in match[0] else match[1]
-                    symptoms.append(f"{body_part} pain")
+        for index in candidates:
+            matches = self._compiled_patterns[index].findall(text)
+            
+            if index < len(self.symptom_patterns):
+                for match in matches:
+                    if isinstance(match, tuple):
+                        symptoms.append(match[0])
+                    else:
+                        symptoms.append(match)
+            else:
+                for match in matches:
+                    if isinstance(match, tuple) and len(match) >= 2:
+                        body_part = match[0] if 'pain' not in match[0] else match[1]
+                        symptoms.append(f"{body_part} pain")
         
-        return list(set(symptoms))  
+        # First occurrence kept, so the same text always gives the same order
+        return list(dict.fromkeys(symptoms))
     
     def _normalize_symptoms(self, symptoms: List[str]) -> List[str]:
         
@@ -132,7 +192,7 @@ class SymptomAnalyzerAgent:
             normalized_symptom = self.common_symptom_mappings.get(symptom.lower(), symptom)
             normalized.append(normalized_symptom)
         
-        return list(set(normalized))
+        return list(dict.fromkeys(normalized))
     
     def _extract_severity(self, text: str) -> Dict[str, Any]:
       
@@ -216,33 +276,197 @@ class ConditionMapperAgent:
     #Agent responsible for mapping symptoms to potential medical conditions. Uses rule-based knowledge base and optional LLM enhancement.
 
     
-    def __init__(self, knowledge_base_path: str = "knowledge_base.json"):
-        self.knowledge_base = self._load_knowledge_base(knowledge_base_path)
-        self.groq_api_key = os.getenv("GROQ_API_KEY")
-        self.groq_available = bool(self.groq_api_key)
+    def __init__(self, knowledge_base_path: str = "knowledge_base.json",
+                 knowledge_base: Optional[KnowledgeBase] = None,
+                 llm_cache: Optional[LLMResponseCache] = None,
+                 llm_client: Optional[GroqClient] = None,
+                 llm_executor: Optional[BoundedExecutor] = None,
+                 llm_latency_budget: Optional[float] = 0.8,
+                 async_llm_client: Optional[AsyncGroqClient] = None,
+                 scoring_engine: str = "index"):
+        if knowledge_base is None:
+            knowledge_base = KnowledgeBase.load(knowledge_base_path)
+        self.knowledge_base = knowledge_base
+        # "index" walks the condition index per request; "matrix" scores with a NumPy incidence matrix
+        if scoring_engine not in ("index", "matrix"):
+            raise ValueError(f"Unknown scoring engine: {scoring_engine}")
+        self.scoring_engine = scoring_engine
+        self._matrix_scorer = None
+        if scoring_engine == "matrix":
+            from matrix_scoring import IncidenceMatrixScorer
+            self._matrix_scorer = IncidenceMatrixScorer(knowledge_base)
+        # Pooled client with retries and a circuit breaker, shared across knowledge base reloads when passed in
+        self.llm_client = llm_client if llm_client is not None else GroqClient.from_env()
+        self.groq_api_key = self.llm_client.api_key
+        self.groq_available = self.llm_client.configured
+        # Parsed LLM answers keyed by prompt hash, shared across knowledge base reloads when passed in
+        self.llm_cache = llm_cache if llm_cache is not None else LLMResponseCache()
+        # LLM calls run here while rule-based matching proceeds; None for the budget waits for the answer
+        self.llm_executor = llm_executor if llm_executor is not None else BoundedExecutor(
+            max_workers=16, thread_name_prefix="llm")
+        self.llm_latency_budget = llm_latency_budget
+        # Used by amap_conditions; late async answers keep running in these tasks
+        self.async_llm_client = async_llm_client if async_llm_client is not None else AsyncGroqClient(self.llm_client)
+        self._background_llm_tasks = set()
     
-    def _load_knowledge_base(self, path: str) -> Dict[str, Any]:
+    def map_conditions(self, analyzed_symptoms: Dict[str, Any],
+                       timings: Optional[Dict[str, float]] = None, use_llm: bool = True) -> Dict[str, Any]:
         
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Warning: Knowledge base file {path} not found. Using empty knowledge base.")
-            return {"conditions": [], "emergency_symptoms": []}
+        # The last step carries the complete mappings
+        *_, (_, condition_mappings) = self.iter_map_conditions(analyzed_symptoms, timings, use_llm)
+        return condition_mappings
     
-    def map_conditions(self, analyzed_symptoms: Dict[str, Any]) -> Dict[str, Any]:
+    def iter_map_conditions(self, analyzed_symptoms: Dict[str, Any], timings: Optional[Dict[str, float]] = None,
+                            use_llm: bool = True) -> Iterator[Tuple[str, Any]]:
+        """map_conditions in steps, for streaming responses.
         
+        Yields ("rule_based", matches) as soon as rule-based matching is done, while the LLM call is still
+        running, then ("complete", condition mappings).
+        """
         symptoms = analyzed_symptoms.get("normalized_symptoms", [])
-        
-        rule_based_matches = self._rule_based_matching(symptoms)
+        started = time.monotonic()
+        
+        llm_future = None
+        # Set when the LLM should have been consulted but could not be; such results are not cached
+        llm_failed = False
+        # An open circuit breaker drops the request to rule-based only
+        if not use_llm:
+            pass
+        elif self.llm_client.available() and symptoms:
+            # Run in a copy of this context so the call's log lines keep the request ID
+            llm_future = self.llm_executor.try_submit(contextvars.copy_context().run, self._llm_enhanced_matching,
+                                                      analyzed_symptoms)
+            if llm_future is None:
+                # Enough calls are already outstanding that a new one would wait out its budget in the queue
+                LLM_REQUESTS.inc(outcome="skipped")
+                llm_failed = True
+        elif symptoms and self.llm_client.configured:
+            LLM_REQUESTS.inc(outcome="skipped")
+            llm_failed = True
+        
+        with timed("rule_based_matching", timings):
+            rule_based_matches = self._rule_based_matching(symptoms)
+        yield "rule_based", rule_based_matches
    
         llm_enhanced_matches = []
-        if self.groq_available and symptoms:
-            try:
-                llm_enhanced_matches = self._llm_enhanced_matching(analyzed_symptoms)
-            except Exception as e:
-                print(f"LLM matching failed: {e}")
+        llm_timed_out = False
+        if llm_future is not None:
+            timeout = None
+            if self.llm_latency_budget is not None:
+                timeout = max(0.0, self.llm_latency_budget - (time.monotonic() - started))
+            with timed("llm_wait", timings):
+                # One outcome per call: a call that misses the budget counts as a timeout however it ends
+                try:
+                    llm_enhanced_matches = llm_future.result(timeout=timeout)
+                except FutureTimeoutError:
+                    # A call still queued is dropped; one already running finishes and its answer lands in the
+                    # LLM cache for the next identical request
+                    llm_future.cancel()
+                    llm_timed_out = True
+                    LLM_REQUESTS.inc(outcome="timeout")
+                except Exception as e:
+                    logger.warning("LLM matching failed: %s", e)
+                    LLM_REQUESTS.inc(outcome="failure")
+                    llm_failed = True
+                else:
+                    LLM_REQUESTS.inc(outcome="success")
+        
+        yield "complete", self._mapping_results(symptoms, rule_based_matches, llm_enhanced_matches, llm_timed_out,
+                                                llm_skipped=not use_llm, llm_failed=llm_failed)
+    
+    async def amap_conditions(self, analyzed_symptoms: Dict[str, Any],
+                              timings: Optional[Dict[str, float]] = None, use_llm: bool = True) -> Dict[str, Any]:
+        """Asyncio version of map_conditions; the LLM call holds no thread while it waits."""
+        symptoms = analyzed_symptoms.get("normalized_symptoms", [])
+        started = time.monotonic()
+        
+        llm_task = None
+        llm_failed = False
+        if not use_llm:
+            pass
+        elif self.llm_client.available() and symptoms:
+            llm_task = asyncio.ensure_future(self._allm_enhanced_matching(analyzed_symptoms))
+            self._background_llm_tasks.add(llm_task)
+            llm_task.add_done_callback(self._background_llm_tasks.discard)
+            # A call that fails after its deadline has nobody awaiting it; mark the error as retrieved
+            llm_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        elif symptoms and self.llm_client.configured:
+            LLM_REQUESTS.inc(outcome="skipped")
+            llm_failed = True
+        
+        with timed("rule_based_matching", timings):
+            rule_based_matches = self._rule_based_matching(symptoms)
+        
+        llm_enhanced_matches = []
+        llm_timed_out = False
+        if llm_task is not None:
+            timeout = None
+            if self.llm_latency_budget is not None:
+                timeout = max(0.0, self.llm_latency_budget - (time.monotonic() - started))
+            with timed("llm_wait", timings):
+                try:
+                    # Shielded so a missed deadline leaves the call running to fill the LLM cache
+                    llm_enhanced_matches = await asyncio.wait_for(asyncio.shield(llm_task), timeout)
+                except asyncio.TimeoutError:
+                    llm_timed_out = True
+                    LLM_REQUESTS.inc(outcome="timeout")
+                except Exception as e:
+                    logger.warning("LLM matching failed: %s", e)
+                    LLM_REQUESTS.inc(outcome="failure")
+                    llm_failed = True
+                else:
+                    LLM_REQUESTS.inc(outcome="success")
         
+        return self._mapping_results(symptoms, rule_based_matches, llm_enhanced_matches, llm_timed_out,
+                                     llm_skipped=not use_llm, llm_failed=llm_failed)
+    
+    def map_conditions_batch(self, analyzed_batch: List[Dict[str, Any]],
+                             max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Map many analyzed inputs at once.
+        
+        Rule-based matching runs for the whole batch first, then the LLM lookups go out concurrently with at
+        most max_concurrency in flight. Bulk callers want complete answers, so no latency budget applies.
+        """
+        if self._matrix_scorer is not None:
+            # One matrix product scores the whole batch
+            with timed("rule_based_matching_batch"):
+                rule_based_batch = [
+                    self._condition_scores(scored) for scored in self._matrix_scorer.score_batch(
+                        [analyzed.get("normalized_symptoms", []) for analyzed in analyzed_batch]
+                    )
+                ]
+        else:
+            rule_based_batch = []
+            for analyzed in analyzed_batch:
+                with timed("rule_based_matching"):
+                    rule_based_batch.append(self._rule_based_matching(analyzed.get("normalized_symptoms", [])))
+        
+        llm_batch = [[] for _ in analyzed_batch]
+        # None marks an input whose LLM lookup failed or was skipped by an open circuit breaker
+        llm_jobs = [i for i, analyzed in enumerate(analyzed_batch) if analyzed.get("normalized_symptoms")]
+        if llm_jobs and self.llm_client.configured and not self.llm_client.available():
+            LLM_REQUESTS.inc(len(llm_jobs), outcome="skipped")
+            for i in llm_jobs:
+                llm_batch[i] = None
+        if self.llm_client.available() and llm_jobs:
+            with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="llm-batch") as pool:
+                # One context copy per job; a context cannot be entered by two threads at once
+                answers = pool.map(
+                    lambda job: job[1].run(self._counted_llm_matching, analyzed_batch[job[0]]),
+                    [(i, contextvars.copy_context()) for i in llm_jobs]
+                )
+                for i, llm_enhanced_matches in zip(llm_jobs, answers):
+                    llm_batch[i] = llm_enhanced_matches
+        
+        return [
+            self._mapping_results(analyzed.get("normalized_symptoms", []), rule_based, llm_enhanced or [], False,
+                                  llm_failed=llm_enhanced is None)
+            for analyzed, rule_based, llm_enhanced in zip(analyzed_batch, rule_based_batch, llm_batch)
+        ]
+    
+    def _mapping_results(self, symptoms: List[str], rule_based_matches: List[Dict[str, Any]],
+                         llm_enhanced_matches: List[Dict[str, Any]], llm_timed_out: bool,
+                         llm_skipped: bool = False, llm_failed: bool = False) -> Dict[str, Any]:
         combined_matches = self._combine_matches(rule_based_matches, llm_enhanced_matches)
         
         return {
@@ -250,58 +474,102 @@ class ConditionMapperAgent:
             "llm_enhanced_matches": llm_enhanced_matches,
             "combined_matches": combined_matches,
             "matching_confidence": self._calculate_matching_confidence(symptoms, combined_matches),
-            "groq_api_used": bool(llm_enhanced_matches)
+            "groq_api_used": bool(llm_enhanced_matches),
+            "llm_timed_out": llm_timed_out,
+            "llm_skipped": llm_skipped,
+            "llm_failed": llm_failed
         }
     
     def _rule_based_matching(self, symptoms: List[str]) -> List[Dict[str, Any]]:
         """Match symptoms to conditions using rule-based approach."""
-        condition_scores = []
+        if self._matrix_scorer is not None:
+            return self._condition_scores(self._matrix_scorer.score(symptoms))
         
-        for condition in self.knowledge_base.get("conditions", []):
-            condition_symptoms = [s.lower() for s in condition.get("symptoms", [])]
-            user_symptoms = [s.lower() for s in symptoms]
-            
-            matches = sum(1 for symptom in user_symptoms 
-                         if any(cs in symptom or symptom in cs for cs in condition_symptoms))
-            
-            if matches > 0:
-                total_condition_symptoms = len(condition_symptoms)
-                match_percentage = matches / max(total_condition_symptoms, len(user_symptoms))
-                
-                condition_scores.append({
-                    "condition": condition["name"],
-                    "match_score": matches,
-                    "match_percentage": match_percentage,
-                    "severity": condition.get("severity", "unknown"),
-                    "matched_symptoms": [s for s in user_symptoms 
-                                       if any(cs in s or s in cs for cs in condition_symptoms)],
-                    "recommendations": condition.get("recommendations", []),
-                    "medicines": condition.get("medicines", [])
-                })
-        
-        # Sort by match score and percentage
-        condition_scores.sort(key=lambda x: (x["match_score"], x["match_percentage"]), reverse=True)
-        
-        return condition_scores[:5]  
+        symptom_counts = self.knowledge_base.symptom_counts
+        user_symptoms = [s.lower() for s in symptoms]
+        
+        # Only conditions sharing at least one symptom with the input come back from the index
+        candidates = []
+        for position, matched_symptoms in self.knowledge_base.condition_index.match(user_symptoms).items():
+            matches = len(matched_symptoms)
+            total_condition_symptoms = symptom_counts[position]
+            match_percentage = matches / max(total_condition_symptoms, len(user_symptoms))
+            candidates.append((position, matches, match_percentage, matched_symptoms))
+        
+        # Sort by match score and percentage, ties keep knowledge base order
+        candidates.sort(key=lambda x: x[0])
+        top_matches = heapq.nlargest(5, candidates, key=lambda x: (x[1], x[2]))
+        
+        return self._condition_scores(top_matches)
+    
+    def _condition_scores(self, top_matches) -> List[Dict[str, Any]]:
+        """Rule-based match entries for (position, matches, match percentage, matched symptoms) tuples."""
+        conditions = self.knowledge_base.conditions
+        condition_scores = []
+        for position, matches, match_percentage, matched_symptoms in top_matches:
+            condition = conditions[position]
+            condition_scores.append({
+                "condition": condition.name,
+                "match_score": matches,
+                "match_percentage": match_percentage,
+                "severity": condition.severity,
+                "matched_symptoms": matched_symptoms,
+                "recommendations": list(condition.recommendations),
+                "medicines": list(condition.medicines)
+            })
+        
+        return condition_scores
     
     def _llm_enhanced_matching(self, analyzed_symptoms: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Use Groq API to enhance condition matching."""
+        """Use Groq API to enhance condition matching. Raises when the call fails or its answer cannot be parsed.
+        
+        The caller records the outcome, once per call, when it collects the result.
+        """
         if not self.groq_api_key:
             return []
         
-        symptoms = analyzed_symptoms.get("normalized_symptoms", [])
-        age = analyzed_symptoms.get("age")
-        chronic_conditions = analyzed_symptoms.get("chronic_conditions")
+        prompt = self._llm_prompt(analyzed_symptoms)
         
-       
-        prompt = self._create_groq_prompt(symptoms, age, chronic_conditions)
+        return self.llm_cache.get_or_fetch(
+            LLMResponseCache.key_for(prompt),
+            lambda: self._parse_groq_response(self._call_groq_api(prompt))
+        )
+    
+    def _counted_llm_matching(self, analyzed_symptoms: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """_llm_enhanced_matching for callers that wait without a deadline; records the outcome itself.
         
+        Returns None when the call fails.
+        """
         try:
-            response = self._call_groq_api(prompt)
-            return self._parse_groq_response(response)
+            matches = self._llm_enhanced_matching(analyzed_symptoms)
         except Exception as e:
-            print(f"Groq API call failed: {e}")
+            logger.warning("LLM matching failed: %s", e)
+            LLM_REQUESTS.inc(outcome="failure")
+            return None
+        
+        LLM_REQUESTS.inc(outcome="success")
+        return matches
+    
+    async def _allm_enhanced_matching(self, analyzed_symptoms: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Async version of _llm_enhanced_matching."""
+        if not self.groq_api_key:
             return []
+        
+        prompt = self._llm_prompt(analyzed_symptoms)
+        
+        async def fetch():
+            response = await self.async_llm_client.chat_completion(self._groq_payload(prompt))
+            return self._parse_groq_response(response)
+        
+        return await self.llm_cache.aget_or_fetch(LLMResponseCache.key_for(prompt), fetch)
+    
+    def _llm_prompt(self, analyzed_symptoms: Dict[str, Any]) -> str:
+        # Sorted so the same symptoms always produce the same prompt and cache key
+        symptoms = sorted(analyzed_symptoms.get("normalized_symptoms", []))
+        age = analyzed_symptoms.get("age")
+        chronic_conditions = analyzed_symptoms.get("chronic_conditions")
+        
+        return self._create_groq_prompt(symptoms, age, chronic_conditions)
     
     def _create_groq_prompt(self, symptoms: List[str], age: Optional[int], 
                            chronic_conditions: Optional[str]) -> str:
@@ -336,14 +604,10 @@ Please respond in JSON format with
     
     def _call_groq_api(self, prompt: str) -> str:
         """Make API call to Groq."""
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        
-        headers = {
-            "Authorization": f"Bearer {self.groq_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
+        return self.llm_client.chat_completion(self._groq_payload(prompt))
+    
+    def _groq_payload(self, prompt: str) -> Dict[str, Any]:
+        return {
             "model": "mixtral-8x7b-32768",
             "messages": [
                 {"role": "system", "content": "You are a helpful medical AI assistant. Provide information for educational purposes only."},
@@ -352,26 +616,19 @@ Please respond in JSON format with
             "temperature": 0.3,
             "max_tokens": 1000
         }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        
-        return response.json()["choices"][0]["message"]["content"]
     
     def _parse_groq_response(self, response: str) -> List[Dict[str, Any]]:
-        """Parse Groq API response."""
-        try:
-            
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                parsed = json.loads(json_str)
-                return parsed.get("conditions", [])
-        except Exception as e:
-            print(f"Failed to parse Groq response: {e}")
-        
-        return []
+        """Parse Groq API response. Raises ValueError when it holds no JSON object with a conditions list."""
+        json_match = re.search(r'\{.*\}', response, re.DOTALL)
+        if not json_match:
+            raise ValueError("No JSON object in Groq response")
+        
+        # A failed parse raises, so garbled answers are never cached and count as failures
+        parsed = json.loads(json_match.group())
+        conditions = parsed.get("conditions") if isinstance(parsed, dict) else None
+        if not isinstance(conditions, list):
+            raise ValueError("Groq response has no conditions list")
+        return conditions
     
     def _combine_matches(self, rule_based: List[Dict], llm_enhanced: List[Dict]) -> List[Dict[str, Any]]:
         
@@ -434,37 +691,108 @@ Please respond in JSON format with
         return (symptom_factor + match_factor) / 2.0
 
 
+class AdviceBundle(NamedTuple):
+    # What one condition contributes to advice, worked out once per condition instead of per request
+    recommendations: Tuple[str, ...]
+    over_the_counter: Tuple[str, ...]
+    prescription_needed: Tuple[str, ...]
+    see_doctor: Optional[str]
+    seek_help: Optional[str]
+
+
 class AdvisorAgent:
     #Agent responsible for providing medical advice and detecting emergency situations. Analyzes symptoms and conditions to provide appropriate recommendations.
     
     
-    def __init__(self, knowledge_base_path: str = "knowledge_base.json"):
-        self.knowledge_base = self._load_knowledge_base(knowledge_base_path)
-        self.emergency_symptoms = self.knowledge_base.get("emergency_symptoms", [])
+    # Symptom phrases that make an emergency critical, with the message shown for each
+    EMERGENCY_PATTERNS = [
+        ("chest pain", "Possible heart attack - seek immediate medical attention"),
+        ("difficulty breathing", "Respiratory emergency - call 108"),
+        ("severe headache", "Possible stroke or serious condition"),
+        ("abdominal pain", "Possible appendicitis or serious condition"),
+        ("facial drooping", "Possible stroke - call 108 immediately"),
+        ("speech difficulties", "Possible stroke - call 108 immediately")
+    ]
     
-    def _load_knowledge_base(self, path: str) -> Dict[str, Any]:
-       
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Warning: Knowledge base file {path} not found. Using empty knowledge base.")
-            return {"conditions": [], "emergency_symptoms": []}
+    # Fixed text included in every advice; compact API responses refer to it by key (see api_helpers)
+    DISCLAIMER = (
+        "IMPORTANT DISCLAIMER: This symptom checker is for educational and informational "
+        "purposes only. It is not intended to be a substitute for professional medical advice, "
+        "diagnosis, or treatment. Always seek the advice of your physician or other qualified "
+        "health provider with any questions you may have regarding a medical condition. "
+        "Never disregard professional medical advice or delay in seeking it because of "
+        "something you have read here. If you think you may have a medical emergency, "
+        "call your doctor or 108/112 immediately."
+    )
+    GENERAL_ADVICE = {
+        "emergency": "This appears to be a medical emergency",
+        "seek_attention": "Seek immediate professional medical attention",
+        "do_not_delay": "Do not delay in getting help",
+        "monitor_symptoms": "Monitor your symptoms and note any changes",
+        "symptom_diary": "Keep a symptom diary with dates and severity",
+        "hydrate_rest": "Stay hydrated and get adequate rest",
+        "monitor_temperature": "Monitor your temperature regularly",
+        "heat_cold_therapy": "Apply appropriate heat or cold therapy",
+        "clear_fluids": "Try small, frequent sips of clear fluids",
+        "consult_provider": "Consider consulting with a healthcare provider"
+    }
+    
+    # Medicines containing any of these names are suggested as over-the-counter
+    OTC_MEDICINES = (
+        "acetaminophen", "ibuprofen", "aspirin", "antihistamines",
+        "decongestants", "cough suppressants", "throat lozenges",
+        "oral rehydration salts", "probiotics"
+    )
+    NATURAL_REMEDIES = (
+        "honey for cough", "ginger for nausea", "warm salt water gargle",
+        "steam inhalation", "cold compress", "warm compress"
+    )
+    DEFAULT_SELF_CARE = ("Get adequate rest", "Stay hydrated", "Monitor your symptoms", "Maintain good hygiene")
+    # Bundles kept beyond the knowledge base's own conditions (LLM-only matches, compiled knowledge bases)
+    BUNDLE_CACHE_SIZE = 4096
+    
+    def __init__(self, knowledge_base_path: str = "knowledge_base.json",
+                 knowledge_base: Optional[KnowledgeBase] = None):
+        if knowledge_base is None:
+            knowledge_base = KnowledgeBase.load(knowledge_base_path)
+        self.knowledge_base = knowledge_base
+        self.emergency_symptoms = self.knowledge_base.emergency_symptoms
+        
+        # Finds every critical phrase across all symptoms in one pass
+        self._emergency_messages = dict(self.EMERGENCY_PATTERNS)
+        self._emergency_matcher = KeywordAutomaton(self._emergency_messages)
+        # Answers "emergency symptom in symptom or symptom in emergency symptom" for the whole list at once;
+        # each knowledge base emergency symptom is indexed as a one-symptom entry at its own position
+        self._emergency_index = ConditionIndex([emergency_lower] for _, emergency_lower
+                                               in self.knowledge_base.emergency_lookup)
+        
+        # Advice bundles for every condition are built now, so advice is a few lookups per request. Compiled
+        # knowledge bases decode conditions on demand, so theirs are built on first use instead.
+        precompute = knowledge_base.source_format != "compiled"
+        cache_size = self.BUNDLE_CACHE_SIZE + (len(knowledge_base.conditions) if precompute else 0)
+        self._bundle = functools.lru_cache(maxsize=cache_size)(self._build_bundle)
+        if precompute:
+            for condition in knowledge_base.conditions:
+                self._bundle(condition.name, condition.severity, condition.recommendations, condition.medicines)
     
     def provide_advice(self, analyzed_symptoms: Dict[str, Any], 
-                      condition_mappings: Dict[str, Any]) -> Dict[str, Any]:
+                      condition_mappings: Dict[str, Any],
+                      emergency_alert: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         
         symptoms = analyzed_symptoms.get("normalized_symptoms", [])
         severity_info = analyzed_symptoms.get("severity_indicators", {})
         conditions = condition_mappings.get("combined_matches", [])
+        # Advice draws on the top three conditions
+        bundles = [self._advice_bundle(condition) for condition in conditions[:3]]
         
-      
-        emergency_alert = self._check_emergency_symptoms(symptoms, severity_info)
+        # The orchestrator screens for emergencies before mapping and passes the alert on
+        if emergency_alert is None:
+            emergency_alert = self._check_emergency_symptoms(symptoms, severity_info)
         
         
-        recommendations = self._generate_recommendations(conditions, emergency_alert)
+        recommendations = self._generate_recommendations(conditions, bundles, emergency_alert)
         
-        medicine_suggestions = self._suggest_medicines(conditions)
+        medicine_suggestions = self._suggest_medicines(bundles)
         
         general_advice = self._generate_general_advice(symptoms, severity_info, emergency_alert)
         
@@ -474,9 +802,37 @@ class AdvisorAgent:
             "medicine_suggestions": medicine_suggestions,
             "general_advice": general_advice,
             "disclaimer": self._get_disclaimer(),
-            "when_to_seek_help": self._when_to_seek_help(symptoms, conditions, emergency_alert)
+            "when_to_seek_help": self._when_to_seek_help(symptoms, bundles, emergency_alert)
         }
     
+    def _advice_bundle(self, condition: Dict[str, Any]) -> AdviceBundle:
+        return self._bundle(condition["condition"], condition.get("severity", "mild"),
+                            tuple(condition.get("recommendations", ())), tuple(condition.get("medicines", ())))
+    
+    def _build_bundle(self, name: str, severity: str, recommendations: Tuple[str, ...],
+                      medicines: Tuple[str, ...]) -> AdviceBundle:
+        """Deduplicated recommendations and medicines in knowledge base order, and the doctor lines for severity."""
+        over_the_counter, prescription_needed = [], []
+        for medicine in dict.fromkeys(medicines):
+            medicine_lower = medicine.lower()
+            if any(otc in medicine_lower for otc in self.OTC_MEDICINES):
+                over_the_counter.append(medicine)
+            else:
+                prescription_needed.append(medicine)
+        
+        return AdviceBundle(
+            recommendations=tuple(dict.fromkeys(recommendations)),
+            over_the_counter=tuple(over_the_counter),
+            prescription_needed=tuple(prescription_needed),
+            see_doctor=f"Consider seeing a doctor for {name}" if severity in ("serious", "moderate") else None,
+            seek_help=f"You should see a doctor for suspected {name}" if severity == "serious" else None
+        )
+    
+    def check_emergency(self, analyzed_symptoms: Dict[str, Any]) -> Dict[str, Any]:
+        """Emergency alert for analyzed symptoms; needs no condition mappings, so it can run before them."""
+        return self._check_emergency_symptoms(analyzed_symptoms.get("normalized_symptoms", []),
+                                              analyzed_symptoms.get("severity_indicators", {}))
+    
     def _check_emergency_symptoms(self, symptoms: List[str], 
                                  severity_info: Dict[str, Any]) -> Dict[str, Any]:
         """Check for emergency symptoms that require immediate attention."""
@@ -485,10 +841,10 @@ class AdvisorAgent:
         emergency_level = "none"
         
         for symptom in symptoms:
-            for emergency_symptom in self.emergency_symptoms:
-                if emergency_symptom.lower() in symptom.lower() or symptom.lower() in emergency_symptom.lower():
-                    emergency_detected = True
-                    emergency_symptoms_found.append(emergency_symptom)
+            # Knowledge base order within each symptom, as a scan of the emergency list would find them
+            for position in sorted(self._emergency_index.related_positions(symptom.lower())):
+                emergency_detected = True
+                emergency_symptoms_found.append(self.emergency_symptoms[position])
        
         if severity_info.get("detected_severity") == "emergency":
             emergency_detected = True
@@ -496,32 +852,25 @@ class AdvisorAgent:
         elif emergency_symptoms_found:
             emergency_level = "high"
         
-        emergency_patterns = [
-            ("chest pain", "Possible heart attack - seek immediate medical attention"),
-            ("difficulty breathing", "Respiratory emergency - call 108"),
-            ("severe headache", "Possible stroke or serious condition"),
-            ("abdominal pain", "Possible appendicitis or serious condition"),
-            ("facial drooping", "Possible stroke - call 108 immediately"),
-            ("speech difficulties", "Possible stroke - call 108 immediately")
-        ]
-        
-        emergency_messages = []
-        for symptom in symptoms:
-            for pattern, message in emergency_patterns:
-                if pattern in symptom.lower():
-                    emergency_messages.append(message)
-                    emergency_detected = True
-                    emergency_level = "critical"
+        # Newlines never occur in a pattern, so a match in the joined text lies within a single symptom
+        found_patterns = self._emergency_matcher.find("\n".join(symptom.lower() for symptom in symptoms))
+        # In EMERGENCY_PATTERNS order; several patterns share a message
+        emergency_messages = list(dict.fromkeys(
+            message for pattern, message in self.EMERGENCY_PATTERNS if pattern in found_patterns
+        ))
+        if emergency_messages:
+            emergency_detected = True
+            emergency_level = "critical"
         
         return {
             "emergency_detected": emergency_detected,
             "emergency_level": emergency_level,
             "emergency_symptoms": emergency_symptoms_found,
-            "emergency_messages": list(set(emergency_messages)),
+            "emergency_messages": emergency_messages,
             "call_108": emergency_level == "critical"
         }
     
-    def _generate_recommendations(self, conditions: List[Dict], 
+    def _generate_recommendations(self, conditions: List[Dict], bundles: List[AdviceBundle],
                                 emergency_alert: Dict[str, Any]) -> Dict[str, Any]:
         """ they give  recommendations based on conditions and emergency status."""
         if emergency_alert["emergency_detected"]:
@@ -540,110 +889,52 @@ class AdvisorAgent:
                 ]
             }
         
-        recommendations = {
+        # Merged in condition order, first occurrence kept, so the same conditions always give the same advice
+        self_care = list(dict.fromkeys(itertools.chain.from_iterable(b.recommendations for b in bundles)))
+        
+        return {
             "priority": "ROUTINE" if not conditions else "MODERATE",
             "immediate_actions": [],
-            "self_care": [],
-            "when_to_see_doctor": [],
+            "self_care": self_care or list(self.DEFAULT_SELF_CARE),
+            "when_to_see_doctor": list(dict.fromkeys(b.see_doctor for b in bundles if b.see_doctor)),
             "avoid": []
         }
-        
-        for condition in conditions[:3]:  
-            condition_recs = condition.get("recommendations", [])
-            recommendations["self_care"].extend(condition_recs)
-            
-            severity = condition.get("severity", "mild")
-            if severity in ["serious", "moderate"]:
-                recommendations["when_to_see_doctor"].append(
-                    f"Consider seeing a doctor for {condition['condition']}"
-                )
-                recommendations["priority"] = "MODERATE"
-        
-       
-        recommendations["self_care"] = list(set(recommendations["self_care"]))
-        recommendations["when_to_see_doctor"] = list(set(recommendations["when_to_see_doctor"]))
-        
-        # Add general advice
-        if not recommendations["self_care"]:
-            recommendations["self_care"] = [
-                "Get adequate rest",
-                "Stay hydrated",
-                "Monitor your symptoms",
-                "Maintain good hygiene"
-            ]
-        
-        return recommendations
     
-    def _suggest_medicines(self, conditions: List[Dict]) -> Dict[str, Any]:
+    def _suggest_medicines(self, bundles: List[AdviceBundle]) -> Dict[str, Any]:
         """Suggest over-the-counter medicines based on conditions."""
-        medicine_suggestions = {
-            "over_the_counter": [],
-            "prescription_needed": [],
-            "natural_remedies": []
+        return {
+            "over_the_counter": list(dict.fromkeys(itertools.chain.from_iterable(
+                b.over_the_counter for b in bundles))),
+            "prescription_needed": list(dict.fromkeys(itertools.chain.from_iterable(
+                b.prescription_needed for b in bundles))),
+            "natural_remedies": list(self.NATURAL_REMEDIES[:3])
         }
-        
-        # Collect medicines from conditions
-        all_medicines = []
-        for condition in conditions[:3]:
-            medicines = condition.get("medicines", [])
-            all_medicines.extend(medicines)
-        
-        # Categorize medicines
-        otc_medicines = [
-            "acetaminophen", "ibuprofen", "aspirin", "antihistamines", 
-            "decongestants", "cough suppressants", "throat lozenges",
-            "oral rehydration salts", "probiotics"
-        ]
-        
-        natural_remedies = [
-            "honey for cough", "ginger for nausea", "warm salt water gargle",
-            "steam inhalation", "cold compress", "warm compress"
-        ]
-        
-        for medicine in set(all_medicines):
-            medicine_lower = medicine.lower()
-            if any(otc in medicine_lower for otc in otc_medicines):
-                medicine_suggestions["over_the_counter"].append(medicine)
-            else:
-                medicine_suggestions["prescription_needed"].append(medicine)
-        
-        
-        medicine_suggestions["natural_remedies"] = natural_remedies[:3]
-        
-        return medicine_suggestions
     
     def _generate_general_advice(self, symptoms: List[str], severity_info: Dict[str, Any], 
                                emergency_alert: Dict[str, Any]) -> List[str]:
         """Generate general health advice."""
+        text = self.GENERAL_ADVICE
         if emergency_alert["emergency_detected"]:
-            return [
-                "This appears to be a medical emergency",
-                "Seek immediate professional medical attention",
-                "Do not delay in getting help"
-            ]
-        
-        advice = [
-            "Monitor your symptoms and note any changes",
-            "Keep a symptom diary with dates and severity",
-            "Stay hydrated and get adequate rest"
-        ]
+            return [text["emergency"], text["seek_attention"], text["do_not_delay"]]
+        
+        advice = [text["monitor_symptoms"], text["symptom_diary"], text["hydrate_rest"]]
         
         # Add specific advice based on symptoms
         if any("fever" in s for s in symptoms):
-            advice.append("Monitor your temperature regularly")
+            advice.append(text["monitor_temperature"])
         
         if any("pain" in s for s in symptoms):
-            advice.append("Apply appropriate heat or cold therapy")
+            advice.append(text["heat_cold_therapy"])
         
         if any("nausea" in s or "vomiting" in s for s in symptoms):
-            advice.append("Try small, frequent sips of clear fluids")
+            advice.append(text["clear_fluids"])
         
         if severity_info.get("detected_severity") in ["severe", "moderate"]:
-            advice.append("Consider consulting with a healthcare provider")
+            advice.append(text["consult_provider"])
         
         return advice
     
-    def _when_to_seek_help(self, symptoms: List[str], conditions: List[Dict], 
+    def _when_to_seek_help(self, symptoms: List[str], bundles: List[AdviceBundle],
                           emergency_alert: Dict[str, Any]) -> List[str]:
         
         if emergency_alert["emergency_detected"]:
@@ -659,89 +950,411 @@ class AdvisorAgent:
         ]
         
         # Add condition-specific guidance
-        for condition in conditions[:2]:
-            severity = condition.get("severity", "mild")
-            if severity == "serious":
-                seek_help_conditions.insert(0, f"You should see a doctor for suspected {condition['condition']}")
+        for bundle in bundles[:2]:
+            if bundle.seek_help:
+                seek_help_conditions.insert(0, bundle.seek_help)
         
         return seek_help_conditions[:5]  
     
     def _get_disclaimer(self) -> str:
         
-        return (
-            "IMPORTANT DISCLAIMER: This symptom checker is for educational and informational "
-            "purposes only. It is not intended to be a substitute for professional medical advice, "
-            "diagnosis, or treatment. Always seek the advice of your physician or other qualified "
-            "health provider with any questions you may have regarding a medical condition. "
-            "Never disregard professional medical advice or delay in seeking it because of "
-            "something you have read here. If you think you may have a medical emergency, "
-            "call your doctor or 108/112 immediately."
-        )
+        return self.DISCLAIMER
 
 
 class MultiAgentOrchestrator:
     
     # Orchestrator class that manages the multi-agent workflow using LangChain concepts. Coordinates the interaction between AnalyzerAgent, ConditionMapperAgent, and AdvisorAgent.
     
+    # Representative inputs for warm_up: everyday symptoms, a misspelling and a critical emergency
+    WARM_UP_INPUTS = (
+        "I have a headache and fever since 2 days",
+        "sore throat, runny nose and a bad cough",
+        "my stomach hurts and I have diarhea and vomiting",
+        "severe chest pain and shortness of breath",
+    )
+    
+    def __init__(self, knowledge_base_path: str = "knowledge_base.json",
+                 cache_size: int = 1024, cache_ttl: float = 300.0, age_bucket_size: int = 10,
+                 llm_cache_size: int = 1024, llm_cache_ttl: float = 3600.0,
+                 llm_latency_budget: Optional[float] = 0.8, llm_max_workers: int = 16,
+                 knowledge_base: Optional[KnowledgeBase] = None, llm_client: Optional[GroqClient] = None,
+                 scoring_engine: str = "index", llm_max_pending: Optional[int] = None):
+        self.knowledge_base_path = knowledge_base_path
+        self.scoring_engine = scoring_engine
+        self.llm_cache = LLMResponseCache(llm_cache_size, llm_cache_ttl)
+        self.llm_client = llm_client if llm_client is not None else GroqClient.from_env()
+        self.async_llm_client = AsyncGroqClient(self.llm_client)
+        self.llm_executor = BoundedExecutor(llm_max_workers, llm_max_pending, thread_name_prefix="llm")
+        self.llm_latency_budget = llm_latency_budget
+        # Parsed once and shared by every agent
+        self._snapshot = self._build_snapshot(
+            knowledge_base if knowledge_base is not None else KnowledgeBase.load(knowledge_base_path)
+        )
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[KnowledgeBaseWatcher] = None
+        # Mapper and advisor output for recently seen inputs
+        self.result_cache = LRUTTLCache(cache_size, cache_ttl)
+        self.age_bucket_size = age_bucket_size
+    
+    def _build_snapshot(self, knowledge_base: KnowledgeBase):
+        """Bundle a knowledge base with the agents that read it, so they are always swapped together."""
+        return (
+            knowledge_base,
+            ConditionMapperAgent(knowledge_base=knowledge_base, llm_cache=self.llm_cache,
+                                 llm_client=self.llm_client, llm_executor=self.llm_executor,
+                                 llm_latency_budget=self.llm_latency_budget,
+                                 async_llm_client=self.async_llm_client,
+                                 scoring_engine=self.scoring_engine),
+            AdvisorAgent(knowledge_base=knowledge_base),
+            SymptomAnalyzerAgent(knowledge_base=knowledge_base)
+        )
+    
+    @property
+    def knowledge_base(self) -> KnowledgeBase:
+        return self._snapshot[0]
+    
+    @property
+    def mapper_agent(self) -> "ConditionMapperAgent":
+        return self._snapshot[1]
+    
+    @property
+    def advisor_agent(self) -> "AdvisorAgent":
+        return self._snapshot[2]
     
-    def __init__(self, knowledge_base_path: str = "knowledge_base.json"):
-        self.analyzer_agent = SymptomAnalyzerAgent()
-        self.mapper_agent = ConditionMapperAgent(knowledge_base_path)
-        self.advisor_agent = AdvisorAgent(knowledge_base_path)
+    @property
+    def analyzer_agent(self) -> SymptomAnalyzerAgent:
+        return self._snapshot[3]
+    
+    def reload_knowledge_base(self) -> Dict[str, Any]:
+        """Build a fresh knowledge base and its indexes, then swap it in atomically.
+        
+        Requests already running keep the snapshot they started with. If the file cannot be read or
+        parsed the current knowledge base stays in place and the error propagates.
+        """
+        with self._reload_lock:
+            knowledge_base = KnowledgeBase.load(self.knowledge_base_path, missing_ok=False)
+            self._snapshot = self._build_snapshot(knowledge_base)
+            self.result_cache.clear()
+            if self._watcher is not None:
+                self._watcher.seen(knowledge_base.source_mtime)
+        
+        logger.info("Knowledge base reloaded: %d conditions", len(knowledge_base.conditions),
+                    extra={"conditions": len(knowledge_base.conditions)})
+        return knowledge_base.get_status()
+    
+    def start_knowledge_base_watcher(self, interval: float = 5.0) -> KnowledgeBaseWatcher:
+        """Reload the knowledge base whenever its file changes on disk."""
+        if self._watcher is None:
+            self._watcher = KnowledgeBaseWatcher(self.knowledge_base_path, self.reload_knowledge_base, interval)
+            # Compare against the version in memory, which a pre-fork worker inherited from an earlier load
+            self._watcher.seen(self.knowledge_base.source_mtime)
+            self._watcher.start()
+        return self._watcher
+    
+    def warm_up(self, inputs: Optional[Sequence[str]] = None) -> int:
+        """Run sample inputs through analysis, rule-based matching and advice. Returns the number run.
+        
+        Exercises the pattern tables, condition index and emergency matchers so the first real request does
+        not pay for anything built lazily. The LLM, the result cache and the metrics are left untouched, and
+        no threads are started, so a pre-fork server can call this before forking its workers.
+        """
+        if inputs is None:
+            inputs = self.WARM_UP_INPUTS
+        knowledge_base, mapper_agent, advisor_agent, analyzer_agent = self._snapshot
+        for user_input in inputs:
+            analyzed_symptoms = analyzer_agent.analyze_symptoms(user_input)
+            symptoms = analyzed_symptoms["normalized_symptoms"]
+            condition_mappings = mapper_agent._mapping_results(
+                symptoms, mapper_agent._rule_based_matching(symptoms), [], False, llm_skipped=True
+            )
+            advisor_agent.provide_advice(analyzed_symptoms, condition_mappings,
+                                         advisor_agent.check_emergency(analyzed_symptoms))
+        return len(inputs)
+    
+    def _cache_key(self, knowledge_base: KnowledgeBase, analyzed_symptoms: Dict[str, Any]) -> tuple:
+        """Key results on the cleaned input, age bucket and chronic conditions."""
+        age = analyzed_symptoms.get("age")
+        age_bucket = age // self.age_bucket_size if age is not None and self.age_bucket_size > 0 else age
+        chronic_conditions = (analyzed_symptoms.get("chronic_conditions") or "").lower().strip()
+        
+        # loaded_at keeps a request that started before a reload from caching stale results
+        return (knowledge_base.loaded_at, analyzed_symptoms["cleaned_input"], age_bucket, chronic_conditions)
+    
+    def _start_pipeline(self, snapshot: tuple, user_input: str, age: Optional[int],
+                        chronic_conditions: Optional[str], timings: Optional[Dict[str, float]] = None):
+        """Run the analyzer and look the request up in the result cache."""
+        knowledge_base, mapper_agent, advisor_agent, analyzer_agent = snapshot
+        
+        logger.debug("Analyzing symptoms")
+        with timed("analyzer", timings):
+            analyzed_symptoms = analyzer_agent.analyze_symptoms(
+                user_input, age, chronic_conditions
+            )
+        
+        cache_key = self._cache_key(knowledge_base, analyzed_symptoms)
+        cached = self.result_cache.get(cache_key)
+        RESULT_CACHE_REQUESTS.inc(result="miss" if cached is None else "hit")
+        if timings is not None:
+            timings["result_cache_hit"] = cached is not None
+        return mapper_agent, advisor_agent, analyzed_symptoms, cache_key, cached
+    
+    def _screen_emergency(self, advisor_agent: "AdvisorAgent", analyzed_symptoms: Dict[str, Any],
+                          timings: Optional[Dict[str, float]] = None, allow_llm: bool = True):
+        """Check for an emergency before mapping. Returns the alert and whether the LLM should be consulted.
+        
+        A critical alert gets emergency advice whatever the LLM would add, so those requests skip it and
+        are answered as soon as rule-based matching is done. allow_llm=False (load shedding) skips it too.
+        """
+        with timed("emergency_screen", timings):
+            emergency_alert = advisor_agent.check_emergency(analyzed_symptoms)
+        
+        use_llm = emergency_alert["emergency_level"] != "critical"
+        if not use_llm:
+            EMERGENCY_FAST_PATH.inc()
+            logger.debug("Critical emergency detected; skipping LLM enhancement")
+        if timings is not None:
+            timings["emergency_fast_path"] = not use_llm
+            timings["llm_shed"] = use_llm and not allow_llm
+        return emergency_alert, use_llm and allow_llm
+    
+    def screen_emergency(self, user_input: str, age: Optional[int] = None,
+                         chronic_conditions: Optional[str] = None) -> Dict[str, Any]:
+        """The emergency alert for an input, without mapping or advice; lets admission control spare emergencies."""
+        snapshot = self._snapshot
+        analyzed_symptoms = snapshot[3].analyze_symptoms(user_input, age, chronic_conditions)
+        return snapshot[2].check_emergency(analyzed_symptoms)
+    
+    def _finish_pipeline(self, advisor_agent: "AdvisorAgent", analyzed_symptoms: Dict[str, Any],
+                         condition_mappings: Dict[str, Any], cache_key: tuple,
+                         timings: Optional[Dict[str, float]] = None,
+                         emergency_alert: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Generate advice for fresh condition mappings and cache the outcome."""
+        logger.debug("Generating advice")
+        with timed("advisor", timings):
+            advice = advisor_agent.provide_advice(analyzed_symptoms, condition_mappings, emergency_alert)
+        
+        # A timed-out LLM call will finish later, a failed call or open circuit breaker may recover, and a request
+        # shed from the LLM under load would get it when load drops; keep those rule-based-only results out of the
+        # cache. Critical emergencies always skip the LLM, so theirs are cached.
+        emergency_level = (emergency_alert or {}).get("emergency_level")
+        llm_shed = condition_mappings.get("llm_skipped") and emergency_level != "critical"
+        if not (condition_mappings.get("llm_timed_out") or condition_mappings.get("llm_failed") or llm_shed):
+            self.result_cache.set(cache_key, (condition_mappings, advice))
+        
+        return advice
+    
+    def _complete_results(self, analyzed_symptoms: Dict[str, Any], condition_mappings: Dict[str, Any],
+                          advice: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        REQUESTS.inc(outcome="success")
+        emergency_alert = advice.get("emergency_alert", {})
+        if emergency_alert.get("emergency_detected"):
+            EMERGENCY_DETECTIONS.inc(level=emergency_alert.get("emergency_level", "unknown"))
+        
+        results = {
+            "analyzed_symptoms": analyzed_symptoms,
+            "condition_mappings": condition_mappings,
+            "advice": advice,
+            "processing_success": True,
+            "error_message": None
+        }
+        if timings is not None:
+            results["timings"] = timings
+        return results
+    
+    def _failed_results(self, error: Exception) -> Dict[str, Any]:
+        logger.error("Error in multi-agent processing: %s", error, exc_info=error)
+        REQUESTS.inc(outcome="error")
+        return {
+            "analyzed_symptoms": {},
+            "condition_mappings": {},
+            "advice": {"error": str(error)},
+            "processing_success": False,
+            "error_message": str(error)
+        }
     
     def process_symptoms(self, user_input: str, age: Optional[int] = None, 
-                        chronic_conditions: Optional[str] = None) -> Dict[str, Any]:
+                        chronic_conditions: Optional[str] = None, allow_llm: bool = True) -> Dict[str, Any]:
         
+        timings: Dict[str, float] = {}
         try:
+            with timed("total", timings):
+                # Pin one snapshot for the whole request so a concurrent reload cannot mix versions
+                mapper_agent, advisor_agent, analyzed_symptoms, cache_key, cached = self._start_pipeline(
+                    self._snapshot, user_input, age, chronic_conditions, timings
+                )
+                
+                if cached is not None:
+                    condition_mappings, advice = cached
+                else:
+                    emergency_alert, use_llm = self._screen_emergency(advisor_agent, analyzed_symptoms, timings,
+                                                                      allow_llm)
+                    logger.debug("Mapping conditions")
+                    with timed("mapper", timings):
+                        condition_mappings = mapper_agent.map_conditions(analyzed_symptoms, timings, use_llm=use_llm)
+                    advice = self._finish_pipeline(advisor_agent, analyzed_symptoms, condition_mappings, cache_key,
+                                                   timings, emergency_alert)
             
-            print("Step 1: Analyzing symptoms...")
-            analyzed_symptoms = self.analyzer_agent.analyze_symptoms(
-                user_input, age, chronic_conditions
-            )
+            logger.debug("Request processed", extra={"timings": timings})
+            return self._complete_results(analyzed_symptoms, condition_mappings, advice, timings)
             
+        except Exception as e:
+            return self._failed_results(e)
+    
+    def stream_symptoms(self, user_input: str, age: Optional[int] = None, chronic_conditions: Optional[str] = None,
+                        allow_llm: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """process_symptoms in stages, for progressive (SSE) responses.
+        
+        Yields ("analysis", ...) with the analyzed symptoms and the emergency screen, ("conditions", ...) with
+        the rule-based matches while the LLM call is still running, and finally ("results", ...) with exactly
+        what process_symptoms returns. A failure at any stage still ends with "results".
+        """
+        timings: Dict[str, float] = {}
+        try:
+            # Stage timings include the time taken to hand each event to the server, normally microseconds
+            with timed("total", timings):
+                mapper_agent, advisor_agent, analyzed_symptoms, cache_key, cached = self._start_pipeline(
+                    self._snapshot, user_input, age, chronic_conditions, timings
+                )
+                
+                if cached is not None:
+                    condition_mappings, advice = cached
+                    yield "analysis", {"analyzed_symptoms": analyzed_symptoms,
+                                       "emergency_alert": advice["emergency_alert"]}
+                    yield "conditions", {"rule_based_matches": condition_mappings["rule_based_matches"]}
+                else:
+                    emergency_alert, use_llm = self._screen_emergency(advisor_agent, analyzed_symptoms, timings,
+                                                                      allow_llm)
+                    yield "analysis", {"analyzed_symptoms": analyzed_symptoms, "emergency_alert": emergency_alert}
+                    
+                    logger.debug("Mapping conditions")
+                    with timed("mapper", timings):
+                        for step, value in mapper_agent.iter_map_conditions(analyzed_symptoms, timings,
+                                                                            use_llm=use_llm):
+                            if step == "rule_based":
+                                yield "conditions", {"rule_based_matches": value}
+                            else:
+                                condition_mappings = value
+                    advice = self._finish_pipeline(advisor_agent, analyzed_symptoms, condition_mappings, cache_key,
+                                                   timings, emergency_alert)
             
-            print("Step 2: Mapping conditions...")
-            condition_mappings = self.mapper_agent.map_conditions(analyzed_symptoms)
+            logger.debug("Request processed", extra={"timings": timings})
+            results = self._complete_results(analyzed_symptoms, condition_mappings, advice, timings)
             
+        except Exception as e:
+            results = self._failed_results(e)
+        
+        yield "results", results
+    
+    async def aprocess_symptoms(self, user_input: str, age: Optional[int] = None,
+                                chronic_conditions: Optional[str] = None, allow_llm: bool = True) -> Dict[str, Any]:
+        """Asyncio version of process_symptoms for the ASGI entry point."""
+        timings: Dict[str, float] = {}
+        try:
+            with timed("total", timings):
+                # Pin one snapshot for the whole request so a concurrent reload cannot mix versions
+                mapper_agent, advisor_agent, analyzed_symptoms, cache_key, cached = self._start_pipeline(
+                    self._snapshot, user_input, age, chronic_conditions, timings
+                )
+                
+                if cached is not None:
+                    condition_mappings, advice = cached
+                else:
+                    emergency_alert, use_llm = self._screen_emergency(advisor_agent, analyzed_symptoms, timings,
+                                                                      allow_llm)
+                    logger.debug("Mapping conditions")
+                    with timed("mapper", timings):
+                        condition_mappings = await mapper_agent.amap_conditions(analyzed_symptoms, timings, use_llm=use_llm)
+                    advice = self._finish_pipeline(advisor_agent, analyzed_symptoms, condition_mappings, cache_key,
+                                                   timings, emergency_alert)
             
-            print("Step 3: Generating advice...")
-            advice = self.advisor_agent.provide_advice(analyzed_symptoms, condition_mappings)
+            logger.debug("Request processed", extra={"timings": timings})
+            return self._complete_results(analyzed_symptoms, condition_mappings, advice, timings)
             
-           
-            complete_results = {
-                "analyzed_symptoms": analyzed_symptoms,
-                "condition_mappings": condition_mappings,
-                "advice": advice,
-                "processing_success": True,
-                "error_message": None
-            }
+        except Exception as e:
+            return self._failed_results(e)
+    
+    def process_batch(self, inputs: List[Dict[str, Any]], llm_concurrency: int = 8,
+                      allow_llm: bool = True) -> List[Dict[str, Any]]:
+        """Process many inputs together and return their results in input order.
+        
+        Each input holds process_symptoms keyword arguments (user_input, age, chronic_conditions). Identical
+        inputs are analyzed once, and a failing input only fails its own result. allow_llm=False maps every
+        input rule-based only.
+        """
+        # Pin one snapshot for the whole batch
+        snapshot = self._snapshot
+        mapper_agent = snapshot[1]
+        
+        unique_inputs: Dict[tuple, int] = {}
+        positions = []
+        for item in inputs:
+            key = (item.get("user_input"), item.get("age"), item.get("chronic_conditions"))
+            positions.append(unique_inputs.setdefault(key, len(unique_inputs)))
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(unique_inputs)
+        pending = []
+        for index, (user_input, age, chronic_conditions) in enumerate(unique_inputs):
+            try:
+                _, advisor_agent, analyzed_symptoms, cache_key, cached = self._start_pipeline(
+                    snapshot, user_input, age, chronic_conditions
+                )
+            except Exception as e:
+                results[index] = self._failed_results(e)
+                continue
             
-            return complete_results
+            if cached is not None:
+                results[index] = self._complete_results(analyzed_symptoms, *cached)
+            else:
+                emergency_alert, use_llm = self._screen_emergency(advisor_agent, analyzed_symptoms,
+                                                                  allow_llm=allow_llm)
+                pending.append((index, advisor_agent, analyzed_symptoms, cache_key, emergency_alert, use_llm))
+        
+        if pending:
+            logger.debug("Mapping conditions for %d inputs", len(pending))
+            try:
+                # Critical emergencies are mapped rule-based only and do not wait on the batch's LLM calls
+                batch_mappings = iter(mapper_agent.map_conditions_batch(
+                    [p[2] for p in pending if p[5]], llm_concurrency
+                ))
+                mappings = [next(batch_mappings) if p[5] else mapper_agent.map_conditions(p[2], use_llm=False)
+                            for p in pending]
+            except Exception as e:
+                mappings = [e] * len(pending)
             
-        except Exception as e:
-            print(f"Error in multi-agent processing: {e}")
-            return {
-                "analyzed_symptoms": {},
-                "condition_mappings": {},
-                "advice": {"error": str(e)},
-                "processing_success": False,
-                "error_message": str(e)
-            }
+            for (index, advisor_agent, analyzed_symptoms, cache_key, emergency_alert, _), condition_mappings in zip(
+                    pending, mappings):
+                try:
+                    if isinstance(condition_mappings, Exception):
+                        raise condition_mappings
+                    advice = self._finish_pipeline(advisor_agent, analyzed_symptoms, condition_mappings, cache_key,
+                                                   emergency_alert=emergency_alert)
+                    results[index] = self._complete_results(analyzed_symptoms, condition_mappings, advice)
+                except Exception as e:
+                    results[index] = self._failed_results(e)
+        
+        return [results[position] for position in positions]
     
     def get_agent_status(self) -> Dict[str, Any]:
         
         return {
             "analyzer_agent": {
                 "status": "active",
-                "capabilities": ["symptom parsing", "normalization", "severity detection"]
+                "capabilities": ["symptom parsing", "normalization", "spelling correction", "severity detection"],
+                "vocabulary_size": len(self.analyzer_agent.lexicon.words)
             },
             "mapper_agent": {
                 "status": "active",
                 "groq_available": self.mapper_agent.groq_available,
-                "capabilities": ["rule-based matching", "LLM enhancement" if self.mapper_agent.groq_available else "rule-based only"]
+                "scoring_engine": self.scoring_engine,
+                "capabilities": ["rule-based matching", "LLM enhancement" if self.llm_client.available() else "rule-based only"],
+                "llm_client": self.llm_client.get_status(),
+                "llm_cache": self.llm_cache.get_stats(),
+                "llm_executor": self.llm_executor.get_stats()
             },
             "advisor_agent": {
                 "status": "active",
                 "capabilities": ["emergency detection", "recommendations", "medicine suggestions"]
-            }
+            },
+            "knowledge_base": self.knowledge_base.get_status(),
+            "result_cache": self.result_cache.get_stats()
         }
\ No newline at end of file
@@ -0,0 +1,180 @@
+# Request validation and response shaping shared by the Flask app, the ASGI entry point and the CLI.
+import hashlib
+import json
+import re
+
+from agents import AdvisorAgent
+
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+RESULT_SECTIONS = ('analyzed_symptoms', 'condition_mappings', 'advice')
+
+# Fixed advice text, served once by GET /api/texts. Compact responses carry these keys instead of the text.
+STATIC_TEXTS = {'disclaimer': AdvisorAgent.DISCLAIMER}
+STATIC_TEXTS.update({f'general_advice.{key}': text for key, text in AdvisorAgent.GENERAL_ADVICE.items()})
+STATIC_TEXTS_VERSION = hashlib.sha256(json.dumps(STATIC_TEXTS, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+_STATIC_TEXT_KEYS = {text: key for key, text in STATIC_TEXTS.items()}
+
+_QUERY_FLAGS = {'1': True, 'true': True, 'yes': True, '0': False, 'false': False, 'no': False, '': False}
+
+# Left out of compact responses: echoes of the request, the per-source match lists that combined_matches is
+# built from, and status flags the payload's "success" already carries
+_COMPACT_OMITTED_KEYS = ('processing_success', 'error_message')
+_COMPACT_OMITTED = {
+    'analyzed_symptoms': ('original_input', 'cleaned_input'),
+    'condition_mappings': ('rule_based_matches', 'llm_enhanced_matches')
+}
+
+
+def parse_analyze_request(data):
+    # Validate an /api/analyze JSON body. Returns (process_symptoms kwargs, None) or (None, error message).
+    if not data:
+        return None, 'No data provided'
+    if not isinstance(data, dict):
+        return None, 'The request body must be a JSON object'
+    
+    symptoms = data.get('symptoms', '')
+    age = data.get('age')
+    chronic_conditions = data.get('chronic_conditions') or ''
+    
+    if not isinstance(symptoms, str) or not isinstance(chronic_conditions, str):
+        return None, 'Symptoms and chronic conditions must be text'
+    
+    symptoms = symptoms.strip()
+    chronic_conditions = chronic_conditions.strip()
+    
+    if not symptoms:
+        return None, 'Symptoms are required'
+    
+    age_int = None
+    if age:
+        try:
+            age_int = int(age)
+            if age_int < 0 or age_int > 150:
+                raise ValueError("Invalid age range")
+        except (ValueError, TypeError):
+            return None, 'Please provide a valid age (0-150)'
+    
+    return {
+        'user_input': symptoms,
+        'age': age_int,
+        'chronic_conditions': chronic_conditions if chronic_conditions else None
+    }, None
+
+
+def parse_response_options(data, args=None):
+    # Read the "fields" and "compact" response options from a JSON body, falling back to the query string.
+    # Returns (analyze_response_payload kwargs, None) or (None, error message).
+    data = data if isinstance(data, dict) else {}
+    args = args or {}
+    
+    compact = data.get('compact', args.get('compact', False))
+    if isinstance(compact, str):
+        compact = _QUERY_FLAGS.get(compact.strip().lower(), compact)
+    if not isinstance(compact, bool):
+        return None, 'compact must be true or false'
+    
+    fields = data.get('fields', args.get('fields'))
+    if fields is not None:
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        if not isinstance(fields, list) or not fields or not all(isinstance(field, str) for field in fields):
+            return None, 'fields must be a non-empty list or comma-separated string of result fields'
+        unknown = sorted({field.split('.')[0] for field in fields} - set(RESULT_SECTIONS))
+        if unknown:
+            return None, f"Unknown fields: {', '.join(unknown)} (top-level fields are {', '.join(RESULT_SECTIONS)})"
+        fields = tuple(fields)
+    
+    return {'fields': fields, 'compact': compact}, None
+
+
+def _compact_results(results):
+    # New dicts throughout; results may be shared with the result cache
+    compacted = {key: value for key, value in results.items() if key not in _COMPACT_OMITTED_KEYS}
+    for section, omitted in _COMPACT_OMITTED.items():
+        if section in compacted:
+            compacted[section] = {key: value for key, value in compacted[section].items() if key not in omitted}
+    
+    advice = compacted.get('advice')
+    if advice:
+        advice = compacted['advice'] = dict(advice)
+        if advice.get('disclaimer') == STATIC_TEXTS['disclaimer']:
+            del advice['disclaimer']
+            advice['disclaimer_key'] = 'disclaimer'
+        general_advice = advice.get('general_advice')
+        if general_advice is not None and all(text in _STATIC_TEXT_KEYS for text in general_advice):
+            del advice['general_advice']
+            advice['general_advice_keys'] = [_STATIC_TEXT_KEYS[text] for text in general_advice]
+    return compacted
+
+
+def _select_fields(results, fields):
+    # Keep only the given dotted paths (e.g. "advice.emergency_alert"); paths that do not exist are skipped
+    paths = [field.split('.') for field in fields]
+    # A selected section already includes everything below it
+    paths = [path for path in paths
+             if not any(len(other) < len(path) and path[:len(other)] == other for other in paths)]
+    
+    selected = {}
+    for path in paths:
+        source, target = results, selected
+        for key in path[:-1]:
+            if not isinstance(source, dict) or key not in source:
+                break
+            source = source[key]
+            target = target.setdefault(key, {})
+        else:
+            if isinstance(source, dict) and path[-1] in source:
+                target[path[-1]] = source[path[-1]]
+    return selected
+
+
+def analyze_response_payload(results, include_timings=False, fields=None, compact=False):
+    # Shape orchestrator results into the /api/analyze response body and status code. Per-stage timings are
+    # only returned when the client asked for them with "debug": true. compact drops redundant blocks and
+    # refers to static text by its /api/texts key; fields narrows the results to the given paths.
+    if not results.get('processing_success', False):
+        return {
+            'success': False,
+            'error': results.get('error_message', 'Analysis failed')
+        }, 500
+    
+    timings = results.get('timings') if include_timings else None
+    if compact:
+        results = _compact_results(results)
+    if fields:
+        results = _select_fields(results, fields)
+        if timings is not None:
+            results['timings'] = timings
+    elif timings is None and 'timings' in results:
+        results = {key: value for key, value in results.items() if key != 'timings'}
+    
+    payload = {
+        'success': True,
+        'results': results
+    }
+    if compact:
+        payload['texts_version'] = STATIC_TEXTS_VERSION
+    return payload, 200
+
+
+def sse_event(event, data):
+    # One Server-Sent Events message. json.dumps output has no raw newlines, so it fits on one data line.
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def stream_events(stages, include_timings=False, **options):
+    # Render MultiAgentOrchestrator.stream_symptoms stages as SSE messages. The final results stage is shaped
+    # like an /api/analyze body (with its status code), so clients handle both endpoints the same way.
+    for stage, data in stages:
+        if stage == 'results':
+            payload, status = analyze_response_payload(data, include_timings=include_timings, **options)
+            data = dict(payload, status=status)
+        yield sse_event(stage, data)
+
+
+def client_request_id(value):
+    # Accept a caller-supplied X-Request-ID only if it is short and safe to echo into logs and headers
+    if value and _REQUEST_ID_PATTERN.match(value):
+        return value
+    return None
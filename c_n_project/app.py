@@ -1,19 +1,106 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, g, render_template, request, jsonify, redirect, url_for
+from markupsafe import Markup
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
-from dotenv import load_dotenv
+import hmac
+import threading
+from admission import AdmissionController
 from agents import MultiAgentOrchestrator
+from api_helpers import (parse_analyze_request, parse_response_options, analyze_response_payload, client_request_id,
+                         stream_events, STATIC_TEXTS, STATIC_TEXTS_VERSION)
+from config import load_settings
+from logging_config import configure_logging, get_logger, start_request
+import metrics
 import json
 
-load_dotenv()
+settings = load_settings()
+configure_logging()
+logger = get_logger("app")
 
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
+if settings.trusted_proxies:
+    # Behind a reverse proxy every request comes from the proxy; rate limits need the client's address
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=settings.trusted_proxies, x_proto=settings.trusted_proxies)
 
-orchestrator = MultiAgentOrchestrator()
+orchestrator = MultiAgentOrchestrator(**settings.orchestrator_options())
+
+# Upper bounds for /api/analyze/batch requests
+batch_max_items = settings.batch_max_items
+batch_llm_concurrency = settings.batch_llm_concurrency
+
+# Rate limits and the in-flight cap for the analyze endpoints
+admission = AdmissionController(**settings.admission_options())
+
+# Set by warm_up; /readyz reports not ready until then
+warmed_up = threading.Event()
+
+def warm_up():
+    """Exercise the pipeline once so the first real request pays no first-use costs, then report ready."""
+    if not warmed_up.is_set():
+        count = orchestrator.warm_up()
+        logger.info("Warm-up complete: %d sample inputs", count, extra={"pid": os.getpid()})
+        warmed_up.set()
+
+def start_background_tasks():
+    """Start per-process threads. Threads do not survive fork, so pre-fork servers call this in each worker."""
+    if settings.knowledge_base_watch_interval > 0:
+        orchestrator.start_knowledge_base_watcher(settings.knowledge_base_watch_interval)
+
+# Rendered static pages and template fragments, by template and script root (url_for output depends on it)
+_rendered_fragments = {}
+
+def render_static(template_name):
+    """Render a template that uses no per-request data once, and reuse the HTML afterwards."""
+    # Templates reload from disk while debugging, so nothing is cached then
+    if app.jinja_env.auto_reload:
+        return render_template(template_name)
+    key = (template_name, request.script_root)
+    html = _rendered_fragments.get(key)
+    if html is None:
+        html = _rendered_fragments[key] = render_template(template_name)
+    return html
+
+def critical_emergency(params):
+    """Whether the emergency screen rates an input critical. Only those are admitted past the limits: a "high"
+    alert comes from loose matches against the emergency symptom list (fever, headache) and is common."""
+    return orchestrator.screen_emergency(**params)['emergency_level'] == 'critical'
+
+def admit_request(is_emergency=None, **kwargs):
+    """Admission for an analyze request from this client: (ticket, None), or (None, rejection) when shed."""
+    return admission.admit(request.remote_addr, is_emergency, **kwargs)
+
+def json_body():
+    """The parsed JSON body (None when empty) and an error for a malformed one, as the ASGI endpoint reads it."""
+    data = request.get_json(force=True, silent=True)
+    if data is None and request.get_data():
+        return None, 'Invalid JSON'
+    return data, None
+
+def rejection_response(rejection):
+    return jsonify({
+        'success': False,
+        'error': rejection.error
+    }), rejection.status, rejection.headers()
+
+@app.template_global()
+def static_fragment(name):
+    """HTML of templates/fragments/<name>.html, rendered once; for sections with no per-request data."""
+    return Markup(render_static(f'fragments/{name}.html'))
+
+@app.before_request
+def bind_request_id():
+    g.request_id = start_request(client_request_id(request.headers.get('X-Request-ID')))
+
+@app.after_request
+def add_request_id_header(response):
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return render_static('index.html')
 
 @app.route('/analyze', methods=['POST'])
 def analyze_symptoms():
@@ -38,11 +125,19 @@ def analyze_symptoms():
                                      error="Please enter a valid age (0-150).",
                                      results=None)
         
-        results = orchestrator.process_symptoms(
-            user_input=symptoms,
-            age=age_int,
-            chronic_conditions=chronic_conditions if chronic_conditions else None
-        )
+        params = {
+            'user_input': symptoms,
+            'age': age_int,
+            'chronic_conditions': chronic_conditions if chronic_conditions else None
+        }
+        ticket, rejection = admit_request(lambda: critical_emergency(params))
+        if rejection:
+            return render_template('result.html',
+                                 error=rejection.error,
+                                 results=None), rejection.status, rejection.headers()
+        
+        with ticket:
+            results = orchestrator.process_symptoms(**params, allow_llm=ticket.use_llm)
         
         if not results.get('processing_success', False):
             return render_template('result.html', 
@@ -60,55 +155,155 @@ def analyze_symptoms():
 @app.route('/api/analyze', methods=['POST'])
 def api_analyze_symptoms():
     try:
-        data = request.get_json()
+        data, error = json_body()
+        if not error:
+            params, error = parse_analyze_request(data)
+        if not error:
+            options, error = parse_response_options(data, request.args)
         
-        if not data:
+        if error:
             return jsonify({
                 'success': False,
-                'error': 'No data provided'
+                'error': error
             }), 400
         
-        symptoms = data.get('symptoms', '').strip()
-        age = data.get('age')
-        chronic_conditions = data.get('chronic_conditions', '').strip()
+        ticket, rejection = admit_request(lambda: critical_emergency(params))
+        if rejection:
+            return rejection_response(rejection)
         
-        if not symptoms:
+        with ticket:
+            results = orchestrator.process_symptoms(**params, allow_llm=ticket.use_llm)
+        
+        payload, status = analyze_response_payload(results, include_timings=data.get('debug') is True, **options)
+        return jsonify(payload), status
+        
+    except Exception as e:
+        app.logger.error(f"Error in API analyze_symptoms: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'An unexpected error occurred'
+        }), 500
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def api_analyze_stream():
+    # Same body and options as /api/analyze, answered as Server-Sent Events: "analysis" (analyzed symptoms and
+    # emergency screen), "conditions" (rule-based matches) and "results" (the /api/analyze body)
+    try:
+        data, error = json_body()
+        if not error:
+            params, error = parse_analyze_request(data)
+        if not error:
+            options, error = parse_response_options(data, request.args)
+        
+        if error:
             return jsonify({
                 'success': False,
-                'error': 'Symptoms are required'
+                'error': error
             }), 400
         
-        age_int = None
-        if age:
-            try:
-                age_int = int(age)
-                if age_int < 0 or age_int > 150:
-                    raise ValueError("Invalid age range")
-            except (ValueError, TypeError):
-                return jsonify({
-                    'success': False,
-                    'error': 'Please provide a valid age (0-150)'
-                }), 400
-        
-        results = orchestrator.process_symptoms(
-            user_input=symptoms,
-            age=age_int,
-            chronic_conditions=chronic_conditions if chronic_conditions else None
-        )
+        ticket, rejection = admit_request(lambda: critical_emergency(params))
+        if rejection:
+            return rejection_response(rejection)
         
-        if not results.get('processing_success', False):
+        # A pipeline failure still ends the stream, as a "results" event carrying the error and its status
+        events = stream_events(orchestrator.stream_symptoms(**params, allow_llm=ticket.use_llm),
+                               include_timings=data.get('debug') is True, **options)
+        response = Response(events, mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            # Keep reverse proxies (nginx) from buffering the stream
+            'X-Accel-Buffering': 'no'
+        })
+        # The server closes every response, also one whose client left before the first chunk was sent
+        response.call_on_close(ticket.release)
+        return response
+        
+    except Exception as e:
+        app.logger.error(f"Error in API analyze_stream: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'An unexpected error occurred'
+        }), 500
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def api_analyze_batch():
+    try:
+        data, error = json_body()
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        items = data.get('items') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
             return jsonify({
                 'success': False,
-                'error': results.get('error_message', 'Analysis failed')
-            }), 500
+                'error': 'A non-empty items list is required'
+            }), 400
+        
+        # fields and compact apply to every item
+        options, error = parse_response_options(data, request.args)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        if len(items) > batch_max_items:
+            return jsonify({
+                'success': False,
+                'error': f'A batch may contain at most {batch_max_items} items'
+            }), 400
+        
+        try:
+            concurrency = int(data.get('concurrency', batch_llm_concurrency))
+        except (ValueError, TypeError):
+            concurrency = batch_llm_concurrency
+        concurrency = max(1, min(concurrency, batch_llm_concurrency))
+        
+        # Invalid items are reported in place; the rest are processed together
+        parsed = [parse_analyze_request(item if isinstance(item, dict) else None) for item in items]
+        valid = [params for params, error in parsed if not error]
+        
+        # Every item costs a token; the batch holds as many in-flight slots as analyses it runs at once
+        ticket, rejection = admit_request(cost=len(valid), slots=min(len(valid), concurrency))
+        admitted = [True] * len(valid)
+        if rejection:
+            # Over a limit: only the critical emergencies are analyzed (each distinct input screened once)
+            screened = {}
+            for params in valid:
+                key = tuple(params.values())
+                if key not in screened:
+                    screened[key] = critical_emergency(params)
+            admitted = [screened[tuple(params.values())] for params in valid]
+            if not any(admitted):
+                return rejection_response(rejection)
+            ticket = admission.admit_emergency(min(sum(admitted), concurrency))
+        
+        with ticket:
+            batch_results = iter(orchestrator.process_batch(
+                [params for params, keep in zip(valid, admitted) if keep], llm_concurrency=concurrency,
+                allow_llm=ticket.use_llm
+            ))
+        
+        results = []
+        admitted = iter(admitted)
+        for params, error in parsed:
+            if error:
+                results.append({'success': False, 'error': error})
+            elif not next(admitted):
+                results.append({'success': False, 'error': rejection.error})
+            else:
+                payload, _ = analyze_response_payload(next(batch_results), **options)
+                results.append(payload)
         
         return jsonify({
             'success': True,
             'results': results
-        })
+        }), 200, rejection.headers() if rejection else {}
         
     except Exception as e:
-        app.logger.error(f"Error in API analyze_symptoms: {e}")
+        app.logger.error(f"Error in API analyze_batch: {e}")
         return jsonify({
             'success': False,
             'error': 'An unexpected error occurred'
@@ -122,7 +317,8 @@ def api_status():
             'success': True,
             'status': 'healthy',
             'agents': agent_status,
-            'groq_api_available': agent_status['mapper_agent']['groq_available']
+            'groq_api_available': agent_status['mapper_agent']['groq_available'],
+            'admission': admission.get_stats()
         })
     except Exception as e:
         app.logger.error(f"Error in status check: {e}")
@@ -132,9 +328,75 @@ def api_status():
             'error': str(e)
         }), 500
 
+@app.route('/healthz')
+def healthz():
+    # Liveness: the process is up and serving requests
+    return jsonify({'status': 'alive', 'pid': os.getpid()})
+
+@app.route('/readyz')
+def readyz():
+    # Readiness: warmed up and holding a non-empty knowledge base
+    conditions = len(orchestrator.knowledge_base.conditions)
+    ready = warmed_up.is_set() and conditions > 0
+    return jsonify({
+        'ready': ready,
+        'warmed_up': warmed_up.is_set(),
+        'knowledge_base_conditions': conditions,
+        'pid': os.getpid()
+    }), 200 if ready else 503
+
+@app.route('/api/texts')
+def api_texts():
+    # Static text that compact responses refer to by key; changes only with a new release
+    response = jsonify({
+        'success': True,
+        'version': STATIC_TEXTS_VERSION,
+        'texts': STATIC_TEXTS
+    })
+    response.set_etag(STATIC_TEXTS_VERSION)
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/admin/reload-knowledge-base', methods=['POST'])
+def api_reload_knowledge_base():
+    admin_key = os.getenv('ADMIN_API_KEY')
+    if not admin_key:
+        return jsonify({
+            'success': False,
+            'error': 'Admin API is disabled'
+        }), 403
+    
+    if not hmac.compare_digest(request.headers.get('X-Admin-Key', ''), admin_key):
+        return jsonify({
+            'success': False,
+            'error': 'Invalid admin key'
+        }), 401
+    
+    try:
+        knowledge_base = orchestrator.reload_knowledge_base()
+        # Only this process reloaded; other worker processes follow through their own file watchers
+        watch_interval = settings.knowledge_base_watch_interval
+        return jsonify({
+            'success': True,
+            'knowledge_base': knowledge_base,
+            'other_workers': (f'Reload within {watch_interval:g}s if the file changed' if watch_interval > 0 else
+                              'Not reloaded; set KNOWLEDGE_BASE_WATCH_INTERVAL when running several workers')
+        })
+    except Exception as e:
+        app.logger.error(f"Error reloading knowledge base: {e}")
+        return jsonify({
+            'success': False,
+            'error': f'Reload failed, previous knowledge base kept: {e}'
+        }), 500
+
 @app.route('/about')
 def about():
-    return render_template('about.html')
+    return render_static('about.html')
 
 @app.errorhandler(404)
 def not_found_error(error):
@@ -165,15 +427,16 @@ if __name__ == '__main__':
     os.makedirs('templates', exist_ok=True)
     os.makedirs('static', exist_ok=True)
     
-    debug_mode = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
-    port = int(os.getenv('PORT', 5000))
-    
     print("=" * 50)
     print("Healthcare Multi-Agent Symptom Checker")
     print("=" * 50)
-    print(f"Starting server on port {port}")
-    print(f"Debug mode: {debug_mode}")
+    print(f"Starting server on {settings.host}:{settings.port}")
+    print(f"Debug mode: {settings.debug}")
     print(f"Groq API available: {bool(os.getenv('GROQ_API_KEY'))}")
     print("=" * 50)
     
-    app.run(host='0.0.0.0', port=5000, debug=debug_mode)
+    warm_up()
+    # The debug reloader runs the app in a child process; start threads only in the one that serves
+    if not settings.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_tasks()
+    app.run(host=settings.host, port=settings.port, debug=settings.debug)
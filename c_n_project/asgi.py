@@ -0,0 +1,110 @@
+# ASGI entry point. POST /api/analyze runs on the asyncio pipeline, so requests waiting on Groq hold no
+# worker thread; every other route is served by the Flask app.
+#
+#   uvicorn asgi:application --host 0.0.0.0 --port 5000
+import json
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+
+from api_helpers import parse_analyze_request, parse_response_options, analyze_response_payload, client_request_id
+from app import (app as flask_app, admission, critical_emergency, orchestrator, settings, start_background_tasks,
+                 warm_up)
+from logging_config import start_request
+
+flask_asgi = WsgiToAsgi(flask_app)
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+def _client_address(scope, headers) -> str:
+    """The client's address, taken from X-Forwarded-For as the Flask app's ProxyFix does (TRUSTED_PROXIES)."""
+    client = (scope.get("client") or (None,))[0]
+    forwarded_for = headers.get(b"x-forwarded-for")
+    if settings.trusted_proxies and forwarded_for:
+        forwarded = [value.strip() for value in forwarded_for.decode("latin-1").split(",")]
+        if len(forwarded) >= settings.trusted_proxies:
+            client = forwarded[-settings.trusted_proxies]
+    return client
+
+
+async def _send_json(send, payload, status: int, request_id: str, headers=None):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"x-request-id", request_id.encode("ascii"))
+        ] + [(name.lower().encode("ascii"), value.encode("ascii")) for name, value in (headers or {}).items()]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def api_analyze_symptoms(scope, receive, send):
+    # Each ASGI request runs in its own task, so the request ID stays local to it
+    headers = dict(scope.get("headers") or [])
+    request_id = start_request(client_request_id(headers.get(b"x-request-id", b"").decode("latin-1")))
+    try:
+        body = await _read_body(receive)
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            await _send_json(send, {'success': False, 'error': 'Invalid JSON'}, 400, request_id)
+            return
+        
+        params, error = parse_analyze_request(data)
+        if not error:
+            options, error = parse_response_options(
+                data, dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+            )
+        if error:
+            await _send_json(send, {'success': False, 'error': error}, 400, request_id)
+            return
+        
+        ticket, rejection = admission.admit(_client_address(scope, headers), lambda: critical_emergency(params))
+        if rejection:
+            await _send_json(send, {'success': False, 'error': rejection.error}, rejection.status, request_id,
+                             rejection.headers())
+            return
+        
+        with ticket:
+            results = await orchestrator.aprocess_symptoms(**params, allow_llm=ticket.use_llm)
+        payload, status = analyze_response_payload(results, include_timings=data.get('debug') is True,
+                                                   **options)
+        
+    except Exception as e:
+        flask_app.logger.error(f"Error in async API analyze_symptoms: {e}")
+        payload, status = {'success': False, 'error': 'An unexpected error occurred'}, 500
+    
+    await _send_json(send, payload, status, request_id)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            warm_up()
+            start_background_tasks()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await orchestrator.async_llm_client.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+    elif scope["type"] == "http" and scope["path"] == "/api/analyze" and scope["method"] == "POST":
+        await api_analyze_symptoms(scope, receive, send)
+    else:
+        await flask_asgi(scope, receive, send)
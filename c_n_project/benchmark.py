@@ -0,0 +1,359 @@
+# Benchmark harness for the three-agent pipeline.
+#
+#   python benchmark.py                                   # 10, 100, 1000 and 10000 condition knowledge bases
+#   python benchmark.py --sizes 10,1000 --inputs 2000 --output baseline.json
+#   python benchmark.py --compare baseline.json           # exits 1 if a stage regressed past --tolerance
+#   python benchmark.py --sizes "" --startup-budget-ms 300  # cold start only
+#
+# Knowledge bases and free-text inputs are generated from a seed, so runs with the same arguments time the
+# same work. Each stage is timed per call; reports give throughput and p50/p95/p99 latency. The LLM is
+# replaced by a local stub so results never depend on the network or an API key. Cold start (importing
+# agents and constructing an orchestrator) is timed in fresh interpreters and checked against a budget.
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from agents import SymptomAnalyzerAgent, ConditionMapperAgent, AdvisorAgent, MultiAgentOrchestrator
+from groq_client import GroqClient
+from knowledge_base import KnowledgeBase
+from llm_cache import LLMResponseCache
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+# Import plus orchestrator construction, in milliseconds. Well above a normal cold start, well below what
+# pulling a heavy framework into the import path costs.
+STARTUP_BUDGET_MS = 500.0
+
+_STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import agents
+imported = time.perf_counter()
+agents.MultiAgentOrchestrator()
+constructed = time.perf_counter()
+print(json.dumps({"import_ms": 1000 * (imported - started), "construct_ms": 1000 * (constructed - imported)}))
+"""
+
+# Phrases the analyzer recognizes, so generated inputs exercise real matches
+ANALYZER_PHRASES = [
+    "headache", "fever", "cough", "nausea", "vomiting", "diarrhea", "fatigue", "dizziness", "chest pain",
+    "shortness of breath", "sore throat", "runny nose", "stuffy nose", "abdominal pain", "muscle aches",
+    "body aches", "rash", "itching", "swelling", "blurred vision", "difficulty concentrating", "tired",
+    "upset stomach", "loose stools", "lightheaded", "stomach ache", "can't breathe"
+]
+BODY_PARTS = [
+    "head", "neck", "back", "chest", "stomach", "knee", "ankle", "wrist", "shoulder", "elbow", "hip", "jaw",
+    "ear", "eye", "throat", "skin", "foot", "hand", "leg", "arm", "lower back", "joint", "muscle", "tooth"
+]
+DESCRIPTORS = [
+    "pain", "swelling", "stiffness", "numbness", "tingling", "weakness", "cramps", "redness", "burning",
+    "tenderness", "bruising", "spasms"
+]
+SEVERITIES = ["mild", "moderate", "severe", "emergency"]
+SEVERITY_WORDS = ["", "", "mild", "slight", "severe", "terrible", "unbearable", "a little"]
+DURATIONS = ["", "", "for 2 days", "for 3 weeks", "since yesterday", "since last night", "suddenly",
+             "gradually over time", "for a few months"]
+OPENERS = ["I have", "I've had", "I am experiencing", "I keep getting", "My child has", "Having", ""]
+FILLERS = ["", "", "and it is getting worse", "and I can't sleep", "which comes and goes",
+           "especially at night", "after eating"]
+
+
+def symptom_vocabulary() -> List[str]:
+    """Symptom names used for generated knowledge bases: analyzer phrases plus body-part compounds."""
+    vocabulary = list(ANALYZER_PHRASES)
+    vocabulary.extend(f"{part} {descriptor}" for part in BODY_PARTS for descriptor in DESCRIPTORS)
+    return vocabulary
+
+
+def generate_knowledge_base(conditions: int, seed: int = 0) -> Dict[str, Any]:
+    """Build knowledge_base.json content with the given number of conditions."""
+    rng = random.Random(seed)
+    vocabulary = symptom_vocabulary()
+    # Real conditions reuse common symptoms, so skew selection toward the front of the vocabulary
+    weights = [1.0 / (rank + 1) ** 0.5 for rank in range(len(vocabulary))]
+
+    generated = []
+    for i in range(conditions):
+        symptom_count = rng.randint(4, 8)
+        symptoms = []
+        while len(symptoms) < symptom_count:
+            symptom = rng.choices(vocabulary, weights)[0]
+            if symptom not in symptoms:
+                symptoms.append(symptom)
+        generated.append({
+            "name": f"Condition {i}",
+            "symptoms": symptoms,
+            "severity": rng.choice(SEVERITIES),
+            "recommendations": [f"Recommendation {rng.randint(0, 200)}" for _ in range(rng.randint(2, 5))],
+            "medicines": [f"Medicine {rng.randint(0, 500)}" for _ in range(rng.randint(1, 4))]
+        })
+
+    return {
+        "conditions": generated,
+        "emergency_symptoms": ["chest pain", "difficulty breathing", "severe abdominal pain", "sudden weakness",
+                               "facial drooping", "can't breathe", "shortness of breath"]
+    }
+
+
+def generate_inputs(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Free-text inputs shaped like process_symptoms keyword arguments."""
+    rng = random.Random(seed)
+    vocabulary = symptom_vocabulary()
+
+    inputs = []
+    for _ in range(count):
+        symptoms = rng.sample(ANALYZER_PHRASES, rng.randint(1, 4))
+        if rng.random() < 0.5:
+            symptoms.append(rng.choice(vocabulary))
+        if rng.random() < 0.2:
+            symptoms.append(f"my {rng.choice(BODY_PARTS)} hurts")
+        parts = [rng.choice(OPENERS), rng.choice(SEVERITY_WORDS), ", ".join(symptoms[:-1]),
+                 "and" if len(symptoms) > 1 else "", symptoms[-1], rng.choice(DURATIONS), rng.choice(FILLERS)]
+        inputs.append({
+            "user_input": " ".join(p for p in parts if p),
+            "age": rng.choice([None, rng.randint(1, 90)]),
+            "chronic_conditions": rng.choice([None, None, "diabetes", "asthma", "hypertension"])
+        })
+    return inputs
+
+
+class StubGroqClient(GroqClient):
+    # GroqClient that answers locally after a fixed delay, with conditions taken from the knowledge base
+
+    def __init__(self, condition_names: Sequence[str], latency: float = 0.0, seed: int = 0):
+        super().__init__(api_key="benchmark-stub")
+        self.condition_names = list(condition_names) or ["Unknown"]
+        self.latency = latency
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def chat_completion(self, payload: Dict[str, Any]) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        names = self._rng.sample(self.condition_names, min(3, len(self.condition_names)))
+        return json.dumps({"conditions": [
+            {"name": name, "confidence": 0.5, "reasoning": "stub", "severity": "moderate"} for name in names
+        ]})
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def measure(func: Callable, items: Sequence[Any], warmup: int = 20) -> Dict[str, float]:
+    """Call func on every item and summarize per-call latency."""
+    for item in items[:warmup]:
+        func(item)
+
+    timings = []
+    started = time.perf_counter()
+    for item in items:
+        call_started = time.perf_counter()
+        func(item)
+        timings.append(time.perf_counter() - call_started)
+    total = time.perf_counter() - started
+    return _summarize(timings, total)
+
+
+def measure_batch(func: Callable, items: Sequence[Any], batch_size: int = 64) -> Dict[str, float]:
+    """Call func on batches of items; each item is charged an equal share of its batch's time."""
+    func(list(items[:batch_size]))
+
+    timings = []
+    started = time.perf_counter()
+    for start in range(0, len(items), batch_size):
+        batch = list(items[start:start + batch_size])
+        call_started = time.perf_counter()
+        func(batch)
+        timings.extend([(time.perf_counter() - call_started) / len(batch)] * len(batch))
+    total = time.perf_counter() - started
+    return _summarize(timings, total)
+
+
+def _summarize(timings: List[float], total: float) -> Dict[str, float]:
+    timings.sort()
+    return {
+        "count": len(timings),
+        "total_s": round(total, 6),
+        "throughput_per_s": round(len(timings) / total, 2) if total else 0.0,
+        "mean_ms": round(1000 * total / len(timings), 4) if timings else 0.0,
+        "p50_ms": round(1000 * percentile(timings, 0.50), 4),
+        "p95_ms": round(1000 * percentile(timings, 0.95), 4),
+        "p99_ms": round(1000 * percentile(timings, 0.99), 4)
+    }
+
+
+def benchmark_size(conditions: int, inputs: List[Dict[str, Any]], seed: int = 0,
+                   llm_latency: float = 0.0, scoring_engine: str = "index") -> Dict[str, Any]:
+    """Time every stage, and the whole pipeline, against a generated knowledge base of the given size."""
+    data = generate_knowledge_base(conditions, seed)
+    build_started = time.perf_counter()
+    knowledge_base = KnowledgeBase(data)
+    build_s = time.perf_counter() - build_started
+
+    analyzer = SymptomAnalyzerAgent(knowledge_base=knowledge_base)
+    analyzed = [analyzer.analyze_symptoms(**item) for item in inputs]
+
+    rule_based_mapper = ConditionMapperAgent(knowledge_base=knowledge_base, llm_client=GroqClient(None),
+                                             scoring_engine=scoring_engine)
+    stub_client = StubGroqClient([c.name for c in knowledge_base.conditions], llm_latency, seed)
+    # No LLM cache, so every call reaches the stub
+    stub_llm_mapper = ConditionMapperAgent(knowledge_base=knowledge_base, llm_client=stub_client,
+                                           llm_cache=LLMResponseCache(maxsize=0), llm_latency_budget=None,
+                                           scoring_engine=scoring_engine)
+    advisor = AdvisorAgent(knowledge_base=knowledge_base)
+    mapped = [(a, rule_based_mapper.map_conditions(a)) for a in analyzed]
+    # Result cache off so repeated inputs are not served from memory
+    orchestrator = MultiAgentOrchestrator(knowledge_base=knowledge_base, llm_client=GroqClient(None), cache_size=0,
+                                          scoring_engine=scoring_engine)
+
+    stages = {
+        "analyzer": measure(lambda item: analyzer.analyze_symptoms(**item), inputs),
+        "mapper_rule_based": measure(rule_based_mapper.map_conditions, analyzed),
+        # Per-item cost of matching the whole input set as one batch
+        "mapper_rule_based_batch": measure_batch(rule_based_mapper.map_conditions_batch, analyzed),
+        "mapper_stub_llm": measure(stub_llm_mapper.map_conditions, analyzed),
+        "advisor": measure(lambda pair: advisor.provide_advice(*pair), mapped),
+        "end_to_end": measure(lambda item: orchestrator.process_symptoms(**item), inputs)
+    }
+    stub_llm_mapper.llm_executor.shutdown(wait=False)
+    rule_based_mapper.llm_executor.shutdown(wait=False)
+    orchestrator.llm_executor.shutdown(wait=False)
+
+    return {"conditions": conditions, "knowledge_base_build_s": round(build_s, 6), "stages": stages}
+
+
+def measure_startup(runs: int = 5) -> Dict[str, float]:
+    """Median cold-start cost over fresh interpreters: importing agents, then building an orchestrator."""
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT],
+                                   cwd=os.path.dirname(os.path.abspath(__file__)),
+                                   capture_output=True, text=True, check=True)
+        samples.append(json.loads(completed.stdout.splitlines()[-1]))
+    return {
+        "runs": runs,
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 2),
+        "construct_ms": round(statistics.median(s["construct_ms"] for s in samples), 2),
+        "total_ms": round(statistics.median(s["import_ms"] + s["construct_ms"] for s in samples), 2)
+    }
+
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, input_count: int = 1000, seed: int = 0,
+                   llm_latency: float = 0.0, scoring_engine: str = "index",
+                   startup_runs: int = 5) -> Dict[str, Any]:
+    inputs = generate_inputs(input_count, seed)
+    results = {str(size): benchmark_size(size, inputs, seed, llm_latency, scoring_engine) for size in sizes}
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "inputs": input_count,
+            "llm_latency_ms": llm_latency * 1000,
+            "scoring_engine": scoring_engine
+        },
+        "results": results
+    }
+    if startup_runs > 0:
+        report["startup"] = measure_startup(startup_runs)
+    return report
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Describe every stage whose p50 or p95 (or cold start) is more than tolerance slower than in the baseline."""
+    regressions = []
+    base_startup, startup = baseline.get("startup"), current.get("startup")
+    if base_startup and startup and startup["total_ms"] > base_startup["total_ms"] * (1 + tolerance):
+        regressions.append(f"cold start: total_ms {base_startup['total_ms']:.1f} -> {startup['total_ms']:.1f} "
+                           f"({startup['total_ms'] / base_startup['total_ms'] - 1:+.0%})")
+    for size, result in current["results"].items():
+        base_stages = baseline.get("results", {}).get(size, {}).get("stages", {})
+        for stage, stats in result["stages"].items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            for metric in ("p50_ms", "p95_ms"):
+                if base[metric] and stats[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(f"{size} conditions / {stage}: {metric} {base[metric]:.4f} -> "
+                                       f"{stats[metric]:.4f} ({stats[metric] / base[metric] - 1:+.0%})")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]):
+    header = f"{'conditions':>10}  {'stage':<24}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for size, result in report["results"].items():
+        for stage, stats in result["stages"].items():
+            print(f"{size:>10}  {stage:<24}{stats['throughput_per_s']:>12.1f}{stats['p50_ms']:>10.3f}"
+                  f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+        print(f"{size:>10}  {'(index build)':<24}{'':>12}{1000 * result['knowledge_base_build_s']:>10.1f}")
+    startup = report.get("startup")
+    if startup:
+        print(f"\nCold start (median of {startup['runs']}): import {startup['import_ms']:.1f} ms, "
+              f"orchestrator {startup['construct_ms']:.1f} ms, total {startup['total_ms']:.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the symptom analysis pipeline.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated knowledge base sizes (number of conditions)")
+    parser.add_argument("--inputs", type=int, default=1000, help="Number of generated inputs per size")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for generated inputs and knowledge bases")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Delay of the stubbed LLM")
+    parser.add_argument("--scoring-engine", choices=("index", "matrix"), default="index",
+                        help="Rule-based scoring implementation to measure")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a regression")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh interpreters timed for cold start (0 skips)")
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help="Fail when the median cold start exceeds this")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = run_benchmarks(sizes, args.inputs, args.seed, args.llm_latency_ms / 1000, args.scoring_engine,
+                            args.startup_runs)
+    print_report(report)
+    failed = False
+
+    startup = report.get("startup")
+    if startup and startup["total_ms"] > args.startup_budget_ms:
+        print(f"\nCold start of {startup['total_ms']:.1f} ms exceeds the {args.startup_budget_ms:.0f} ms budget")
+        failed = True
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            failed = True
+        else:
+            print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.compare}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# Thread pool with a cap on outstanding work. LLM lookups past the cap are refused instead of queueing behind
+# calls whose callers have already given up, which would only spend Groq tokens and delay every later request.
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class BoundedExecutor:
+    # At most max_pending submitted calls are running or waiting for a worker at any time. try_submit returns
+    # None when the pool is full; callers cancel futures they stop waiting for so queued calls never start.
+
+    def __init__(self, max_workers: int, max_pending: Optional[int] = None, thread_name_prefix: str = ""):
+        self.max_workers = max_workers
+        self.max_pending = max_pending if max_pending is not None else 2 * max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.refused = 0
+        self.cancelled = 0
+
+    def try_submit(self, fn: Callable[..., Any], *args, **kwargs) -> Optional[Future]:
+        """Schedule fn(*args, **kwargs), or return None when max_pending calls are already outstanding."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.refused += 1
+                return None
+            self.pending += 1
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Future):
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled():
+                self.cancelled += 1
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "refused": self.refused,
+                "cancelled": self.cancelled
+            }
@@ -0,0 +1,203 @@
+# Offline bulk triage: streams JSONL records through MultiAgentOrchestrator and writes JSONL results.
+#
+#   python cli.py records.jsonl -o results.jsonl --workers 4
+#   cat records.jsonl | python cli.py > results.jsonl
+#   python cli.py records.jsonl -o results.jsonl --resume
+#
+# Each input line is a JSON object with "symptoms", "age" and "chronic_conditions". Each output line carries
+# the input "offset" (0-based line number) so an interrupted run can be resumed from where it stopped.
+import argparse
+import json
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from api_helpers import parse_analyze_request, parse_response_options, analyze_response_payload
+from knowledge_base import KnowledgeBase
+from logging_config import configure_logging, start_request
+from agents import MultiAgentOrchestrator
+from process_pool import ShardedExecutor, worker_orchestrator
+
+_orchestrator = None
+_options: Dict[str, Any] = {}
+
+
+def _init_worker(options: Dict[str, Any], orchestrator=None):
+    """Remember the options and the orchestrator this process analyzes with."""
+    global _orchestrator, _options
+    _orchestrator = orchestrator if orchestrator is not None else worker_orchestrator()
+    _options = options
+
+
+def read_records(stream: Iterable[str], start_offset: int = 0) -> Iterator[Tuple[int, str]]:
+    """Yield (offset, line) for every non-blank line at or after start_offset."""
+    for offset, line in enumerate(stream):
+        if offset < start_offset or not line.strip():
+            continue
+        yield offset, line
+
+
+def chunked(records: Iterator[Tuple[int, str]], size: int) -> Iterator[List[Tuple[int, str]]]:
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def process_chunk(chunk: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    """Parse, validate and analyze one chunk of records in the current process."""
+    start_request(f"offsets-{chunk[0][0]}-{chunk[-1][0]}")
+    field = _options.get("symptoms_field", "symptoms")
+    id_field = _options.get("id_field", "id")
+
+    parsed = []
+    for offset, line in chunk:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            parsed.append((offset, None, None, 'Invalid JSON'))
+            continue
+        if not isinstance(record, dict):
+            parsed.append((offset, None, None, 'Record must be a JSON object'))
+            continue
+        if field != "symptoms":
+            record = dict(record, symptoms=record.get(field, ''))
+        try:
+            params, error = parse_analyze_request(record)
+        except Exception as e:
+            params, error = None, f'Invalid record: {e}'
+        parsed.append((offset, record.get(id_field), params, error))
+
+    batch_results = iter(_orchestrator.process_batch(
+        [params for _, _, params, error in parsed if not error],
+        llm_concurrency=_options.get("llm_concurrency", 8)
+    ))
+
+    output = []
+    for offset, record_id, params, error in parsed:
+        if error:
+            payload = {'success': False, 'error': error}
+        else:
+            payload, _ = analyze_response_payload(next(batch_results), fields=_options.get("fields"),
+                                                  compact=_options.get("compact", False))
+        result = {'offset': offset}
+        if record_id is not None:
+            result['id'] = record_id
+        result.update(payload)
+        output.append(result)
+    return output
+
+
+def run(stream: Iterable[str], out, knowledge_base_path: str = "knowledge_base.json", workers: int = 1,
+        chunk_size: int = 64, start_offset: int = 0, options: Optional[Dict[str, Any]] = None,
+        scoring_engine: str = "index") -> int:
+    """Stream records from stream to out. Returns the number of results written."""
+    options = options or {}
+    chunks = chunked(read_records(stream, start_offset), chunk_size)
+
+    # Parsed once here; worker processes inherit it instead of re-reading the JSON
+    knowledge_base = KnowledgeBase.load(knowledge_base_path)
+    orchestrator_options = {"llm_latency_budget": None, "scoring_engine": scoring_engine}
+
+    written = 0
+    if workers > 1:
+        with ShardedExecutor(knowledge_base, workers, orchestrator_options,
+                             initializer=_init_worker, initargs=(options,)) as executor:
+            for results in executor.imap(process_chunk, chunks):
+                written += _write_results(out, results)
+    else:
+        _init_worker(options, MultiAgentOrchestrator(knowledge_base_path, knowledge_base=knowledge_base,
+                                                     **orchestrator_options))
+        for chunk in chunks:
+            written += _write_results(out, process_chunk(chunk))
+    return written
+
+
+def _write_results(out, results: List[Dict[str, Any]]) -> int:
+    for result in results:
+        out.write(json.dumps(result) + "\n")
+    out.flush()
+    return len(results)
+
+
+def last_written_offset(path: str) -> Tuple[Optional[int], int]:
+    """Offset of the last complete result in an existing output file, and the byte position just after it."""
+    last, end = None, 0
+    try:
+        with open(path, 'rb') as f:
+            position = 0
+            for line in f:
+                position += len(line)
+                try:
+                    last = json.loads(line)["offset"]
+                    end = position
+                except (ValueError, KeyError, TypeError):
+                    # A run killed mid-write can leave a truncated final line
+                    continue
+    except FileNotFoundError:
+        pass
+    return last, end
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk symptom triage over JSONL records.")
+    parser.add_argument("input", nargs="?", help="JSONL input file (default: stdin)")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("--knowledge-base", default="knowledge_base.json", help="Path to knowledge_base.json")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Records per unit of work")
+    parser.add_argument("--offset", type=int, default=0, help="Skip input lines before this 0-based offset")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue after the last offset already present in --output")
+    parser.add_argument("--symptoms-field", default="symptoms", help="Record field holding the symptom text")
+    parser.add_argument("--id-field", default="id", help="Record field copied to the output as 'id'")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="Concurrent Groq calls per chunk")
+    parser.add_argument("--scoring-engine", choices=("index", "matrix"), default="index",
+                        help="Rule-based scoring implementation")
+    parser.add_argument("--compact", action="store_true",
+                        help="Drop redundant result blocks and refer to static text by key (see GET /api/texts)")
+    parser.add_argument("--fields", help="Comma-separated result fields to keep, e.g. advice.emergency_alert")
+    args = parser.parse_args(argv)
+    # Logs go to stderr, leaving stdout for JSONL results
+    configure_logging()
+
+    start_offset = args.offset
+    if args.resume:
+        if not args.output:
+            parser.error("--resume requires --output")
+        last, end = last_written_offset(args.output)
+        if last is not None:
+            start_offset = max(start_offset, last + 1)
+            # Drop anything after the last complete result before appending
+            with open(args.output, 'r+b') as f:
+                f.truncate(end)
+
+    response_options, error = parse_response_options({"compact": args.compact, "fields": args.fields})
+    if error:
+        parser.error(error)
+
+    options = {
+        "symptoms_field": args.symptoms_field,
+        "id_field": args.id_field,
+        "llm_concurrency": args.llm_concurrency,
+        **response_options
+    }
+
+    source = open(args.input, 'r') if args.input else sys.stdin
+    out = open(args.output, 'a' if args.resume else 'w') if args.output else sys.stdout
+    try:
+        written = run(source, out, args.knowledge_base, args.workers, args.chunk_size, start_offset, options,
+                      args.scoring_engine)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Wrote {written} results (starting at offset {start_offset})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
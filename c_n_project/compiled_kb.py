@@ -0,0 +1,300 @@
+# Compact binary form of knowledge_base.json. Strings are interned into one table and referenced by integer
+# id; conditions, the symptom vocabulary and the condition index's postings are stored as flat offset
+# tables. The loader memory-maps the file, so startup does no JSON parsing. Conditions, strings and postings
+# are read from the mapping, so every process that loads the artifact shares them through the page cache.
+# Each process still decodes the symptom vocabulary and n-gram keys and builds the condition index's keyword
+# automaton on its own heap; those grow with the symptom vocabulary, not the number of conditions (about
+# 1.8 MB per process against a 13.5 MB artifact for 100,000 generated conditions).
+#
+#   python compiled_kb.py knowledge_base.json        # writes knowledge_base.kb next to it
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"SCKB"
+VERSION = 1
+
+# Sections, in file order. Tables of integers are native-endian uint32 arrays.
+SECTIONS = (
+    "string_offsets",          # start of each interned string in string_data, plus the end
+    "string_data",             # UTF-8
+    "conditions",              # per condition: name, severity, first symptom, recommendation, medicine ref
+    "symptom_refs",            # string id of each condition symptom as written
+    "symptom_ids",             # vocabulary id of each condition symptom, parallel to symptom_refs
+    "recommendation_refs",
+    "medicine_refs",
+    "vocabulary_refs",         # string id of each lowercased condition symptom, in vocabulary id order
+    "symptom_condition_offsets",
+    "symptom_conditions",      # condition positions listing each vocabulary symptom
+    "gram_refs",               # string id of each condition index n-gram
+    "gram_offsets",
+    "gram_symptoms",           # vocabulary ids containing each n-gram
+    "emergency_refs",
+)
+CONDITION_COLUMNS = 5
+
+_HEADER = struct.Struct("<4sHH")
+_SECTION = struct.Struct("<QQ")
+_ALIGNMENT = 8
+
+
+class CompiledFormatError(ValueError):
+    pass
+
+
+def compiled_path(json_path: str) -> str:
+    """Where the compiled artifact for a knowledge_base.json lives."""
+    return os.path.splitext(json_path)[0] + ".kb"
+
+
+def _uint32(values) -> bytes:
+    return array("I", values).tobytes()
+
+
+def compile_knowledge_base(data: Dict[str, Any]) -> bytes:
+    """Serialize parsed knowledge base JSON, including the condition index built from it."""
+    # Imported here because knowledge_base imports this module to load artifacts
+    from knowledge_base import KnowledgeBase
+
+    knowledge_base = KnowledgeBase(data)
+    vocabulary, symptom_conditions_by_id, gram_postings = knowledge_base.condition_index.tables()
+
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    conditions: List[int] = []
+    symptom_refs: List[int] = []
+    symptom_ids: List[int] = []
+    recommendation_refs: List[int] = []
+    medicine_refs: List[int] = []
+    for condition in knowledge_base.conditions:
+        conditions.extend((intern(condition.name), intern(condition.severity), len(symptom_refs),
+                           len(recommendation_refs), len(medicine_refs)))
+        symptom_refs.extend(intern(s) for s in condition.symptoms)
+        symptom_ids.extend(knowledge_base.condition_index.symptom_id(s) for s in condition.symptoms_lower)
+        recommendation_refs.extend(intern(r) for r in condition.recommendations)
+        medicine_refs.extend(intern(m) for m in condition.medicines)
+    # Sentinel row, so every condition's ranges end where the next one starts
+    conditions.extend((0, 0, len(symptom_refs), len(recommendation_refs), len(medicine_refs)))
+    emergency_refs = [intern(s) for s in knowledge_base.emergency_symptoms]
+    vocabulary_refs = [intern(s) for s in vocabulary]
+    grams = sorted(gram_postings)
+    gram_refs = [intern(gram) for gram in grams]
+
+    encoded = [s.encode("utf-8") for s in strings]
+    string_offsets = [0]
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+
+    symptom_condition_offsets, symptom_conditions = [0], []
+    for positions in symptom_conditions_by_id:
+        symptom_conditions.extend(positions)
+        symptom_condition_offsets.append(len(symptom_conditions))
+
+    gram_offsets, gram_symptoms = [0], []
+    for gram in grams:
+        gram_symptoms.extend(sorted(gram_postings[gram]))
+        gram_offsets.append(len(gram_symptoms))
+
+    sections = {
+        "string_offsets": _uint32(string_offsets),
+        "string_data": b"".join(encoded),
+        "conditions": _uint32(conditions),
+        "symptom_refs": _uint32(symptom_refs),
+        "symptom_ids": _uint32(symptom_ids),
+        "recommendation_refs": _uint32(recommendation_refs),
+        "medicine_refs": _uint32(medicine_refs),
+        "vocabulary_refs": _uint32(vocabulary_refs),
+        "symptom_condition_offsets": _uint32(symptom_condition_offsets),
+        "symptom_conditions": _uint32(symptom_conditions),
+        "gram_refs": _uint32(gram_refs),
+        "gram_offsets": _uint32(gram_offsets),
+        "gram_symptoms": _uint32(gram_symptoms),
+        "emergency_refs": _uint32(emergency_refs),
+    }
+
+    header_size = _HEADER.size + 1 + _SECTION.size * len(SECTIONS)
+    position = -(-header_size // _ALIGNMENT) * _ALIGNMENT
+    table, body = [], bytearray()
+    for name in SECTIONS:
+        payload = sections[name]
+        table.append(_SECTION.pack(position + len(body), len(payload)))
+        body += payload
+        body += b"\0" * (-len(body) % _ALIGNMENT)
+
+    header = _HEADER.pack(MAGIC, VERSION, len(SECTIONS)) + sys.byteorder[0].encode() + b"".join(table)
+    return header + b"\0" * (position - len(header)) + bytes(body)
+
+
+def write_compiled(json_path: str, output_path: Optional[str] = None) -> str:
+    """Compile a knowledge_base.json. The artifact is replaced atomically, so running loaders never see it half-written."""
+    output_path = output_path or compiled_path(json_path)
+    with open(json_path, "r") as f:
+        payload = compile_knowledge_base(json.load(f))
+
+    temporary_path = output_path + ".tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(payload)
+    os.replace(temporary_path, output_path)
+    return output_path
+
+
+class _OffsetTable:
+    # Row i of a flat table is values[offsets[i]:offsets[i + 1]]
+
+    __slots__ = ("offsets", "values")
+
+    def __init__(self, offsets: memoryview, values: memoryview):
+        self.offsets = offsets
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> memoryview:
+        return self.values[self.offsets[row]:self.offsets[row + 1]]
+
+
+class _GramPostings:
+    # Read-only dict-like view of the condition index's n-gram postings
+
+    __slots__ = ("_rows", "_postings")
+
+    def __init__(self, grams: Tuple[str, ...], postings: _OffsetTable):
+        self._rows = {gram: row for row, gram in enumerate(grams)}
+        self._postings = postings
+
+    def get(self, gram: str, default=None):
+        row = self._rows.get(gram)
+        return default if row is None else self._postings[row]
+
+
+class CompiledConditions(Sequence):
+    # Conditions decoded from the artifact on first access; recently used ones are kept as ConditionRecords
+
+    CACHE_SIZE = 4096
+
+    def __init__(self, compiled: "CompiledKnowledgeBase"):
+        self._compiled = compiled
+        self._rows = compiled.table("conditions")
+        self._count = len(self._rows) // CONDITION_COLUMNS - 1
+        self._record = lru_cache(maxsize=self.CACHE_SIZE)(self._decode)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("condition position out of range")
+        return self._record(position)
+
+    def __iter__(self) -> Iterator:
+        return (self._record(position) for position in range(self._count))
+
+    def symptom_counts(self) -> array:
+        """Number of symptoms of every condition, without decoding them."""
+        starts = self._rows[2::CONDITION_COLUMNS]
+        return array("I", (starts[i + 1] - starts[i] for i in range(self._count)))
+
+    def _decode(self, position: int):
+        from knowledge_base import ConditionRecord
+
+        compiled = self._compiled
+        row = position * CONDITION_COLUMNS
+        name, severity, symptoms, recommendations, medicines = self._rows[row:row + CONDITION_COLUMNS]
+        next_symptoms, next_recommendations, next_medicines = \
+            self._rows[row + CONDITION_COLUMNS + 2:row + 2 * CONDITION_COLUMNS]
+        symptom_ids = compiled.symptom_ids[symptoms:next_symptoms]
+        return ConditionRecord(
+            name=compiled.string(name),
+            symptoms=compiled.strings(compiled.symptom_refs[symptoms:next_symptoms]),
+            symptoms_lower=tuple(compiled.vocabulary[i] for i in symptom_ids),
+            severity=compiled.string(severity),
+            recommendations=compiled.strings(compiled.recommendation_refs[recommendations:next_recommendations]),
+            medicines=compiled.strings(compiled.medicine_refs[medicines:next_medicines])
+        )
+
+
+class CompiledKnowledgeBase:
+    # Memory-mapped view of a compiled artifact. Only the symptom vocabulary and n-gram keys are decoded up
+    # front, into per-process objects; everything else is read from the mapping when it is used.
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if len(self._view) < _HEADER.size + 1 + _SECTION.size * len(SECTIONS):
+            raise CompiledFormatError(f"{path} is truncated")
+
+        magic, version, section_count = _HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION or section_count != len(SECTIONS):
+            raise CompiledFormatError(f"{path} is not a version {VERSION} compiled knowledge base")
+        if self._view[_HEADER.size:_HEADER.size + 1].tobytes() != sys.byteorder[0].encode():
+            raise CompiledFormatError(f"{path} was compiled on a machine with a different byte order")
+
+        self._sections = {}
+        for number, name in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(self._view, _HEADER.size + 1 + number * _SECTION.size)
+            if offset + length > len(self._view):
+                raise CompiledFormatError(f"{path} is truncated")
+            self._sections[name] = self._view[offset:offset + length]
+
+        self._string_offsets = self.table("string_offsets")
+        self._string_data = self._sections["string_data"]
+        self.symptom_refs = self.table("symptom_refs")
+        self.symptom_ids = self.table("symptom_ids")
+        self.recommendation_refs = self.table("recommendation_refs")
+        self.medicine_refs = self.table("medicine_refs")
+
+        self.vocabulary = self.strings(self.table("vocabulary_refs"))
+        self.symptom_conditions = _OffsetTable(self.table("symptom_condition_offsets"),
+                                               self.table("symptom_conditions"))
+        self.grams = _GramPostings(self.strings(self.table("gram_refs")),
+                                   _OffsetTable(self.table("gram_offsets"), self.table("gram_symptoms")))
+        self.emergency_symptoms = self.strings(self.table("emergency_refs"))
+        self.conditions = CompiledConditions(self)
+
+    def __reduce__(self):
+        # Pickled (e.g. for spawned worker processes) as its path; the receiver maps the file itself
+        return CompiledKnowledgeBase, (self.path,)
+
+    def table(self, name: str) -> memoryview:
+        return self._sections[name].cast("I")
+
+    def string(self, string_id: int) -> str:
+        start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+        return str(self._string_data[start:end], "utf-8")
+
+    def strings(self, string_ids) -> Tuple[str, ...]:
+        return tuple(self.string(i) for i in string_ids)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile knowledge_base.json into a memory-mappable artifact.")
+    parser.add_argument("knowledge_base", nargs="?", default="knowledge_base.json", help="Path to knowledge_base.json")
+    parser.add_argument("-o", "--output", help="Artifact path (default: next to the JSON file, with a .kb suffix)")
+    args = parser.parse_args(argv)
+
+    output_path = write_compiled(args.knowledge_base, args.output)
+    print(f"Wrote {output_path} ({os.path.getsize(output_path)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
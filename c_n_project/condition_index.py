@@ -0,0 +1,110 @@
+# Inverted index from condition symptoms to the knowledge-base conditions that list them.
+from typing import Dict, Iterable, List, Sequence, Set
+
+from keyword_automaton import KeywordAutomaton
+
+
+class ConditionIndex:
+    # Answers the condition mapper's "cs in symptom or symptom in cs" test for every condition at once.
+    # Condition symptoms contained in a user symptom are found with a keyword automaton, and user symptoms
+    # contained in a condition symptom are found through an n-gram posting index, so only candidate
+    # conditions are ever looked at.
+
+    GRAM_SIZE = 3
+
+    def __init__(self, condition_symptoms: Iterable[Iterable[str]]):
+        # condition_symptoms holds the lowercased symptom list of each condition, in knowledge base order
+        self.condition_symptoms: List[str] = []
+        self._symptom_ids: Dict[str, int] = {}
+        self._symptom_conditions: List[List[int]] = []
+        self._grams: Dict[str, Set[int]] = {}
+
+        for position, symptoms in enumerate(condition_symptoms):
+            for symptom in symptoms:
+                symptom_id = self._add_symptom(symptom)
+                if position not in self._symptom_conditions[symptom_id]:
+                    self._symptom_conditions[symptom_id].append(position)
+
+        self._finish()
+
+    @classmethod
+    def from_tables(cls, condition_symptoms: Sequence[str], symptom_conditions: Sequence[Iterable[int]],
+                    grams) -> "ConditionIndex":
+        """Rebuild an index from tables() output, e.g. read from a compiled knowledge base.
+
+        symptom_conditions is indexed by symptom id and grams needs only a dict-style get(gram, default);
+        their rows may be any sized iterables of ints.
+        """
+        index = cls.__new__(cls)
+        index.condition_symptoms = list(condition_symptoms)
+        index._symptom_ids = {symptom: symptom_id for symptom_id, symptom in enumerate(index.condition_symptoms)}
+        index._symptom_conditions = symptom_conditions
+        index._grams = grams
+        index._finish()
+        return index
+
+    def _finish(self):
+        # Built in every process, also for a compiled knowledge base; its size follows the vocabulary
+        self._empty_ids = {self._symptom_ids[""]} if "" in self._symptom_ids else set()
+        self._contained = KeywordAutomaton(self.condition_symptoms)
+
+    def tables(self):
+        """The symptom vocabulary, the condition positions of each symptom id, and the n-gram postings."""
+        return self.condition_symptoms, self._symptom_conditions, self._grams
+
+    def _add_symptom(self, symptom: str) -> int:
+        """Register a lowercased condition symptom and index all of its short n-grams."""
+        if symptom in self._symptom_ids:
+            return self._symptom_ids[symptom]
+
+        symptom_id = len(self.condition_symptoms)
+        self._symptom_ids[symptom] = symptom_id
+        self.condition_symptoms.append(symptom)
+        self._symptom_conditions.append([])
+
+        # Grams of every length up to GRAM_SIZE, so short user symptoms resolve with a single lookup
+        for size in range(1, self.GRAM_SIZE + 1):
+            for start in range(len(symptom) - size + 1):
+                self._grams.setdefault(symptom[start:start + size], set()).add(symptom_id)
+
+        return symptom_id
+
+    def symptom_id(self, symptom: str) -> int:
+        """Id of a lowercased condition symptom, which is its position in condition_symptoms."""
+        return self._symptom_ids[symptom]
+
+    def related_symptom_ids(self, symptom: str) -> Set[int]:
+        """Ids of condition symptoms cs for which cs in symptom or symptom in cs."""
+        if not symptom:
+            return set(range(len(self.condition_symptoms)))
+
+        related = {self._symptom_ids[cs] for cs in self._contained.find(symptom)}
+        related.update(self._empty_ids)
+
+        if len(symptom) <= self.GRAM_SIZE:
+            related.update(self._grams.get(symptom, ()))
+            return related
+
+        grams = [symptom[start:start + self.GRAM_SIZE] for start in range(len(symptom) - self.GRAM_SIZE + 1)]
+        postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+
+        related.update(i for i in candidates if symptom in self.condition_symptoms[i])
+        return related
+
+    def related_positions(self, symptom: str) -> Set[int]:
+        """Positions of the conditions with a symptom cs for which cs in symptom or symptom in cs."""
+        positions = set()
+        for symptom_id in self.related_symptom_ids(symptom):
+            positions.update(self._symptom_conditions[symptom_id])
+        return positions
+
+    def match(self, symptoms: List[str]) -> Dict[int, List[str]]:
+        """Map condition positions to the (lowercased) user symptoms that match them, in input order."""
+        matched: Dict[int, List[str]] = {}
+
+        for symptom in symptoms:
+            for position in self.related_positions(symptom):
+                matched.setdefault(position, []).append(symptom)
+
+        return matched
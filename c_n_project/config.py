@@ -0,0 +1,114 @@
+# Service settings read from the environment (and .env). The development server, the WSGI entry point and
+# gunicorn.conf.py all read them here, so every way of serving the app is tuned by the same variables.
+import os
+from typing import Any, Dict, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+class Settings(NamedTuple):
+    host: str
+    port: int
+    debug: bool
+
+    # Pre-fork server (gunicorn.conf.py)
+    workers: int
+    threads: int
+    worker_timeout: int
+    graceful_timeout: int
+
+    # Orchestrator
+    result_cache_size: int
+    result_cache_ttl: float
+    llm_cache_size: int
+    llm_cache_ttl: float
+    llm_latency_budget: Optional[float]
+    llm_max_workers: int
+    llm_max_pending: int
+    scoring_engine: str
+
+    # Upper bounds for /api/analyze/batch requests
+    batch_max_items: int
+    batch_llm_concurrency: int
+
+    # Poll knowledge_base.json for content updates (seconds, 0 disables)
+    knowledge_base_watch_interval: float
+
+    # Admission control for the analyze endpoints, per process (0 disables a limit)
+    rate_limit_per_minute: float
+    rate_limit_burst: float
+    max_in_flight: int
+    llm_max_in_flight: int
+    overload_retry_after: int
+    # Reverse proxies in front of the app whose X-Forwarded-For entries are trusted (0: use the peer address)
+    trusted_proxies: int
+
+    def orchestrator_options(self) -> Dict[str, Any]:
+        """Keyword arguments for MultiAgentOrchestrator."""
+        return {
+            "cache_size": self.result_cache_size,
+            "cache_ttl": self.result_cache_ttl,
+            "llm_cache_size": self.llm_cache_size,
+            "llm_cache_ttl": self.llm_cache_ttl,
+            "llm_latency_budget": self.llm_latency_budget,
+            "llm_max_workers": self.llm_max_workers,
+            "llm_max_pending": self.llm_max_pending,
+            "scoring_engine": self.scoring_engine
+        }
+
+    def admission_options(self) -> Dict[str, Any]:
+        """Keyword arguments for AdmissionController."""
+        return {
+            "rate_per_minute": self.rate_limit_per_minute,
+            "burst": self.rate_limit_burst,
+            "max_in_flight": self.max_in_flight,
+            "llm_max_in_flight": self.llm_max_in_flight,
+            "retry_after": self.overload_retry_after
+        }
+
+
+def load_settings() -> Settings:
+    load_dotenv()
+
+    # 0 or less waits for the LLM without a deadline
+    llm_budget_ms = float(os.getenv('LLM_LATENCY_BUDGET_MS', 800))
+    # Rule-based work holds the GIL, so processes scale it; threads cover requests waiting on Groq
+    workers = int(os.getenv('WEB_CONCURRENCY', 0)) or os.cpu_count() or 1
+    threads = max(1, int(os.getenv('WEB_THREADS', 8)))
+    llm_max_workers = int(os.getenv('LLM_MAX_WORKERS', 16))
+    # A gthread worker never has more than WEB_THREADS requests in flight, so the admission limits default
+    # below it: past half the threads requests skip the LLM, and one thread stays free to turn requests away
+    max_in_flight = int(os.getenv('MAX_IN_FLIGHT', max(1, threads - 1)))
+    llm_max_in_flight = int(os.getenv('LLM_MAX_IN_FLIGHT', max(1, threads // 2)))
+
+    return Settings(
+        host=os.getenv('HOST', '0.0.0.0'),
+        port=int(os.getenv('PORT', 5000)),
+        debug=_flag('FLASK_DEBUG', 'False'),
+        workers=max(1, workers),
+        threads=threads,
+        worker_timeout=int(os.getenv('WEB_TIMEOUT', 30)),
+        graceful_timeout=int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30)),
+        result_cache_size=int(os.getenv('RESULT_CACHE_SIZE', 1024)),
+        result_cache_ttl=float(os.getenv('RESULT_CACHE_TTL', 300)),
+        llm_cache_size=int(os.getenv('LLM_CACHE_SIZE', 1024)),
+        llm_cache_ttl=float(os.getenv('LLM_CACHE_TTL', 3600)),
+        llm_latency_budget=llm_budget_ms / 1000 if llm_budget_ms > 0 else None,
+        llm_max_workers=llm_max_workers,
+        # Calls running or queued for a worker; past this, requests skip the LLM instead of queueing
+        llm_max_pending=int(os.getenv('LLM_MAX_PENDING', 2 * llm_max_workers)),
+        scoring_engine=os.getenv('SCORING_ENGINE', 'index'),
+        batch_max_items=int(os.getenv('BATCH_MAX_ITEMS', 1000)),
+        batch_llm_concurrency=int(os.getenv('BATCH_LLM_CONCURRENCY', 8)),
+        knowledge_base_watch_interval=float(os.getenv('KNOWLEDGE_BASE_WATCH_INTERVAL', '0')),
+        rate_limit_per_minute=float(os.getenv('RATE_LIMIT_PER_MINUTE', 60)),
+        rate_limit_burst=float(os.getenv('RATE_LIMIT_BURST', 20)),
+        max_in_flight=max_in_flight,
+        llm_max_in_flight=llm_max_in_flight,
+        overload_retry_after=int(os.getenv('OVERLOAD_RETRY_AFTER', 1)),
+        trusted_proxies=max(0, int(os.getenv('TRUSTED_PROXIES', 0)))
+    )
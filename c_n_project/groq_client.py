@@ -0,0 +1,266 @@
+# Pooled HTTP client for the Groq chat completions API with bounded retries and a circuit breaker.
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from metrics import GROQ_REQUEST_DURATION
+
+DEFAULT_GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    # Opens after failure_threshold consecutive failures and rejects calls for reset_timeout seconds.
+    # After that a single trial call is let through (half-open); success closes the breaker again.
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            # A failed trial re-opens immediately; otherwise open once the threshold is crossed
+            if self._trial_in_progress or (self.opened_at is None and
+                                           self.consecutive_failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+            self._trial_in_progress = False
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "times_opened": self.times_opened
+        }
+
+
+class GroqClient:
+    # Reuses one requests.Session (keep-alive connection pool) for every call. Transient failures are
+    # retried with jittered exponential backoff; repeated failures open the circuit breaker so callers can
+    # fall back to rule-based analysis immediately instead of waiting on a degraded upstream. requests is
+    # only imported when the first call is made, so workers without an API key never load it.
+
+    def __init__(self, api_key: Optional[str], url: str = DEFAULT_GROQ_API_URL,
+                 connect_timeout: float = 3.0, read_timeout: float = 15.0, max_retries: int = 2,
+                 backoff_base: float = 0.25, backoff_max: float = 4.0, pool_size: int = 20,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        self.api_key = api_key
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def _http_session(self):
+        """The pooled requests.Session, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json"
+                    })
+                    self._session = session
+        return self._session
+
+    @classmethod
+    def from_env(cls) -> "GroqClient":
+        return cls(
+            api_key=os.getenv("GROQ_API_KEY"),
+            url=os.getenv("GROQ_API_URL", DEFAULT_GROQ_API_URL),
+            connect_timeout=float(os.getenv("GROQ_CONNECT_TIMEOUT", 3.0)),
+            read_timeout=float(os.getenv("GROQ_READ_TIMEOUT", 15.0)),
+            max_retries=int(os.getenv("GROQ_MAX_RETRIES", 2)),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("GROQ_BREAKER_THRESHOLD", 5)),
+                reset_timeout=float(os.getenv("GROQ_BREAKER_RESET", 30.0))
+            )
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def available(self) -> bool:
+        """True when an API key is set and the breaker is not open."""
+        return self.configured and self.circuit_breaker.state != "open"
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps workers that failed together from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def chat_completion(self, payload: Dict[str, Any]) -> str:
+        """POST a chat completion payload and return the first choice's message content."""
+        import requests
+
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError("Groq circuit breaker is open")
+
+        session = self._http_session()
+        started = time.perf_counter()
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = session.post(self.url, json=payload,
+                                             timeout=(self.connect_timeout, self.read_timeout))
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    retry_after = response.headers.get("Retry-After")
+                response.raise_for_status()
+                content = response.json()["choices"][0]["message"]["content"]
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = e
+            except requests.HTTPError as e:
+                last_error = e
+                if e.response is None or e.response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+            except Exception as e:
+                # Malformed responses are not worth retrying
+                last_error = e
+                break
+            else:
+                self.circuit_breaker.record_success()
+                GROQ_REQUEST_DURATION.observe(time.perf_counter() - started, outcome="success")
+                return content
+
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, retry_after))
+
+        self.circuit_breaker.record_failure()
+        GROQ_REQUEST_DURATION.observe(time.perf_counter() - started, outcome="failure")
+        raise last_error
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "configured": self.configured,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "max_retries": self.max_retries,
+            "circuit_breaker": self.circuit_breaker.get_status()
+        }
+
+
+class AsyncGroqClient:
+    # Asyncio counterpart of GroqClient for the async pipeline. Shares the sync client's configuration and
+    # circuit breaker, so both paths see the same upstream health. httpx is only imported when first used.
+
+    def __init__(self, client: GroqClient, pool_size: int = 100):
+        self.client = client
+        self.pool_size = pool_size
+        self._http = None
+
+    def _http_client(self):
+        if self._http is None:
+            import httpx
+
+            self._http = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.client.api_key}",
+                    "Content-Type": "application/json"
+                },
+                timeout=httpx.Timeout(self.client.read_timeout, connect=self.client.connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+        return self._http
+
+    async def chat_completion(self, payload: Dict[str, Any]) -> str:
+        """POST a chat completion payload and return the first choice's message content."""
+        import httpx
+
+        client = self.client
+        if not client.circuit_breaker.allow_request():
+            raise CircuitOpenError("Groq circuit breaker is open")
+
+        http = self._http_client()
+        started = time.perf_counter()
+        last_error: Optional[Exception] = None
+        for attempt in range(client.max_retries + 1):
+            retry_after = None
+            try:
+                response = await http.post(client.url, json=payload)
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    retry_after = response.headers.get("Retry-After")
+                response.raise_for_status()
+                content = response.json()["choices"][0]["message"]["content"]
+            except httpx.TransportError as e:
+                last_error = e
+            except httpx.HTTPStatusError as e:
+                last_error = e
+                if e.response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+            except Exception as e:
+                last_error = e
+                break
+            else:
+                client.circuit_breaker.record_success()
+                GROQ_REQUEST_DURATION.observe(time.perf_counter() - started, outcome="success")
+                return content
+
+            if attempt < client.max_retries:
+                await asyncio.sleep(client._backoff(attempt, retry_after))
+
+        client.circuit_breaker.record_failure()
+        GROQ_REQUEST_DURATION.observe(time.perf_counter() - started, outcome="failure")
+        raise last_error
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
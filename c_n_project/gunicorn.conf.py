@@ -0,0 +1,29 @@
+# gunicorn settings, taken from the same environment variables as the app (see config.py).
+#
+#   gunicorn -c gunicorn.conf.py wsgi:application
+import os
+
+from config import load_settings
+
+settings = load_settings()
+
+# Each worker holds its own copy of the knowledge base and a reload request reaches only one of them, so
+# unless configured otherwise every worker polls the file and reloads itself when it changes
+os.environ.setdefault("KNOWLEDGE_BASE_WATCH_INTERVAL", "5")
+
+bind = f"{settings.host}:{settings.port}"
+workers = settings.workers
+# Threads per worker serve requests waiting on Groq without tying up a process
+worker_class = "gthread"
+threads = settings.threads
+timeout = settings.worker_timeout
+graceful_timeout = settings.graceful_timeout
+# Build and warm the orchestrator once in the master; workers inherit it when they fork
+preload_app = True
+
+
+def post_worker_init(worker):
+    # Threads started in the master do not exist in its forks, so each worker starts its own
+    from app import start_background_tasks
+
+    start_background_tasks()
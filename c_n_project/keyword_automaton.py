@@ -0,0 +1,64 @@
+# Aho-Corasick keyword automaton used to find many literal keywords in a single pass over the text.
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class KeywordAutomaton:
+    # Finds every occurrence (including overlapping ones) of a fixed set of keywords. Built once, then each
+    # search costs one dict lookup per character of input no matter how many keywords are registered.
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted(set(k for k in keywords if k))
+        self._transitions, self._outputs = self._build(self.keywords)
+
+    def _build(self, keywords: List[str]) -> Tuple[List[Dict[str, int]], List[Tuple[str, ...]]]:
+        """Build the trie, failure links and the full transition table."""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Tuple[str, ...]] = [()]
+
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append(())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state] += (keyword,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        order = []
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+                outputs[next_state] += outputs[fail[next_state]]
+
+        # Fold the failure links into a complete transition table so searching never backtracks
+        transitions = [dict(edges) for edges in goto]
+        for state in order:
+            for char, target in transitions[fail[state]].items():
+                transitions[state].setdefault(char, target)
+
+        return transitions, outputs
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of keywords that occur anywhere in text."""
+        transitions = self._transitions
+        outputs = self._outputs
+        found = set()
+        state = 0
+
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+
+        return found
@@ -0,0 +1,177 @@
+# Shared, read-only view of knowledge_base.json. Parsed once and handed to every agent.
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+from compiled_kb import CompiledKnowledgeBase, compiled_path
+from condition_index import ConditionIndex
+from logging_config import get_logger
+
+logger = get_logger("knowledge_base")
+
+
+class ConditionRecord(NamedTuple):
+    name: str
+    symptoms: Tuple[str, ...]
+    symptoms_lower: Tuple[str, ...]
+    severity: str
+    recommendations: Tuple[str, ...]
+    medicines: Tuple[str, ...]
+
+
+class KnowledgeBase:
+    # Immutable knowledge base. Conditions are stored as compact tuples with their symptoms already
+    # lowercased, and the lookup tables the agents need are computed once here instead of per request.
+    # Built from parsed JSON, or from a memory-mapped compiled artifact (see compiled_kb.py).
+
+    def __init__(self, data: Dict[str, Any], path: Optional[str] = None, source_mtime: Optional[float] = None):
+        conditions = tuple(
+            ConditionRecord(
+                name=condition["name"],
+                symptoms=tuple(condition.get("symptoms", [])),
+                symptoms_lower=tuple(s.lower() for s in condition.get("symptoms", [])),
+                severity=condition.get("severity", "unknown"),
+                recommendations=tuple(condition.get("recommendations", [])),
+                medicines=tuple(condition.get("medicines", []))
+            )
+            for condition in data.get("conditions", [])
+        )
+        self._assign(
+            path, source_mtime, "json", conditions, tuple(len(c.symptoms) for c in conditions),
+            tuple(data.get("emergency_symptoms", [])), ConditionIndex(c.symptoms_lower for c in conditions)
+        )
+
+    @classmethod
+    def from_compiled(cls, compiled: CompiledKnowledgeBase, path: Optional[str] = None,
+                      source_mtime: Optional[float] = None) -> "KnowledgeBase":
+        """Knowledge base backed by a compiled artifact. Conditions are decoded from the mapping as they are used."""
+        knowledge_base = cls.__new__(cls)
+        knowledge_base._compiled = compiled
+        knowledge_base._assign(
+            path, source_mtime, "compiled", compiled.conditions, compiled.conditions.symptom_counts(),
+            compiled.emergency_symptoms,
+            ConditionIndex.from_tables(compiled.vocabulary, compiled.symptom_conditions, compiled.grams)
+        )
+        return knowledge_base
+
+    def __reduce_ex__(self, protocol):
+        # The memory-mapped tables cannot be pickled; send the artifact and rebuild from it on the other side
+        if self.source_format == "compiled":
+            return KnowledgeBase.from_compiled, (self._compiled, self.path, self.source_mtime)
+        return super().__reduce_ex__(protocol)
+
+    def _assign(self, path: Optional[str], source_mtime: Optional[float], source_format: str,
+                conditions: Sequence[ConditionRecord], symptom_counts: Sequence[int],
+                emergency_symptoms: Tuple[str, ...], condition_index: ConditionIndex):
+        self.path = path
+        self.source_mtime = source_mtime
+        self.source_format = source_format
+        self.loaded_at = time.time()
+        self.conditions = conditions
+        # Per condition, so scoring never has to decode a condition just to count its symptoms
+        self.symptom_counts = symptom_counts
+
+        self.emergency_symptoms = emergency_symptoms
+        # (original, lowercased) pairs so emergency checks never lowercase the table per request
+        self.emergency_lookup: Tuple[Tuple[str, str], ...] = tuple((s, s.lower()) for s in self.emergency_symptoms)
+
+        self.condition_index = condition_index
+
+    @classmethod
+    def load(cls, path: str, missing_ok: bool = True) -> "KnowledgeBase":
+        """Load and precompute the knowledge base stored at path.
+        
+        A compiled artifact next to the JSON file is memory-mapped instead when it is at least as new.
+        """
+        knowledge_base = cls._load_compiled(path)
+        if knowledge_base is not None:
+            return knowledge_base
+
+        try:
+            source_mtime = os.stat(path).st_mtime
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            if not missing_ok:
+                raise
+            logger.warning("Knowledge base file %s not found. Using empty knowledge base.", path)
+            data, source_mtime = {"conditions": [], "emergency_symptoms": []}, None
+
+        return cls(data, path, source_mtime)
+
+    @classmethod
+    def _load_compiled(cls, path: str) -> Optional["KnowledgeBase"]:
+        artifact = compiled_path(path)
+        try:
+            artifact_mtime = os.stat(artifact).st_mtime
+        except FileNotFoundError:
+            return None
+        try:
+            source_mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            source_mtime = None
+
+        if source_mtime is not None and source_mtime > artifact_mtime:
+            logger.warning("Compiled knowledge base %s is older than %s; loading the JSON instead", artifact, path)
+            return None
+        try:
+            compiled = CompiledKnowledgeBase(artifact)
+        except (OSError, ValueError) as e:
+            logger.warning("Cannot use compiled knowledge base %s (%s); loading the JSON instead", artifact, e)
+            return None
+        return cls.from_compiled(compiled, path, source_mtime if source_mtime is not None else artifact_mtime)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "format": self.source_format,
+            "conditions": len(self.conditions),
+            "emergency_symptoms": len(self.emergency_symptoms),
+            "source_mtime": self.source_mtime,
+            "loaded_at": self.loaded_at
+        }
+
+
+class KnowledgeBaseWatcher:
+    # Background thread that polls the knowledge base file's mtime and calls on_change when it moves,
+    # so content updates are picked up without restarting the workers.
+
+    def __init__(self, path: str, on_change: Callable[[], Any], interval: float = 5.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._last_mtime = self._current_mtime()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def seen(self, mtime: Optional[float]):
+        """Record a file version that was loaded elsewhere (at startup or by a manual reload)."""
+        self._last_mtime = mtime
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="knowledge-base-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            mtime = self._current_mtime()
+            # A missing file is usually an editor or deploy mid-rename; wait for it to reappear
+            if mtime is None or mtime == self._last_mtime:
+                continue
+            self._last_mtime = mtime
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.error("Knowledge base reload failed: %s", e)
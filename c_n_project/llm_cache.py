@@ -0,0 +1,116 @@
+# Cache for parsed LLM answers that also coalesces concurrent identical calls into one upstream request.
+import asyncio
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ttl_cache import LRUTTLCache
+
+
+class _InFlightCall:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMResponseCache:
+    # Results are keyed by a hash of the canonical prompt. While one thread is fetching a key, other
+    # threads asking for the same key wait for that call and share its result instead of calling upstream.
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self._cache = LRUTTLCache(maxsize, ttl)
+        self._in_flight: Dict[str, _InFlightCall] = {}
+        # Async callers coalesce on futures owned by their own event loop
+        self._async_in_flight: Dict[Tuple[int, str], "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key_for(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any):
+        self._cache.set(key, value)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling fetch at most once across concurrent callers."""
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _InFlightCall()
+                self.upstream_calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fetch()
+            # Empty answers are shared with the current waiters but not cached; the next request asks again
+            if call.result:
+                self._cache.set(key, call.result)
+            return call.result
+        except BaseException as e:
+            # Failures are shared with the current waiters but never cached
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    async def aget_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of get_or_fetch for callers running on an event loop."""
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        future = self._async_in_flight.get(flight_key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = self._async_in_flight[flight_key] = loop.create_future()
+        # Mark failures as retrieved so a call nobody waited on does not log a warning
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.upstream_calls += 1
+
+        try:
+            result = await fetch()
+            if result:
+                self._cache.set(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._async_in_flight[flight_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._cache.get_stats()
+        stats["upstream_calls"] = self.upstream_calls
+        stats["coalesced"] = self.coalesced
+        stats["in_flight"] = len(self._in_flight) + len(self._async_in_flight)
+        return stats
@@ -0,0 +1,156 @@
+# Structured logging for the service. Records carry the current request ID and are written as JSON lines
+# (or plain text) by a background thread, so request threads only ever enqueue. Per-request DEBUG lines are
+# sampled: the decision is made once per request, so a sampled request logs its whole trace.
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from typing import Optional
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_debug_sampled: contextvars.ContextVar[bool] = contextvars.ContextVar("debug_sampled", default=True)
+
+_debug_sample_rate = 1.0
+_listener: Optional[logging.handlers.QueueListener] = None
+_settings = None
+
+# Attributes every LogRecord has; anything else was passed through extra= and is emitted as a field
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"symptom_checker.{name}")
+
+
+def start_request(request_id: Optional[str] = None) -> str:
+    """Bind a request ID to the current context and decide whether its DEBUG lines are sampled."""
+    request_id = request_id or uuid.uuid4().hex
+    _request_id.set(request_id)
+    _debug_sampled.set(_debug_sample_rate >= 1.0 or random.random() < _debug_sample_rate)
+    return request_id
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class RequestContextFilter(logging.Filter):
+    # Stamps records with the request ID and drops DEBUG lines for requests that were not sampled. Runs in
+    # the calling thread, where the request's context variables are visible.
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and not _debug_sampled.get():
+            return False
+        record.request_id = _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    # Never blocks the caller: when the queue is full the record is dropped and counted
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now, while the arguments are still current, but leave the
+        # formatting to the writer thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level: Optional[str] = None, debug_sample_rate: Optional[float] = None,
+                      log_format: Optional[str] = None, queue_size: Optional[int] = None):
+    """Route all logging through a bounded queue to a background writer on stderr. Safe to call twice."""
+    global _debug_sample_rate, _settings
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    _debug_sample_rate = float(debug_sample_rate if debug_sample_rate is not None
+                               else os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+    log_format = (log_format or os.getenv("LOG_FORMAT", "json")).lower()
+    queue_size = int(queue_size if queue_size is not None else os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    if _listener is not None:
+        logging.getLogger().setLevel(level)
+        return
+
+    _settings = (level, log_format, queue_size)
+    _install(*_settings)
+    atexit.register(_stop_listener)
+
+
+def _install(level: str, log_format: str, queue_size: int):
+    global _listener
+
+    output = logging.StreamHandler(sys.stderr)
+    if log_format == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    # httpx logs every upstream call at INFO; keep per-request lines out of INFO output
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _reinstall_after_fork():
+    # The writer thread does not survive fork, and the inherited queue may be mid-operation; give the child
+    # its own queue and writer
+    if _settings is not None:
+        _install(*_settings)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinstall_after_fork)
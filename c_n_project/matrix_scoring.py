@@ -0,0 +1,118 @@
+# Vectorized alternative to the condition mapper's index-based scoring. The knowledge base is encoded as a
+# sparse binary vocabulary x condition incidence matrix (CSR arrays: for each condition-symptom vocabulary
+# entry, the conditions listing it). A request's symptoms become sparse rows marking the vocabulary entries
+# each one relates to, and one sparse product, done as a gather over those arrays, gives for every user
+# symptom and every condition whether they match. A batch of requests is scored with one product over all of
+# their symptoms. Selected with ConditionMapperAgent(scoring_engine="matrix") or SCORING_ENGINE=matrix.
+import functools
+import itertools
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from knowledge_base import KnowledgeBase
+
+# (condition position, match count, match percentage, matched user symptoms in input order)
+ScoredCondition = Tuple[int, int, float, List[str]]
+
+
+class IncidenceMatrixScorer:
+    # Produces exactly the rankings of ConditionMapperAgent's index-based matching: a condition matches a
+    # user symptom when one of its symptoms contains it or is contained in it, match_score counts matching
+    # user symptoms, and ties keep knowledge base order.
+
+    # Requests scored per matrix product; bounds the size of the hit matrix for large batches
+    BATCH_CHUNK = 256
+    # User symptoms whose vocabulary rows are kept. They come from the analyzer's canonical terms, so a
+    # small cache covers nearly every request.
+    RELATED_CACHE_SIZE = 4096
+
+    def __init__(self, knowledge_base: KnowledgeBase, top_k: int = 5):
+        self.condition_index = knowledge_base.condition_index
+        self.top_k = top_k
+        self.condition_count = len(knowledge_base.conditions)
+
+        # The condition index already holds, per vocabulary entry, the deduplicated condition positions
+        _, symptom_conditions, _ = self.condition_index.tables()
+        lengths = np.fromiter((len(positions) for positions in symptom_conditions), dtype=np.int64,
+                              count=len(symptom_conditions))
+        self.incidence_indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.incidence_indptr[1:])
+        self.incidence_indices = np.fromiter(itertools.chain.from_iterable(symptom_conditions), dtype=np.int32,
+                                             count=int(self.incidence_indptr[-1]))
+        self.symptom_counts = np.array(knowledge_base.symptom_counts, dtype=np.float64)
+
+        # A user symptom's vocabulary row depends on substring tests against free text, so it cannot be
+        # tabulated up front; each distinct symptom is expanded once and reused
+        self._related = functools.lru_cache(maxsize=self.RELATED_CACHE_SIZE)(self._related_ids)
+
+    def _related_ids(self, symptom: str) -> np.ndarray:
+        """Sorted ids of the condition-vocabulary entries a lowercased user symptom relates to."""
+        return np.array(sorted(self.condition_index.related_symptom_ids(symptom)), dtype=np.int64)
+
+    def _hits(self, symptoms: Sequence[str]) -> np.ndarray:
+        """hits[u, c]: user symptom u matches condition c."""
+        related = [self._related(symptom) for symptom in symptoms]
+        vocabulary_ids = np.concatenate(related)
+        owners = np.repeat(np.arange(len(symptoms)), [len(ids) for ids in related])
+
+        # Gather the incidence rows of every (user symptom, vocabulary entry) pair
+        starts = self.incidence_indptr[vocabulary_ids]
+        spans = self.incidence_indptr[vocabulary_ids + 1] - starts
+        offsets = np.arange(int(spans.sum())) + np.repeat(starts - (np.cumsum(spans) - spans), spans)
+
+        hits = np.zeros((len(symptoms), self.condition_count), dtype=bool)
+        hits[np.repeat(owners, spans), self.incidence_indices[offsets]] = True
+        return hits
+
+    def score(self, symptoms: Sequence[str]) -> List[ScoredCondition]:
+        """Top conditions for one request's symptoms."""
+        return self.score_batch([symptoms])[0]
+
+    def score_batch(self, batch: Sequence[Sequence[str]]) -> List[List[ScoredCondition]]:
+        """Top conditions for each request in a batch, in batch order."""
+        results: List[List[ScoredCondition]] = []
+        for start in range(0, len(batch), self.BATCH_CHUNK):
+            results.extend(self._score_chunk(batch[start:start + self.BATCH_CHUNK]))
+        return results
+
+    def _score_chunk(self, batch: Sequence[Sequence[str]]) -> List[List[ScoredCondition]]:
+        lowered = [[s.lower() for s in symptoms] for symptoms in batch]
+        flat = [symptom for symptoms in lowered for symptom in symptoms]
+        if not flat or self.condition_count == 0:
+            return [[] for _ in batch]
+
+        hits = self._hits(flat)
+
+        results = []
+        start = 0
+        for symptoms in lowered:
+            end = start + len(symptoms)
+            results.append(self._rank(symptoms, hits[start:end]) if symptoms else [])
+            start = end
+        return results
+
+    def _rank(self, symptoms: List[str], hits: np.ndarray) -> List[ScoredCondition]:
+        matches = hits.sum(axis=0)
+        candidates = np.flatnonzero(matches)
+        if candidates.size == 0:
+            return []
+
+        counts = matches[candidates]
+        percentages = counts / np.maximum(self.symptom_counts[candidates], len(symptoms))
+
+        if candidates.size > self.top_k:
+            # Percentages are at most 1, so this orders by count first and percentage second. Everything
+            # tied with the k-th best is kept and the exact order below settles it.
+            key = counts + percentages / 2
+            best = np.argpartition(-key, self.top_k - 1)[:self.top_k]
+            keep = key >= key[best].min()
+            candidates, counts, percentages = candidates[keep], counts[keep], percentages[keep]
+
+        # Count, then percentage, descending; knowledge base order breaks ties
+        order = np.lexsort((candidates, -percentages, -counts))[:self.top_k]
+        return [
+            (int(candidates[i]), int(counts[i]), float(percentages[i]),
+             [symptoms[u] for u in np.flatnonzero(hits[:, candidates[i]])])
+            for i in order
+        ]
@@ -0,0 +1,171 @@
+# In-process metrics rendered in the Prometheus text exposition format. Counters and histograms are kept per
+# process under one lock each; the metric set is small and fixed, so no client library is needed.
+import bisect
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits (well under 1 ms) through slow Groq calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    rendered = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + rendered + "}" if rendered else ""
+
+
+class Counter:
+    # Monotonic count, optionally split by labels
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple([labels[name] for name in self.labelnames])
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple([labels[name] for name in self.labelnames])
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(zip(self.labelnames, key))} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    # Cumulative-bucket latency histogram, optionally split by labels
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts, sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple([labels[name] for name in self.labelnames])
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = sorted((key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items())
+        for key, (bucket_counts, total, count) in values:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} "
+                             f"{cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    # Holds every metric exposed at /metrics
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "symptom_checker_stage_duration_seconds", "Time spent in each pipeline stage.", ["stage"])
+GROQ_REQUEST_DURATION = REGISTRY.histogram(
+    "symptom_checker_groq_request_duration_seconds", "Time spent in Groq chat completion calls, retries included.",
+    ["outcome"])
+LLM_REQUESTS = REGISTRY.counter(
+    "symptom_checker_llm_requests_total",
+    "LLM enhancement attempts by outcome (success, failure, timeout, skipped).", ["outcome"])
+RESULT_CACHE_REQUESTS = REGISTRY.counter(
+    "symptom_checker_result_cache_requests_total", "Result cache lookups by result (hit, miss).", ["result"])
+EMERGENCY_DETECTIONS = REGISTRY.counter(
+    "symptom_checker_emergency_detections_total", "Requests whose advice raised an emergency alert, by level.",
+    ["level"])
+EMERGENCY_FAST_PATH = REGISTRY.counter(
+    "symptom_checker_emergency_fast_path_total",
+    "Requests answered without LLM enhancement because a critical emergency was detected first.")
+LOAD_SHED = REGISTRY.counter(
+    "symptom_checker_load_shed_total",
+    "Analyze requests shed under load, by action (llm: served without LLM enhancement, rate_limited, overloaded).",
+    ["action"])
+EMERGENCY_ADMISSIONS = REGISTRY.counter(
+    "symptom_checker_emergency_admissions_total",
+    "Critical emergencies admitted past a rate limit or the in-flight cap.")
+REQUESTS = REGISTRY.counter(
+    "symptom_checker_requests_total", "Processed symptom checks by outcome (success, error).", ["outcome"])
+
+
+class timed:
+    # Context manager recording the duration of its block under stage, and in milliseconds in timings when
+    # given. A class rather than a generator because it wraps every stage of every request.
+
+    __slots__ = ("stage", "timings", "started")
+
+    def __init__(self, stage: str, timings: Optional[Dict[str, float]] = None):
+        self.stage = stage
+        self.timings = timings
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        STAGE_DURATION.observe(elapsed, stage=self.stage)
+        if self.timings is not None:
+            self.timings[self.stage + "_ms"] = round(elapsed * 1000, 3)
+        return False
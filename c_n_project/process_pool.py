@@ -0,0 +1,100 @@
+# Process pool for batch and CLI work. Rule-based analysis is pure Python and holds the GIL, so scaling past
+# one core needs processes. The parent parses the knowledge base once; with the fork start method workers
+# inherit the already-built KnowledgeBase (conditions, n-gram index, automata) copy-on-write, and on platforms
+# without fork it is pickled to each worker once at startup. Only input chunks and result dicts are sent per task.
+import gc
+import multiprocessing
+import os
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from agents import MultiAgentOrchestrator
+from knowledge_base import KnowledgeBase
+
+_worker_orchestrator = None
+
+
+def _init_worker(knowledge_base: KnowledgeBase, orchestrator_options: Dict[str, Any],
+                 initializer: Optional[Callable], initargs: Sequence[Any]):
+    """Build this worker's orchestrator around the inherited knowledge base."""
+    global _worker_orchestrator
+    # Threads, locks, caches and HTTP sessions are per process; only the knowledge base is shared
+    _worker_orchestrator = MultiAgentOrchestrator(
+        knowledge_base.path or "knowledge_base.json", knowledge_base=knowledge_base, **orchestrator_options
+    )
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def worker_orchestrator():
+    """The orchestrator owned by the current worker process."""
+    return _worker_orchestrator
+
+
+def _process_inputs(inputs: List[Dict[str, Any]], llm_concurrency: int) -> List[Dict[str, Any]]:
+    return _worker_orchestrator.process_batch(inputs, llm_concurrency)
+
+
+class ShardedExecutor:
+    # Runs work on a pool of processes that each hold a MultiAgentOrchestrator sharing one parsed
+    # knowledge base. Results always come back in submission order.
+
+    def __init__(self, knowledge_base: KnowledgeBase, processes: Optional[int] = None,
+                 orchestrator_options: Optional[Dict[str, Any]] = None,
+                 initializer: Optional[Callable] = None, initargs: Sequence[Any] = ()):
+        self.processes = processes or os.cpu_count() or 1
+        start_methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in start_methods else None)
+        self.start_method = context.get_start_method()
+
+        # Move everything allocated so far, including the knowledge base, out of the collector's reach so
+        # collections in the workers do not write to (and so copy) the pages they inherited
+        gc.freeze()
+        try:
+            self._pool = context.Pool(
+                self.processes, initializer=_init_worker,
+                initargs=(knowledge_base, orchestrator_options or {}, initializer, tuple(initargs))
+            )
+        finally:
+            gc.unfreeze()
+
+    def imap(self, func: Callable, chunks: Iterable[Any], max_pending: Optional[int] = None) -> Iterator[Any]:
+        """Yield func(chunk) for each chunk in order, with at most max_pending chunks submitted at once.
+
+        func runs in a worker and must be a picklable module-level function; it can reach the worker's
+        orchestrator through worker_orchestrator().
+        """
+        # Pool.imap drains its input eagerly; submitting by hand keeps memory flat on long streams
+        max_pending = max_pending or self.processes * 2
+        pending = deque()
+        for chunk in chunks:
+            pending.append(self._pool.apply_async(func, (chunk,)))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def process_batch(self, inputs: List[Dict[str, Any]], chunk_size: int = 64,
+                      llm_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """MultiAgentOrchestrator.process_batch spread across the pool, in input order."""
+        chunks = (inputs[start:start + chunk_size] for start in range(0, len(inputs), chunk_size))
+        results: List[Dict[str, Any]] = []
+        for chunk_results in self.imap(partial(_process_inputs, llm_concurrency=llm_concurrency), chunks):
+            results.extend(chunk_results)
+        return results
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> "ShardedExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.terminate()
+            self._pool.join()
+
@@ -54,6 +54,12 @@ function handleFormSubmission(event, submitBtn) {
         return false;
     }
 
+    if (supportsStreaming()) {
+        event.preventDefault();
+        streamAnalysis(event.target, submitBtn);
+        return false;
+    }
+
     console.log('Form submitted successfully');
     setTimeout(() => {
         hideLoadingState(submitBtn);
@@ -416,9 +422,14 @@ function initializeAccessibility() {
     });
 }
 
+// API paths are relative to the application root, which is not "/" when the app is mounted under a prefix
+function apiUrl(path) {
+    return (document.body.dataset.scriptRoot || '') + path;
+}
+
 async function checkSystemStatus() {
     try {
-        const response = await fetch('/api/status');
+        const response = await fetch(apiUrl('/api/status'));
         const data = await response.json();
         
         if (data.success) {
@@ -437,7 +448,7 @@ async function checkSystemStatus() {
 
 async function analyzeSymptoms(symptomsData) {
     try {
-        const response = await fetch('/api/analyze', {
+        const response = await fetch(apiUrl('/api/analyze'), {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -459,6 +470,317 @@ async function analyzeSymptoms(symptomsData) {
 }
 
 
+// Progressive results: POST /api/analyze/stream answers with Server-Sent Events. The symptom analysis and
+// emergency screen arrive first, then rule-based conditions, then the full results once the LLM step is done.
+function supportsStreaming() {
+    return Boolean(window.fetch && window.ReadableStream && window.TextDecoder &&
+                   document.getElementById('stream-results'));
+}
+
+async function streamAnalysis(form, submitBtn) {
+    const container = document.getElementById('stream-results');
+    const formData = new FormData(form);
+    let received = false;
+
+    try {
+        const response = await fetch(apiUrl('/api/analyze/stream'), {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                symptoms: formData.get('symptoms') || '',
+                age: formData.get('age') || null,
+                chronic_conditions: formData.get('chronic_conditions') || ''
+            })
+        });
+
+        if (!response.ok) {
+            // The server answered, so posting the form again would fail the same way; when it is shedding
+            // load (429/503) a retry would only add to it
+            const data = await response.json().catch(() => ({}));
+            showNotification(streamErrorMessage(response, data), 'error');
+            hideLoadingState(submitBtn);
+            return;
+        }
+        if (!response.body) {
+            throw new Error('Streaming is not available');
+        }
+
+        container.replaceChildren();
+        container.hidden = false;
+
+        await readEventStream(response, function(event, data) {
+            received = true;
+            if (event === 'analysis') {
+                renderStreamedAnalysis(container, data);
+            } else if (event === 'conditions') {
+                renderConditions(container, data.rule_based_matches, { pending: true });
+            } else if (event === 'results') {
+                renderStreamedResults(container, data);
+            }
+        });
+        container.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    } catch (error) {
+        console.error('Streaming analysis failed:', error);
+        if (!received) {
+            // Nothing shown yet: fall back to the server-rendered results page
+            form.submit();
+            return;
+        }
+        showNotification('Analysis was interrupted. Please try again.', 'error');
+    }
+    hideLoadingState(submitBtn);
+}
+
+function streamErrorMessage(response, data) {
+    if (response.status === 429 || response.status === 503) {
+        const retryAfter = parseInt(response.headers.get('Retry-After'), 10);
+        const error = data.error || 'The service is busy; please retry shortly';
+        return retryAfter > 0 ? `${error} (in ${retryAfter}s).` : `${error}.`;
+    }
+    return data.error || 'Analysis failed. Please try again.';
+}
+
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            message.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            if (data) onEvent(event, JSON.parse(data));
+        }
+    }
+}
+
+function createElement(tag, className, text) {
+    const element = document.createElement(tag);
+    if (className) element.className = className;
+    if (text !== undefined) element.textContent = text;
+    return element;
+}
+
+function createCard(icon, title, id) {
+    const card = createElement('div', 'results-card');
+    if (id) card.id = id;
+    const header = createElement('div', 'card-header');
+    header.appendChild(createElement('i', `fas ${icon}`));
+    header.appendChild(createElement('h3', null, title));
+    card.appendChild(header);
+    const content = createElement('div', 'card-content');
+    card.appendChild(content);
+    return { card, header, content };
+}
+
+function createList(className, items) {
+    const list = createElement('ul', className);
+    (items || []).forEach(item => list.appendChild(createElement('li', null, item)));
+    return list;
+}
+
+function createTags(className, tagClass, items) {
+    const tags = createElement('div', className);
+    (items || []).forEach(item => tags.appendChild(createElement('span', tagClass, item)));
+    return tags;
+}
+
+function createSection(title, body) {
+    const section = createElement('div', 'analysis-item');
+    section.appendChild(createElement('strong', null, title));
+    section.appendChild(body);
+    return section;
+}
+
+function titleCase(text) {
+    return String(text).charAt(0).toUpperCase() + String(text).slice(1);
+}
+
+function renderStreamedAnalysis(container, data) {
+    const analyzed = data.analyzed_symptoms;
+    const emergency = data.emergency_alert;
+
+    if (emergency.emergency_detected) {
+        const alert = createElement('div', 'emergency-alert');
+        alert.id = 'stream-emergency';
+        const header = createElement('div', 'emergency-header');
+        header.appendChild(createElement('i', 'fas fa-exclamation-triangle'));
+        header.appendChild(createElement('h2', null, '⚠️ MEDICAL EMERGENCY DETECTED'));
+        alert.appendChild(header);
+
+        const content = createElement('div', 'emergency-content');
+        if (emergency.call_108) {
+            const call = createElement('div', 'call-108/112');
+            call.appendChild(createElement('i', 'fas fa-phone'));
+            call.appendChild(createElement('strong', null, 'CALL 108/112 IMMEDIATELY'));
+            content.appendChild(call);
+        }
+        emergency.emergency_messages.forEach(message => {
+            content.appendChild(createElement('p', 'emergency-message', message));
+        });
+        alert.appendChild(content);
+        container.appendChild(alert);
+    }
+
+    const { card, content } = createCard('fa-search', 'Symptom Analysis');
+    const input = createElement('p', 'user-input', analyzed.original_input);
+    content.appendChild(createSection('Original Input:', input));
+    content.appendChild(createSection('Identified Symptoms:',
+                                      createTags('symptom-tags', 'symptom-tag', analyzed.normalized_symptoms)));
+
+    const severity = analyzed.severity_indicators.detected_severity;
+    if (severity !== 'unknown') {
+        content.appendChild(createSection('Detected Severity:',
+                                          createElement('span', `severity-badge severity-${severity}`, titleCase(severity))));
+    }
+    container.appendChild(card);
+}
+
+function renderConditions(container, conditions, { pending = false, aiEnhanced = false } = {}) {
+    const existing = document.getElementById('stream-conditions');
+    if (!conditions || conditions.length === 0) {
+        if (existing) existing.remove();
+        return;
+    }
+
+    const { card, header, content } = createCard('fa-diagnoses', 'Potential Conditions', 'stream-conditions');
+    if (pending || aiEnhanced) {
+        const badge = createElement('span', 'ai-badge');
+        badge.appendChild(createElement('i', pending ? 'fas fa-spinner fa-spin' : 'fas fa-robot'));
+        badge.appendChild(document.createTextNode(pending ? ' Refining…' : ' AI Enhanced'));
+        header.appendChild(badge);
+    }
+
+    const list = createElement('div', 'conditions-list');
+    conditions.slice(0, 5).forEach(condition => {
+        const item = createElement('div', 'condition-item');
+        const itemHeader = createElement('div', 'condition-header');
+        itemHeader.appendChild(createElement('h4', 'condition-name', condition.condition));
+        const meta = createElement('div', 'condition-meta');
+        meta.appendChild(createElement('span', `severity-badge severity-${condition.severity}`, titleCase(condition.severity)));
+        // Rule-based matches have no combined score yet; without LLM input it equals the match score
+        const score = condition.combined_score !== undefined ? condition.combined_score : condition.match_score;
+        meta.appendChild(createElement('span', 'match-score', `Match: ${Math.round(score * 20)}%`));
+        itemHeader.appendChild(meta);
+        item.appendChild(itemHeader);
+
+        if (condition.matched_symptoms && condition.matched_symptoms.length) {
+            const matched = createElement('div', 'matched-symptoms');
+            matched.appendChild(createElement('strong', null, 'Matched Symptoms:'));
+            matched.appendChild(createTags('symptom-tags', 'symptom-tag matched', condition.matched_symptoms));
+            item.appendChild(matched);
+        }
+        if (condition.recommendations && condition.recommendations.length) {
+            const recommendations = createElement('div', 'condition-recommendations');
+            recommendations.appendChild(createElement('strong', null, 'Recommendations:'));
+            recommendations.appendChild(createList(null, condition.recommendations.slice(0, 3)));
+            item.appendChild(recommendations);
+        }
+        if (condition.medicines && condition.medicines.length) {
+            const medicines = createElement('div', 'condition-medicines');
+            medicines.appendChild(createElement('strong', null, 'Potential Treatments:'));
+            medicines.appendChild(createTags('medicine-tags', 'medicine-tag', condition.medicines.slice(0, 4)));
+            item.appendChild(medicines);
+        }
+        list.appendChild(item);
+    });
+    content.appendChild(list);
+
+    if (existing) {
+        existing.replaceWith(card);
+    } else {
+        container.appendChild(card);
+    }
+}
+
+function renderStreamedResults(container, payload) {
+    if (!payload.success) {
+        renderConditions(container, []);
+        const error = createElement('div', 'error-card');
+        error.appendChild(createElement('p', null, `Analysis failed: ${payload.error || 'Unknown error'}`));
+        container.appendChild(error);
+        return;
+    }
+
+    const conditions = payload.results.condition_mappings;
+    const advice = payload.results.advice;
+    renderConditions(container, conditions.combined_matches, { aiEnhanced: conditions.groq_api_used });
+
+    const emergencyAlert = document.getElementById('stream-emergency');
+    if (emergencyAlert && advice.recommendations.immediate_actions) {
+        const actions = createElement('div', 'emergency-actions');
+        actions.appendChild(createElement('h4', null, 'Immediate Actions:'));
+        actions.appendChild(createList(null, advice.recommendations.immediate_actions));
+        emergencyAlert.querySelector('.emergency-content').appendChild(actions);
+    }
+
+    if (!advice.emergency_alert.emergency_detected) {
+        const { card, content } = createCard('fa-lightbulb', 'Recommendations');
+        if (advice.recommendations.self_care && advice.recommendations.self_care.length) {
+            const section = createElement('div', 'recommendation-section');
+            section.appendChild(createElement('h4', null, 'Self-Care Measures'));
+            section.appendChild(createList('recommendation-list', advice.recommendations.self_care));
+            content.appendChild(section);
+        }
+        if (advice.recommendations.when_to_see_doctor && advice.recommendations.when_to_see_doctor.length) {
+            const section = createElement('div', 'recommendation-section');
+            section.appendChild(createElement('h4', null, 'Consider Medical Consultation'));
+            section.appendChild(createList('recommendation-list', advice.recommendations.when_to_see_doctor));
+            content.appendChild(section);
+        }
+        container.appendChild(card);
+    }
+
+    const medicines = advice.medicine_suggestions || {};
+    const medicineSections = [
+        ['over_the_counter', 'Over-the-Counter Options', 'medicine-tag otc'],
+        ['prescription_needed', 'Prescription Medications', 'medicine-tag prescription'],
+        ['natural_remedies', 'Natural Remedies', 'medicine-tag natural']
+    ].filter(([key]) => medicines[key] && medicines[key].length);
+    if (medicineSections.length) {
+        const { card, content } = createCard('fa-pills', 'Treatment Options');
+        medicineSections.forEach(([key, title, tagClass]) => {
+            const section = createElement('div', 'medicine-section');
+            section.appendChild(createElement('h4', null, title));
+            section.appendChild(createTags('medicine-tags', tagClass, medicines[key]));
+            content.appendChild(section);
+        });
+        container.appendChild(card);
+    }
+
+    const help = createCard('fa-hospital', 'When to Seek Medical Help');
+    help.content.appendChild(createList('help-list', advice.when_to_seek_help));
+    container.appendChild(help.card);
+
+    if (advice.general_advice && advice.general_advice.length) {
+        const general = createCard('fa-heart', 'General Health Advice');
+        general.content.appendChild(createList('advice-list', advice.general_advice));
+        container.appendChild(general.card);
+    }
+
+    const disclaimer = createElement('div', 'disclaimer-card');
+    const disclaimerHeader = createElement('div', 'disclaimer-header');
+    disclaimerHeader.appendChild(createElement('i', 'fas fa-exclamation-triangle'));
+    disclaimerHeader.appendChild(createElement('strong', null, 'Medical Disclaimer'));
+    disclaimer.appendChild(disclaimerHeader);
+    disclaimer.appendChild(createElement('p', null, advice.disclaimer));
+    container.appendChild(disclaimer);
+}
+
 function debounce(func, wait) {
     let timeout;
     return function executedFunction(...args) {
@@ -532,6 +854,7 @@ if (typeof module !== 'undefined' && module.exports) {
         validateSymptoms,
         validateAge,
         checkSystemStatus,
-        analyzeSymptoms
+        analyzeSymptoms,
+        readEventStream
     };
 }
\ No newline at end of file
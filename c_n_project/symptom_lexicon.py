@@ -0,0 +1,116 @@
+# Typo-tolerant lookup over the words the symptom analyzer and knowledge base know about. Words are compared
+# through a spelling key that folds common misspellings (doubled letters, "ch"/"ck"/"k", "y"/"i", a silent
+# final "e") together, and one-edit neighbours are precomputed, so a lookup is a few dict probes rather than
+# a comparison against every known word.
+import functools
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+_SPELLING_RULES = (
+    (re.compile(r"'"), ""),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"ck|ch|q"), "k"),
+    (re.compile(r"c(?=[eiy])"), "s"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"y"), "i"),
+    (re.compile(r"([^aeiou])\1+"), r"\1"),
+    (re.compile(r"(?<=...)e$"), ""),
+)
+
+
+def spelling_key(word: str) -> str:
+    """Fold a lowercased word to the form its common misspellings share."""
+    for pattern, replacement in _SPELLING_RULES:
+        word = pattern.sub(replacement, word)
+    return word
+
+
+def _deletions(key: str) -> List[str]:
+    # Edits to the last two letters mostly change inflection ("reduce"/"reduced"), not spelling
+    return [key[:i] + key[i + 1:] for i in range(1, len(key) - 2)]
+
+
+def _transpositions(key: str) -> List[str]:
+    return [key[:i] + key[i + 1] + key[i] + key[i + 2:] for i in range(1, len(key) - 3)]
+
+
+def _run_together(first: str, second: str) -> List[str]:
+    # Two words typed as one with the letters they share written once: "stomach ache" as "stomache". Plain
+    # concatenations ("chestpain") are left alone; the analyzer's patterns already match them as typed.
+    return [first + second[overlap:] for overlap in range(1, min(len(first), len(second)))
+            if first.endswith(second[:overlap])]
+
+
+class SymptomLexicon:
+    # Spelling correction for symptom text. Known words are never changed. An unknown word is corrected
+    # when it has the same spelling key as a known word, or (for longer words) is one missing, extra or
+    # swapped letter away from one. The first letter and the last two letters must agree; substitutions
+    # other than the folded ones are never made. This keeps real words from being read as symptoms
+    # ("strike" is not "stroke", "spelling" is not "swelling"). A two-word symptom run together with its shared
+    # letters written once is split back into the phrase first, so "stomache" reads "stomach ache", not "stomach".
+
+    MIN_LENGTH = 6
+    # Words at least this long may also be one edit away from their correction
+    MIN_EDIT_LENGTH = 7
+    # Corrections remembered per lexicon; user text repeats the same few misspellings
+    CACHE_SIZE = 4096
+
+    def __init__(self, terms: Iterable[str]):
+        self.words: Dict[str, int] = {}
+        self._keys: Dict[str, str] = {}
+        self._deleted_keys: Dict[str, str] = {}
+        self._phrases: Dict[str, str] = {}
+
+        for term in terms:
+            words = WORD_RE.findall(term.lower())
+            if len(words) == 2:
+                for spelling in _run_together(*words):
+                    self._phrases.setdefault(spelling, " ".join(words))
+            for word in words:
+                if word in self.words:
+                    continue
+                self.words[word] = len(self.words)
+                # Earlier terms win when two words share a key
+                key = spelling_key(word)
+                self._keys.setdefault(key, word)
+                if len(key) >= self.MIN_EDIT_LENGTH - 1:
+                    for deleted in _deletions(key):
+                        self._deleted_keys.setdefault(deleted, word)
+
+        self.correct = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._correct)
+
+    def _correct(self, word: str) -> Optional[str]:
+        """The known word or phrase a lowercased word most likely misspells, or None if it is known or unrecognized."""
+        if word in self.words or len(word) < self.MIN_LENGTH:
+            return None
+        if word in self._phrases:
+            return self._phrases[word]
+
+        key = spelling_key(word)
+        candidates = [self._keys.get(key)]
+        if len(word) >= self.MIN_EDIT_LENGTH:
+            # A letter missing from word, an extra letter in it, or two neighbouring letters swapped
+            candidates.append(self._deleted_keys.get(key))
+            candidates.extend(self._keys.get(variant) for variant in _deletions(key))
+            candidates.extend(self._keys.get(variant) for variant in _transpositions(key))
+
+        for candidate in candidates:
+            if candidate is not None and candidate[0] == word[0]:
+                return candidate
+        return None
+
+    def correct_text(self, text: str) -> Tuple[str, Dict[str, str]]:
+        """Replace misspelled words in lowercased text. Returns the corrected text and the corrections made."""
+        corrections: Dict[str, str] = {}
+
+        def replace(match):
+            word = match.group(0)
+            correction = self.correct(word)
+            if correction is None:
+                return word
+            corrections[word] = correction
+            return correction
+
+        return WORD_RE.sub(replace, text), corrections
@@ -0,0 +1,96 @@
+# Shared fixtures: the bundled knowledge base and a local stand-in for the Groq chat completions endpoint.
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from knowledge_base import KnowledgeBase
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VALID_ANSWER = json.dumps({"conditions": [
+    {"name": "Migraine", "confidence": 0.8, "reasoning": "Headache with nausea", "severity": "moderate"}
+]})
+
+
+class FakeGroq:
+    # Answers every POST with a chat completion whose message content is `content`, after `delay` seconds.
+    # A `status` other than 200 is returned with an empty body instead.
+
+    def __init__(self):
+        self.content = VALID_ANSWER
+        self.status = 200
+        self.delay = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake._lock:
+                    fake.calls += 1
+                time.sleep(fake.delay)
+                if fake.status != 200:
+                    self.send_response(fake.status)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps({"choices": [{"message": {"content": fake.content}}]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/openai/v1/chat/completions"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture(scope="session")
+def knowledge_base():
+    return KnowledgeBase.load(os.path.join(PROJECT_DIR, "knowledge_base.json"), missing_ok=False)
+
+
+@pytest.fixture(scope="session")
+def symptom_corpus():
+    # Free-text inputs with the symptoms and rule-based rankings the original regex extractor and all-pairs
+    # matcher produced for them
+    with open(os.path.join(PROJECT_DIR, "tests", "data", "symptom_corpus.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def fake_groq():
+    server = FakeGroq()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    # The Flask app with admission limits off, so tests are not rate limited by each other
+    import app
+    from admission import AdmissionController
+
+    monkeypatch.setattr(app, "admission", AdmissionController(rate_per_minute=0, max_in_flight=0,
+                                                              llm_max_in_flight=0))
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
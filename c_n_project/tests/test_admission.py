@@ -0,0 +1,144 @@
+import threading
+
+import pytest
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from admission import AdmissionController, RateLimiter
+
+CRITICAL = {"symptoms": "crushing chest pain and difficulty breathing"}
+ROUTINE = {"symptoms": "runny nose and sneezing"}
+
+
+def test_bucket_allows_burst_then_asks_to_wait():
+    limiter = RateLimiter(rate=1.0, burst=3)
+
+    assert [limiter.acquire("client") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("client") == pytest.approx(1.0, abs=0.01)
+    assert limiter.acquire("other") == 0.0
+
+
+def test_request_costing_more_than_burst_leaves_the_bucket_in_debt():
+    limiter = RateLimiter(rate=1.0, burst=5)
+
+    assert limiter.acquire("client", cost=10) == 0.0
+    # Five tokens of debt, plus the one the next request needs
+    assert limiter.acquire("client") == pytest.approx(6.0, abs=0.01)
+
+
+def test_in_flight_cap_turns_requests_away_until_a_slot_frees():
+    controller = AdmissionController(rate_per_minute=0, max_in_flight=2, llm_max_in_flight=0)
+    first, _ = controller.admit("a")
+    second, _ = controller.admit("b")
+
+    ticket, rejection = controller.admit("c")
+    assert ticket is None
+    assert (rejection.status, rejection.headers()) == (503, {"Retry-After": "1"})
+
+    first.release()
+    ticket, rejection = controller.admit("c")
+    assert rejection is None
+    for held in (second, ticket):
+        held.release()
+    assert controller.get_stats()["in_flight"] == 0
+
+
+def test_requests_past_the_llm_limit_skip_the_llm():
+    controller = AdmissionController(rate_per_minute=0, max_in_flight=0, llm_max_in_flight=1)
+
+    with controller.admit("a")[0] as first, controller.admit("b")[0] as second:
+        assert first.use_llm and not second.use_llm
+    assert controller.get_stats()["shed"]["llm"] == 1
+
+
+def test_emergency_check_runs_only_for_refused_requests():
+    controller = AdmissionController(rate_per_minute=60, burst=1, max_in_flight=0)
+    calls = []
+
+    def is_emergency():
+        calls.append(1)
+        return True
+
+    controller.admit("a", is_emergency)[0].release()
+    assert calls == []
+
+    ticket, rejection = controller.admit("a", is_emergency)
+    assert rejection is None and ticket.emergency
+    assert calls == [1]
+    assert controller.get_stats()["emergency_admitted"] == 1
+
+
+def test_concurrent_admissions_never_pass_the_cap():
+    controller = AdmissionController(rate_per_minute=0, max_in_flight=4, llm_max_in_flight=0)
+    barrier = threading.Barrier(32)
+    tickets = []
+
+    def admit():
+        barrier.wait()
+        tickets.append(controller.admit("a")[0])
+
+    threads = [threading.Thread(target=admit) for _ in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(ticket is not None for ticket in tickets) == 4
+    assert controller.get_stats()["peak_in_flight"] == 4
+
+
+def test_client_over_its_rate_gets_429_but_critical_emergencies_are_served(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "admission", AdmissionController(rate_per_minute=6, burst=2))
+
+    assert [client.post("/api/analyze", json=ROUTINE).status_code for _ in range(2)] == [200, 200]
+    response = client.post("/api/analyze", json=ROUTINE)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    assert client.post("/api/analyze", json=CRITICAL).status_code == 200
+    assert app_module.admission.get_stats()["emergency_admitted"] == 1
+
+
+def test_streamed_response_releases_its_slot(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "admission", AdmissionController(rate_per_minute=0, max_in_flight=1))
+
+    # As a WSGI server does once the last chunk is sent
+    response = client.post("/api/analyze/stream", json=ROUTINE)
+    assert "event: results" in response.get_data(as_text=True)
+    response.close()
+    assert app_module.admission.get_stats()["in_flight"] == 0
+
+    # A client that leaves before the first chunk: the server closes the response without iterating it
+    response = client.post("/api/analyze/stream", json=ROUTINE, buffered=False)
+    assert app_module.admission.get_stats()["in_flight"] == 1
+    response.close()
+    assert app_module.admission.get_stats()["in_flight"] == 0
+    assert client.post("/api/analyze/stream", json=ROUTINE).status_code == 200
+
+
+def test_trusted_proxy_address_is_the_rate_limited_client(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "admission", AdmissionController(rate_per_minute=6, burst=1))
+    monkeypatch.setattr(app_module.app, "wsgi_app", ProxyFix(app_module.app.wsgi_app, x_for=1))
+
+    def post(forwarded_for):
+        return client.post("/api/analyze", json=ROUTINE, headers={"X-Forwarded-For": forwarded_for}).status_code
+
+    assert post("203.0.113.1") == 200
+    assert post("203.0.113.2") == 200
+    # Only the address the trusted proxy appended counts; a spoofed first hop does not
+    assert post("198.51.100.7, 203.0.113.1") == 429
+
+
+@pytest.mark.parametrize("trusted_proxies, forwarded_for, expected", [
+    (0, b"203.0.113.1", "10.0.0.1"),
+    (1, b"198.51.100.7, 203.0.113.1", "203.0.113.1"),
+    (2, b"198.51.100.7, 203.0.113.1", "198.51.100.7"),
+    (2, b"203.0.113.1", "10.0.0.1"),
+    (1, None, "10.0.0.1"),
+])
+def test_asgi_client_address(monkeypatch, trusted_proxies, forwarded_for, expected):
+    import asgi
+
+    monkeypatch.setattr(asgi, "settings", asgi.settings._replace(trusted_proxies=trusted_proxies))
+    headers = {b"x-forwarded-for": forwarded_for} if forwarded_for is not None else {}
+
+    assert asgi._client_address({"client": ("10.0.0.1", 5000)}, headers) == expected
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+
+def asgi_post(application, path, body, content_type):
+    """POST through an ASGI application; returns (status, parsed JSON body)."""
+    messages = [{"type": "http.request", "body": body.encode("utf-8"), "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b"", "client": ("127.0.0.1", 1),
+             "headers": [(b"content-type", content_type.encode("ascii"))]}
+    asyncio.run(application(scope, receive, send))
+    body = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    return sent[0]["status"], json.loads(body)
+
+
+@pytest.mark.parametrize("path", ["/api/analyze", "/api/analyze/stream", "/api/analyze/batch"])
+@pytest.mark.parametrize("body, content_type", [
+    ('{"symptoms": ', "application/json"),
+    ("symptoms=headache", "application/x-www-form-urlencoded"),
+])
+def test_malformed_json_is_a_400_on_every_route(client, path, body, content_type):
+    response = client.post(path, data=body, content_type=content_type)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"success": False, "error": "Invalid JSON"}
+
+
+@pytest.mark.parametrize("body", ['{"symptoms": ', "", "[1, 2]", '{"symptoms": 5}'])
+def test_wsgi_and_asgi_reject_bad_bodies_alike(client, app_module, monkeypatch, body):
+    import asgi
+
+    monkeypatch.setattr(asgi, "admission", app_module.admission)
+    response = client.post("/api/analyze", data=body, content_type="application/json")
+
+    assert asgi_post(asgi.application, "/api/analyze", body, "application/json") == \
+        (response.status_code, response.get_json())
+
+
+BATCH_INPUTS = ["headache and nausea", "runny nose and sneezing", "sore throat and fever", "stomach pain",
+                "headache and nausea"]
+
+
+def test_batch_results_follow_input_order(client):
+    items = [{"symptoms": symptoms, "age": 20 + i} for i, symptoms in enumerate(BATCH_INPUTS)]
+    response = client.post("/api/analyze/batch", json={"items": items})
+
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["results"]["analyzed_symptoms"]["original_input"] for result in results] == BATCH_INPUTS
+    assert [result["results"]["analyzed_symptoms"]["age"] for result in results] == [20, 21, 22, 23, 24]
+    for item, result in zip(items, results):
+        single = client.post("/api/analyze", json=item).get_json()
+        assert result["results"]["condition_mappings"] == single["results"]["condition_mappings"]
+
+
+def test_batch_reports_invalid_items_in_place(client):
+    items = [{"symptoms": "headache and nausea"}, {"symptoms": ""}, "headache", {"symptoms": "cough", "age": 400},
+             {"symptoms": "sore throat"}]
+    response = client.post("/api/analyze/batch", json={"items": items})
+
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["success"] for result in results] == [True, False, False, False, True]
+    assert [result["error"] for result in results[1:4]] == [
+        "Symptoms are required", "No data provided", "Please provide a valid age (0-150)"
+    ]
+    assert results[4]["results"]["analyzed_symptoms"]["original_input"] == "sore throat"
+
+
+def test_batch_over_the_item_limit_is_a_400(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "batch_max_items", 3)
+
+    assert client.post("/api/analyze/batch", json={"items": [{"symptoms": "cough"}] * 3}).status_code == 200
+    response = client.post("/api/analyze/batch", json={"items": [{"symptoms": "cough"}] * 4})
+    assert response.status_code == 400
+    assert response.get_json() == {"success": False, "error": "A batch may contain at most 3 items"}
+
+
+@pytest.mark.parametrize("body", [{}, {"items": []}, {"items": "headache"}])
+def test_batch_without_items_is_a_400(client, body):
+    response = client.post("/api/analyze/batch", json=body)
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "A non-empty items list is required"
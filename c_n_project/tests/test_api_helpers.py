@@ -0,0 +1,24 @@
+import pytest
+
+from api_helpers import parse_analyze_request
+
+
+def test_valid_request_is_parsed():
+    params, error = parse_analyze_request({"symptoms": " headache ", "age": "30", "chronic_conditions": ""})
+
+    assert error is None
+    assert params == {"user_input": "headache", "age": 30, "chronic_conditions": None}
+
+
+@pytest.mark.parametrize("data, error", [
+    (None, "No data provided"),
+    ({}, "No data provided"),
+    (["headache"], "The request body must be a JSON object"),
+    ("headache", "The request body must be a JSON object"),
+    ({"symptoms": 5}, "Symptoms and chronic conditions must be text"),
+    ({"symptoms": "headache", "chronic_conditions": ["asthma"]}, "Symptoms and chronic conditions must be text"),
+    ({"symptoms": "   "}, "Symptoms are required"),
+    ({"symptoms": "headache", "age": 200}, "Please provide a valid age (0-150)"),
+])
+def test_invalid_request_is_rejected(data, error):
+    assert parse_analyze_request(data) == (None, error)
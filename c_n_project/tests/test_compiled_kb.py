@@ -0,0 +1,43 @@
+# A compiled artifact must answer exactly like the JSON it was compiled from.
+import json
+import os
+
+import pytest
+
+from agents import MultiAgentOrchestrator
+from compiled_kb import write_compiled
+from groq_client import GroqClient
+from knowledge_base import KnowledgeBase
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def results_without_timings(orchestrator, corpus):
+    results = []
+    for case in corpus:
+        result = orchestrator.process_symptoms(case["input"], age=40, chronic_conditions="asthma")
+        result.pop("timings", None)
+        results.append(result)
+    return results
+
+
+@pytest.mark.parametrize("scoring_engine", ["index", "matrix"])
+def test_compiled_and_json_knowledge_bases_give_identical_results(tmp_path, symptom_corpus, scoring_engine):
+    with open(os.path.join(PROJECT_DIR, "knowledge_base.json"), "r") as f:
+        data = json.load(f)
+    path = tmp_path / "knowledge_base.json"
+    path.write_text(json.dumps(data))
+    write_compiled(str(path))
+
+    compiled = KnowledgeBase.load(str(path))
+    assert compiled.source_format == "compiled"
+
+    outputs = []
+    for knowledge_base in (KnowledgeBase(data), compiled):
+        orchestrator = MultiAgentOrchestrator(knowledge_base=knowledge_base, llm_client=GroqClient(None),
+                                              scoring_engine=scoring_engine)
+        outputs.append(results_without_timings(orchestrator, symptom_corpus))
+        orchestrator.llm_executor.shutdown(wait=False)
+
+    assert outputs[0] == outputs[1]
+    assert all(result["processing_success"] for result in outputs[1])
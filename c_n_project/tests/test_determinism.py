@@ -0,0 +1,40 @@
+# Advice and symptom lists must not depend on string hashing, so every worker process answers alike.
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs the corpus inputs without an LLM and prints the results, timings aside, as JSON in the order produced
+ANALYZE_SCRIPT = textwrap.dedent("""
+    import json, sys
+    from agents import MultiAgentOrchestrator
+    from groq_client import GroqClient
+    orchestrator = MultiAgentOrchestrator(llm_client=GroqClient(None))
+    results = []
+    for user_input in json.load(sys.stdin):
+        result = orchestrator.process_symptoms(user_input, 42, "asthma, diabetes")
+        result.pop("timings")
+        results.append(result)
+    print(json.dumps(results))
+""")
+
+
+def analyze_with_hash_seed(inputs, seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(seed))
+    env.pop("GROQ_API_KEY", None)
+    completed = subprocess.run([sys.executable, "-c", ANALYZE_SCRIPT], cwd=PROJECT_DIR, env=env,
+                               input=json.dumps(inputs), capture_output=True, text=True, check=True)
+    return completed.stdout
+
+
+def test_results_do_not_depend_on_the_hash_seed(symptom_corpus):
+    inputs = [case["input"] for case in symptom_corpus]
+
+    first = analyze_with_hash_seed(inputs, 1)
+    second = analyze_with_hash_seed(inputs, 2)
+
+    assert len(json.loads(first)) == len(inputs)
+    assert first == second
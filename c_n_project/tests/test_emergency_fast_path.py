@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from agents import MultiAgentOrchestrator
+from groq_client import CircuitBreaker, GroqClient
+
+CRITICAL = "crushing chest pain and difficulty breathing"
+ROUTINE = "headache and nausea"
+
+
+@pytest.fixture
+def orchestrator(knowledge_base, fake_groq):
+    client = GroqClient("test-key", url=fake_groq.url, max_retries=0,
+                        circuit_breaker=CircuitBreaker(failure_threshold=100))
+    return MultiAgentOrchestrator(knowledge_base=knowledge_base, llm_client=client, llm_latency_budget=None)
+
+
+def test_critical_emergency_skips_the_llm(orchestrator, fake_groq):
+    results = orchestrator.process_symptoms(CRITICAL)
+
+    assert fake_groq.calls == 0
+    assert results["advice"]["emergency_alert"]["emergency_level"] == "critical"
+    assert results["timings"]["emergency_fast_path"]
+    mappings = results["condition_mappings"]
+    assert mappings["llm_skipped"] and not mappings["groq_api_used"]
+    assert mappings["rule_based_matches"]
+    # The LLM is skipped on purpose, not shed, so the result is cached
+    assert orchestrator.process_symptoms(CRITICAL)["timings"]["result_cache_hit"]
+
+
+def test_non_critical_input_goes_to_the_llm(orchestrator, fake_groq):
+    results = orchestrator.process_symptoms(ROUTINE)
+
+    assert fake_groq.calls == 1
+    assert results["advice"]["emergency_alert"]["emergency_level"] != "critical"
+    assert not results["timings"]["emergency_fast_path"]
+    assert results["condition_mappings"]["groq_api_used"]
+
+
+def test_every_pipeline_takes_the_fast_path(orchestrator, fake_groq):
+    stages = list(orchestrator.stream_symptoms(CRITICAL))
+    batch = orchestrator.process_batch([{"user_input": CRITICAL, "age": 50}, {"user_input": ROUTINE}])
+    async_results = asyncio.run(orchestrator.aprocess_symptoms(CRITICAL, 60))
+
+    assert fake_groq.calls == 1
+    assert stages[-1][1]["condition_mappings"]["llm_skipped"]
+    assert batch[0]["condition_mappings"]["llm_skipped"]
+    assert batch[1]["condition_mappings"]["groq_api_used"]
+    assert async_results["condition_mappings"]["llm_skipped"]
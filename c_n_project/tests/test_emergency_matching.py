@@ -0,0 +1,39 @@
+# The advisor's emergency symptom lookup goes through a precomputed index; it must find exactly what a scan of
+# every (symptom, emergency symptom) pair with substring checks in both directions finds, in the same order.
+import pytest
+
+from agents import AdvisorAgent
+from knowledge_base import KnowledgeBase
+
+
+def scan(emergency_symptoms, symptoms):
+    found = []
+    for symptom in symptoms:
+        for emergency_symptom in emergency_symptoms:
+            if emergency_symptom.lower() in symptom.lower() or symptom.lower() in emergency_symptom.lower():
+                found.append(emergency_symptom)
+    return found
+
+
+def test_corpus_matches_pairwise_scan(knowledge_base, symptom_corpus):
+    advisor = AdvisorAgent(knowledge_base=knowledge_base)
+
+    for case in symptom_corpus:
+        symptoms = case["normalized_symptoms"]
+        assert advisor._check_emergency_symptoms(symptoms, {})["emergency_symptoms"] == \
+            scan(knowledge_base.emergency_symptoms, symptoms), case["input"]
+
+
+@pytest.mark.parametrize("symptoms", [
+    ["chest pain"],
+    ["Severe CHEST PAIN radiating"],
+    ["pain", "bleeding"],
+    [""],
+    ["headache"],
+])
+def test_duplicate_and_empty_emergency_symptoms(symptoms):
+    emergency_symptoms = ["Chest Pain", "chest pain", "", "pain", "Severe Bleeding"]
+    knowledge_base = KnowledgeBase({"conditions": [], "emergency_symptoms": emergency_symptoms})
+    advisor = AdvisorAgent(knowledge_base=knowledge_base)
+
+    assert advisor._check_emergency_symptoms(symptoms, {})["emergency_symptoms"] == scan(emergency_symptoms, symptoms)
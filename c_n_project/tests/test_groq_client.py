@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import requests
+
+from agents import ConditionMapperAgent, SymptomAnalyzerAgent
+from groq_client import AsyncGroqClient, CircuitBreaker, CircuitOpenError, GroqClient
+from llm_cache import LLMResponseCache
+
+PAYLOAD = {"model": "test", "messages": [{"role": "user", "content": "headache"}]}
+
+
+def make_client(fake_groq, max_retries=2, failure_threshold=100, reset_timeout=30.0):
+    # No backoff, so retries are counted rather than waited for
+    return GroqClient("test-key", url=fake_groq.url, max_retries=max_retries, backoff_base=0.0,
+                      circuit_breaker=CircuitBreaker(failure_threshold, reset_timeout))
+
+
+def test_server_errors_are_retried_up_to_max_retries(fake_groq):
+    client = make_client(fake_groq, max_retries=2)
+    fake_groq.status = 500
+
+    with pytest.raises(requests.HTTPError):
+        client.chat_completion(PAYLOAD)
+
+    assert fake_groq.calls == 3
+    assert client.circuit_breaker.consecutive_failures == 1
+
+
+def test_client_errors_are_not_retried(fake_groq):
+    client = make_client(fake_groq, max_retries=2)
+    fake_groq.status = 400
+
+    with pytest.raises(requests.HTTPError):
+        client.chat_completion(PAYLOAD)
+
+    assert fake_groq.calls == 1
+
+
+def test_retry_succeeds_once_the_server_recovers(fake_groq):
+    client = make_client(fake_groq, max_retries=2)
+    assert client.chat_completion(PAYLOAD) == fake_groq.content
+    assert client.circuit_breaker.consecutive_failures == 0
+
+
+def test_breaker_opens_after_threshold_and_recovers_after_cooldown(fake_groq):
+    client = make_client(fake_groq, max_retries=0, failure_threshold=3, reset_timeout=0.2)
+    breaker = client.circuit_breaker
+    fake_groq.status = 500
+
+    for _ in range(3):
+        assert breaker.state == "closed"
+        with pytest.raises(requests.HTTPError):
+            client.chat_completion(PAYLOAD)
+    assert breaker.state == "open" and not client.available()
+
+    # Open: rejected without reaching the server
+    with pytest.raises(CircuitOpenError):
+        client.chat_completion(PAYLOAD)
+    assert fake_groq.calls == 3
+
+    time.sleep(0.25)
+    assert breaker.state == "half_open" and client.available()
+
+    # A failed trial re-opens it straight away
+    with pytest.raises(requests.HTTPError):
+        client.chat_completion(PAYLOAD)
+    assert breaker.state == "open" and breaker.times_opened == 2
+
+    time.sleep(0.25)
+    fake_groq.status = 200
+    assert client.chat_completion(PAYLOAD) == fake_groq.content
+    assert breaker.state == "closed" and breaker.consecutive_failures == 0
+    assert fake_groq.calls == 5
+
+
+def test_half_open_breaker_lets_a_single_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+
+    assert [breaker.allow_request() for _ in range(3)] == [True, False, False]
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow_request()
+
+
+def test_async_client_shares_retries_and_breaker(fake_groq):
+    client = make_client(fake_groq, max_retries=1, failure_threshold=2)
+    async_client = AsyncGroqClient(client)
+    fake_groq.status = 500
+
+    async def run():
+        try:
+            for _ in range(2):
+                with pytest.raises(httpx.HTTPStatusError):
+                    await async_client.chat_completion(PAYLOAD)
+        finally:
+            await async_client.aclose()
+
+    asyncio.run(run())
+
+    assert fake_groq.calls == 4
+    assert client.circuit_breaker.state == "open"
+
+
+def test_mapper_falls_back_to_rule_based_while_breaker_is_open(knowledge_base, fake_groq):
+    client = make_client(fake_groq, max_retries=0, failure_threshold=1)
+    mapper = ConditionMapperAgent(knowledge_base=knowledge_base, llm_client=client,
+                                  llm_cache=LLMResponseCache(), llm_latency_budget=None)
+    analyzed = SymptomAnalyzerAgent(knowledge_base=knowledge_base).analyze_symptoms("headache and nausea")
+    fake_groq.status = 500
+
+    failed = mapper.map_conditions(analyzed)
+    skipped = mapper.map_conditions(analyzed)
+
+    assert fake_groq.calls == 1
+    for mappings in (failed, skipped):
+        assert mappings["llm_failed"] and not mappings["groq_api_used"]
+        assert mappings["rule_based_matches"]
@@ -0,0 +1,59 @@
+import time
+
+from agents import MultiAgentOrchestrator
+from groq_client import CircuitBreaker, GroqClient
+
+SYMPTOMS = "headache and nausea"
+
+
+def make_orchestrator(knowledge_base, fake_groq, llm_latency_budget):
+    client = GroqClient("test-key", url=fake_groq.url, max_retries=0,
+                        circuit_breaker=CircuitBreaker(failure_threshold=100))
+    return MultiAgentOrchestrator(knowledge_base=knowledge_base, llm_client=client,
+                                  llm_latency_budget=llm_latency_budget)
+
+
+def test_slow_llm_falls_back_to_rule_based_matches(knowledge_base, fake_groq):
+    orchestrator = make_orchestrator(knowledge_base, fake_groq, llm_latency_budget=0.1)
+    fake_groq.delay = 0.5
+
+    started = time.monotonic()
+    results = orchestrator.process_symptoms(SYMPTOMS)
+    elapsed = time.monotonic() - started
+
+    mappings = results["condition_mappings"]
+    assert results["processing_success"]
+    assert mappings["llm_timed_out"] and not mappings["groq_api_used"]
+    assert mappings["llm_enhanced_matches"] == []
+    assert mappings["rule_based_matches"]
+    assert mappings["combined_matches"]
+    assert elapsed < fake_groq.delay
+
+
+def test_timed_out_result_is_not_served_from_cache(knowledge_base, fake_groq):
+    orchestrator = make_orchestrator(knowledge_base, fake_groq, llm_latency_budget=0.1)
+    fake_groq.delay = 0.5
+
+    orchestrator.process_symptoms(SYMPTOMS)
+    repeated = orchestrator.process_symptoms(SYMPTOMS)
+
+    assert not repeated["timings"]["result_cache_hit"]
+    assert orchestrator.result_cache.get_stats()["size"] == 0
+
+    # The late answer lands in the LLM cache, so once it has arrived the same input is answered in full
+    time.sleep(fake_groq.delay + 0.1)
+    recovered = orchestrator.process_symptoms(SYMPTOMS)
+
+    assert fake_groq.calls == 1
+    assert recovered["condition_mappings"]["groq_api_used"]
+    assert not recovered["condition_mappings"]["llm_timed_out"]
+
+
+def test_llm_within_budget_is_used(knowledge_base, fake_groq):
+    orchestrator = make_orchestrator(knowledge_base, fake_groq, llm_latency_budget=2.0)
+    fake_groq.delay = 0.05
+
+    mappings = orchestrator.process_symptoms(SYMPTOMS)["condition_mappings"]
+
+    assert mappings["groq_api_used"] and not mappings["llm_timed_out"]
+    assert mappings["llm_enhanced_matches"][0]["name"] == "Migraine"
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents import ConditionMapperAgent, SymptomAnalyzerAgent
+from groq_client import CircuitBreaker, GroqClient
+from llm_cache import LLMResponseCache
+
+
+def make_mapper(knowledge_base, fake_groq, cache_ttl=3600.0):
+    client = GroqClient("test-key", url=fake_groq.url, max_retries=0,
+                        circuit_breaker=CircuitBreaker(failure_threshold=100))
+    return ConditionMapperAgent(knowledge_base=knowledge_base, llm_client=client,
+                                llm_cache=LLMResponseCache(ttl=cache_ttl), llm_latency_budget=None)
+
+
+@pytest.fixture
+def analyzed(knowledge_base):
+    return SymptomAnalyzerAgent(knowledge_base=knowledge_base).analyze_symptoms("headache and nausea")
+
+
+def test_repeated_lookup_is_served_from_cache(knowledge_base, fake_groq, analyzed):
+    mapper = make_mapper(knowledge_base, fake_groq)
+
+    first = mapper.map_conditions(analyzed)
+    second = mapper.map_conditions(analyzed)
+
+    assert fake_groq.calls == 1
+    assert first["llm_enhanced_matches"] == second["llm_enhanced_matches"]
+    assert second["llm_enhanced_matches"][0]["name"] == "Migraine"
+    assert mapper.llm_cache.get_stats()["hits"] == 1
+
+
+def test_concurrent_identical_lookups_are_coalesced(knowledge_base, fake_groq, analyzed):
+    mapper = make_mapper(knowledge_base, fake_groq)
+    fake_groq.delay = 0.3
+    results = []
+    barrier = threading.Barrier(8)
+
+    def lookup():
+        barrier.wait()
+        results.append(mapper._llm_enhanced_matching(analyzed))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake_groq.calls == 1
+    assert len(results) == 8 and all(result == results[0] for result in results)
+    assert mapper.llm_cache.get_stats()["coalesced"] == 7
+
+
+def test_expired_entry_is_fetched_again(knowledge_base, fake_groq, analyzed):
+    mapper = make_mapper(knowledge_base, fake_groq, cache_ttl=0.1)
+
+    mapper.map_conditions(analyzed)
+    time.sleep(0.15)
+    result = mapper.map_conditions(analyzed)
+
+    assert fake_groq.calls == 2
+    assert result["groq_api_used"]
+    assert mapper.llm_cache.get_stats()["expirations"] == 1
+
+
+@pytest.mark.parametrize("status, content", [
+    (500, None),
+    (200, "I am not able to answer that."),
+    (200, '{"conditions": "Migraine"}'),
+])
+def test_failed_lookup_is_not_cached(knowledge_base, fake_groq, analyzed, status, content):
+    mapper = make_mapper(knowledge_base, fake_groq)
+    valid_content = fake_groq.content
+    fake_groq.status = status
+    if content is not None:
+        fake_groq.content = content
+
+    failed = mapper.map_conditions(analyzed)
+
+    assert failed["llm_enhanced_matches"] == []
+    assert failed["llm_failed"]
+    assert mapper.llm_cache.get_stats()["size"] == 0
+
+    fake_groq.status = 200
+    fake_groq.content = valid_content
+    recovered = mapper.map_conditions(analyzed)
+
+    assert fake_groq.calls == 2
+    assert recovered["groq_api_used"] and not recovered["llm_failed"]
+
+
+def test_empty_answer_is_not_cached(knowledge_base, fake_groq, analyzed):
+    mapper = make_mapper(knowledge_base, fake_groq)
+    fake_groq.content = '{"conditions": []}'
+
+    mapper.map_conditions(analyzed)
+    mapper.map_conditions(analyzed)
+
+    assert fake_groq.calls == 2
+    assert mapper.llm_cache.get_stats()["size"] == 0
+
+
+def test_coalesced_waiters_share_a_failure(knowledge_base, fake_groq, analyzed):
+    mapper = make_mapper(knowledge_base, fake_groq)
+    fake_groq.delay = 0.3
+    fake_groq.status = 500
+    errors = []
+    barrier = threading.Barrier(4)
+
+    def lookup():
+        barrier.wait()
+        try:
+            mapper._llm_enhanced_matching(analyzed)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookup) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake_groq.calls == 1
+    assert len(errors) == 4
+
+
+def test_async_lookups_are_coalesced_and_cached():
+    cache = LLMResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [{"name": "Influenza"}]
+
+    async def run():
+        results = await asyncio.gather(*[cache.aget_or_fetch("key", fetch) for _ in range(5)])
+        results.append(await cache.aget_or_fetch("key", fetch))
+        return results
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result == [{"name": "Influenza"}] for result in results)
+    assert cache.get_stats()["coalesced"] == 4
@@ -0,0 +1,27 @@
+import benchmark
+from agents import ConditionMapperAgent, SymptomAnalyzerAgent
+from groq_client import GroqClient
+from knowledge_base import KnowledgeBase
+from matrix_scoring import IncidenceMatrixScorer
+
+
+def test_engines_agree_on_a_large_generated_knowledge_base():
+    knowledge_base = KnowledgeBase(benchmark.generate_knowledge_base(2000, seed=1))
+    analyzer = SymptomAnalyzerAgent(knowledge_base=knowledge_base)
+    batch = [analyzer.analyze_symptoms(**item)["normalized_symptoms"] for item in benchmark.generate_inputs(300, 2)]
+    index = ConditionMapperAgent(knowledge_base=knowledge_base, llm_client=GroqClient(None))
+    scorer = IncidenceMatrixScorer(knowledge_base)
+
+    expected = [index._rule_based_matching(symptoms) for symptoms in batch]
+
+    assert [index._condition_scores(scored) for scored in scorer.score_batch(batch)] == expected
+    assert [index._condition_scores(scorer.score(symptoms)) for symptoms in batch] == expected
+    index.llm_executor.shutdown(wait=False)
+
+
+def test_incidence_is_stored_sparse():
+    knowledge_base = KnowledgeBase(benchmark.generate_knowledge_base(2000, seed=1))
+    scorer = IncidenceMatrixScorer(knowledge_base)
+
+    # One entry per distinct (condition, symptom) pair, not vocabulary x conditions
+    assert scorer.incidence_indices.size == sum(len(set(c.symptoms_lower)) for c in knowledge_base.conditions)
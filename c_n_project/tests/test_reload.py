@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+from agents import MultiAgentOrchestrator
+from groq_client import GroqClient
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NEW_CONDITION = {"name": "Test Condition", "symptoms": ["nasal discharge"], "severity": "mild"}
+
+
+@pytest.fixture
+def kb_data():
+    with open(os.path.join(PROJECT_DIR, "knowledge_base.json"), "r") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def kb_path(tmp_path, kb_data):
+    path = tmp_path / "knowledge_base.json"
+    path.write_text(json.dumps(kb_data))
+    return path
+
+
+@pytest.fixture
+def orchestrator(kb_path):
+    return MultiAgentOrchestrator(knowledge_base_path=str(kb_path), llm_client=GroqClient(None))
+
+
+def matched_names(results):
+    return [match["condition"] for match in results["condition_mappings"]["rule_based_matches"]]
+
+
+def test_reload_picks_up_new_conditions(orchestrator, kb_path, kb_data):
+    assert "Test Condition" not in matched_names(orchestrator.process_symptoms("runny nose and sneezing"))
+
+    kb_data["conditions"].append(NEW_CONDITION)
+    kb_path.write_text(json.dumps(kb_data))
+    status = orchestrator.reload_knowledge_base()
+
+    assert status["conditions"] == len(kb_data["conditions"])
+    results = orchestrator.process_symptoms("runny nose and sneezing")
+    # Every symptom of the new condition matches, so it ranks first
+    assert matched_names(results)[0] == "Test Condition"
+    assert not results["timings"]["result_cache_hit"]
+
+
+def test_reload_changes_the_result_cache_key(orchestrator):
+    old_knowledge_base = orchestrator.knowledge_base
+    analyzed = orchestrator.analyzer_agent.analyze_symptoms("headache and nausea")
+    old_key = orchestrator._cache_key(old_knowledge_base, analyzed)
+    orchestrator.process_symptoms("headache and nausea")
+    assert orchestrator.result_cache.get_stats()["size"] == 1
+
+    orchestrator.reload_knowledge_base()
+
+    assert orchestrator.knowledge_base is not old_knowledge_base
+    assert orchestrator._cache_key(orchestrator.knowledge_base, analyzed) != old_key
+    assert orchestrator.result_cache.get_stats()["size"] == 0
+
+
+def test_invalid_file_keeps_the_previous_snapshot(orchestrator, kb_path, kb_data):
+    snapshot = orchestrator._snapshot
+    kb_path.write_text(json.dumps(kb_data)[:-10])
+
+    with pytest.raises(ValueError):
+        orchestrator.reload_knowledge_base()
+
+    assert orchestrator._snapshot is snapshot
+    assert len(orchestrator.knowledge_base.conditions) == len(kb_data["conditions"])
+    assert orchestrator.process_symptoms("headache and nausea")["processing_success"]
+
+
+def test_admin_endpoint_reports_a_failed_reload(app_module, client, orchestrator, kb_path, monkeypatch):
+    monkeypatch.setattr(app_module, "orchestrator", orchestrator)
+    monkeypatch.setenv("ADMIN_API_KEY", "secret")
+
+    assert client.post("/api/admin/reload-knowledge-base", headers={"X-Admin-Key": "wrong"}).status_code == 401
+
+    response = client.post("/api/admin/reload-knowledge-base", headers={"X-Admin-Key": "secret"})
+    assert response.status_code == 200 and response.get_json()["success"]
+
+    snapshot = orchestrator._snapshot
+    kb_path.write_text("{")
+    response = client.post("/api/admin/reload-knowledge-base", headers={"X-Admin-Key": "secret"})
+    assert response.status_code == 500
+    assert response.get_json()["error"].startswith("Reload failed, previous knowledge base kept")
+    assert orchestrator._snapshot is snapshot
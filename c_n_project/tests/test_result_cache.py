@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from agents import MultiAgentOrchestrator
+from groq_client import GroqClient
+from knowledge_base import KnowledgeBase
+
+SYMPTOMS = "headache and nausea"
+
+
+@pytest.fixture
+def orchestrator(knowledge_base):
+    # No API key: rule-based results only, which are cached like complete ones
+    return MultiAgentOrchestrator(knowledge_base=knowledge_base, llm_client=GroqClient(None))
+
+
+def cache_hit(orchestrator, user_input=SYMPTOMS, age=None, chronic_conditions=None):
+    return orchestrator.process_symptoms(user_input, age, chronic_conditions)["timings"]["result_cache_hit"]
+
+
+def test_repeated_input_is_a_hit(orchestrator):
+    first = orchestrator.process_symptoms(SYMPTOMS)
+    second = orchestrator.process_symptoms("  Headache and NAUSEA ")
+
+    assert not first["timings"]["result_cache_hit"]
+    assert second["timings"]["result_cache_hit"]
+    assert second["condition_mappings"] == first["condition_mappings"]
+    assert second["advice"] == first["advice"]
+
+
+def test_expired_result_is_a_miss(knowledge_base):
+    orchestrator = MultiAgentOrchestrator(knowledge_base=knowledge_base, llm_client=GroqClient(None), cache_ttl=0.1)
+
+    assert not cache_hit(orchestrator)
+    assert cache_hit(orchestrator)
+    time.sleep(0.15)
+    assert not cache_hit(orchestrator)
+
+
+def test_results_are_kept_apart_by_age_bucket_and_chronic_conditions(orchestrator):
+    assert not cache_hit(orchestrator, age=31)
+    assert cache_hit(orchestrator, age=38)
+    assert not cache_hit(orchestrator, age=41)
+    assert not cache_hit(orchestrator)
+    assert not cache_hit(orchestrator, age=31, chronic_conditions="Asthma")
+    assert cache_hit(orchestrator, age=35, chronic_conditions=" asthma ")
+
+
+def test_cache_key_follows_the_knowledge_base_version(orchestrator, knowledge_base):
+    analyzed = orchestrator.analyzer_agent.analyze_symptoms(SYMPTOMS, 30, None)
+    key = orchestrator._cache_key(knowledge_base, analyzed)
+    assert key == (knowledge_base.loaded_at, analyzed["cleaned_input"], 3, "")
+    assert not cache_hit(orchestrator)
+
+    # Swap in a newer load without clearing the cache, as when a request that started before a reload
+    # stores its result after it
+    reloaded = KnowledgeBase.load(knowledge_base.path, missing_ok=False)
+    assert reloaded.loaded_at != knowledge_base.loaded_at
+    orchestrator._snapshot = orchestrator._build_snapshot(reloaded)
+
+    assert orchestrator._cache_key(reloaded, analyzed) != key
+    assert not cache_hit(orchestrator)
+    assert cache_hit(orchestrator)
@@ -0,0 +1,24 @@
+# Cold start: importing agents and constructing an orchestrator in a fresh interpreter, as every worker boot does.
+import json
+import os
+import subprocess
+import sys
+
+from benchmark import STARTUP_BUDGET_MS, measure_startup
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cold_start_stays_within_budget():
+    startup = measure_startup(runs=3)
+
+    assert startup["total_ms"] < STARTUP_BUDGET_MS, startup
+
+
+def test_http_stacks_are_not_imported_at_startup():
+    script = ("import json, sys, agents; agents.MultiAgentOrchestrator(); "
+              "print(json.dumps([name for name in ('requests', 'httpx') if name in sys.modules]))")
+    completed = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_DIR, capture_output=True, text=True,
+                               check=True)
+
+    assert json.loads(completed.stdout.splitlines()[-1]) == []
@@ -0,0 +1,45 @@
+# Regression corpus: free-text inputs with the symptoms and rule-based rankings the original per-pattern regex
+# extractor and all-pairs matcher produced. The single-pass extractor and both scoring engines must reproduce
+# them exactly.
+import pytest
+
+from agents import ConditionMapperAgent, SymptomAnalyzerAgent
+from groq_client import GroqClient
+
+
+def ranking(matches):
+    return [
+        {key: match[key] for key in ("condition", "match_score", "match_percentage", "matched_symptoms")}
+        for match in matches
+    ]
+
+
+@pytest.fixture(scope="module", params=["index", "matrix"])
+def mapper(request, knowledge_base):
+    mapper = ConditionMapperAgent(knowledge_base=knowledge_base, llm_client=GroqClient(None),
+                                  scoring_engine=request.param)
+    yield mapper
+    mapper.llm_executor.shutdown(wait=False)
+
+
+def test_symptom_extraction_matches_corpus(knowledge_base, symptom_corpus):
+    analyzer = SymptomAnalyzerAgent(knowledge_base=knowledge_base)
+
+    for case in symptom_corpus:
+        analyzed = analyzer.analyze_symptoms(case["input"])
+        assert analyzed["extracted_symptoms"] == case["extracted_symptoms"], case["input"]
+        assert analyzed["normalized_symptoms"] == case["normalized_symptoms"], case["input"]
+
+
+def test_rule_based_ranking_matches_corpus(mapper, symptom_corpus):
+    for case in symptom_corpus:
+        assert ranking(mapper._rule_based_matching(case["normalized_symptoms"])) == case["rule_based_matches"], \
+            case["input"]
+
+
+def test_batch_ranking_matches_corpus(mapper, symptom_corpus):
+    results = mapper.map_conditions_batch([{"normalized_symptoms": case["normalized_symptoms"]}
+                                           for case in symptom_corpus])
+
+    assert [ranking(result["rule_based_matches"]) for result in results] == \
+        [case["rule_based_matches"] for case in symptom_corpus]
@@ -0,0 +1,37 @@
+import pytest
+
+from agents import SymptomAnalyzerAgent
+
+
+@pytest.fixture(scope="module")
+def analyzer(knowledge_base):
+    return SymptomAnalyzerAgent(knowledge_base=knowledge_base)
+
+
+@pytest.mark.parametrize("word, correction", [
+    ("diarhea", "diarrhea"),
+    ("stomack", "stomach"),
+    ("stomache", "stomach ache"),
+    ("sharpain", "sharp pain"),
+    ("headache", None),
+    ("strike", None),
+    ("spelling", None),
+])
+def test_corrections(analyzer, word, correction):
+    assert analyzer.lexicon.correct(word) == correction
+
+
+@pytest.mark.parametrize("user_input", ["I have a stomache", "stomache since yesterday", "bad stomache ache"])
+def test_run_together_symptom_is_not_lost_to_its_first_word(analyzer, user_input):
+    # Corrected to the single word "stomach", which no pattern matches, nothing at all was extracted
+    analyzed = analyzer.analyze_symptoms(user_input)
+
+    assert analyzed["spelling_corrections"] == {"stomache": "stomach ache"}
+    assert analyzed["extracted_symptoms"][:2] == ["stomach ache", "stomach pain"]
+
+
+def test_misspelled_word_is_still_corrected_to_a_word(analyzer):
+    analyzed = analyzer.analyze_symptoms("stomack pain and diarhea")
+
+    assert analyzed["spelling_corrections"] == {"stomack": "stomach", "diarhea": "diarrhea"}
+    assert "stomach pain" in analyzed["extracted_symptoms"]
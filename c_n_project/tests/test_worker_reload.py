@@ -0,0 +1,72 @@
+# A reload request reaches one worker process; the others must pick the new knowledge base up from the file.
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+from agents import MultiAgentOrchestrator
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A second worker: serves from its own orchestrator with the file watcher on, and reports its condition
+# count once at startup and again once it changes (or after a few seconds)
+WORKER_SCRIPT = textwrap.dedent("""
+    import sys, time
+    from agents import MultiAgentOrchestrator
+    orchestrator = MultiAgentOrchestrator(knowledge_base_path=sys.argv[1])
+    orchestrator.start_knowledge_base_watcher(0.05)
+    started_with = len(orchestrator.knowledge_base.conditions)
+    print(started_with, flush=True)
+    sys.stdin.readline()
+    deadline = time.monotonic() + 5
+    while len(orchestrator.knowledge_base.conditions) == started_with and time.monotonic() < deadline:
+        time.sleep(0.05)
+    print(len(orchestrator.knowledge_base.conditions), flush=True)
+""")
+
+
+def test_reload_reaches_another_worker_process(tmp_path):
+    with open(os.path.join(PROJECT_DIR, "knowledge_base.json"), "r") as f:
+        data = json.load(f)
+    path = tmp_path / "knowledge_base.json"
+    path.write_text(json.dumps(data))
+
+    worker = subprocess.Popen([sys.executable, "-c", WORKER_SCRIPT, str(path)], cwd=PROJECT_DIR,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert int(worker.stdout.readline()) == len(data["conditions"])
+
+        data["conditions"].append({"name": "Test Condition", "symptoms": ["glowing skin"], "severity": "mild"})
+        path.write_text(json.dumps(data))
+        # What the admin endpoint does in the worker that handles the request
+        reloaded = MultiAgentOrchestrator(knowledge_base_path=str(path)).reload_knowledge_base()
+        assert reloaded["conditions"] == len(data["conditions"])
+
+        worker.stdin.write("\n")
+        worker.stdin.flush()
+        assert int(worker.stdout.readline()) == len(data["conditions"])
+    finally:
+        worker.kill()
+        worker.wait()
+
+
+def test_watcher_reloads_a_version_changed_before_it_started(tmp_path):
+    # A pre-fork worker inherits the knowledge base the master loaded, possibly before the file last changed
+    with open(os.path.join(PROJECT_DIR, "knowledge_base.json"), "r") as f:
+        data = json.load(f)
+    path = tmp_path / "knowledge_base.json"
+    path.write_text(json.dumps(data))
+    orchestrator = MultiAgentOrchestrator(knowledge_base_path=str(path))
+
+    data["conditions"] = data["conditions"][:3]
+    path.write_text(json.dumps(data))
+    watcher = orchestrator.start_knowledge_base_watcher(0.05)
+    try:
+        deadline = time.monotonic() + 5
+        while len(orchestrator.knowledge_base.conditions) != 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(orchestrator.knowledge_base.conditions) == 3
+    finally:
+        watcher.stop()
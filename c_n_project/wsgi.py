@@ -0,0 +1,14 @@
+# Production WSGI entry point for pre-fork servers.
+#
+#   gunicorn -c gunicorn.conf.py wsgi:application
+#
+# With preload_app (the gunicorn.conf.py default) this module is imported once in the master: the knowledge
+# base, its indexes and the analyzer's tables are built and warmed up before the workers fork, so every
+# worker starts ready and shares those pages copy-on-write instead of building its own copy.
+import gc
+
+from app import app as application, warm_up
+
+warm_up()
+# Keep the collector from touching (and so copying) the inherited objects in the workers
+gc.freeze()